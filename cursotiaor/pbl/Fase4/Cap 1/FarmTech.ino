@@ -60,6 +60,15 @@
 #define CULTURA_MILHO 1
 int culturaAtual = CULTURA_BANANA;  // Trocar para CULTURA_MILHO se necessário
 
+// Modo de saída serial
+// 0 = texto para o Serial Monitor (padrão)
+// 1 = telemetria compacta: uma linha "$FT,...*CRC" por leitura para o gateway
+//     (collect_serial_data.py); o texto do Serial Monitor é suprimido
+// Também pode ser definido no build: -DTELEMETRIA_COMPACTA=1
+#ifndef TELEMETRIA_COMPACTA
+#define TELEMETRIA_COMPACTA 0
+#endif
+
 // Intervalo de leituras (milissegundos)
 #define INTERVALO_LEITURA 5000    // 5 segundos
 
@@ -128,6 +137,18 @@ bool irrigacaoAutomatica = true;
 unsigned long ultimaLeitura = 0;
 int contadorLeituras = 0;
 
+// Saída do texto do Serial Monitor (descartada no modo compacto)
+#if TELEMETRIA_COMPACTA
+class SemSaida : public Print {
+ public:
+  size_t write(uint8_t) override { return 1; }
+};
+SemSaida semSaida;
+Print& Monitor = semSaida;
+#else
+Print& Monitor = Serial;
+#endif
+
 // ═══════════════════════════════════════════════════════════════════════════
 // DECLARAÇÕES DE FUNÇÕES
 // ═══════════════════════════════════════════════════════════════════════════
@@ -138,6 +159,8 @@ bool verificarNPKAdequado();
 void ligarIrrigacao(String motivo);
 void desligarIrrigacao(String motivo);
 void exibirStatus();
+void enviarTelemetria();
+uint16_t crc16(const char* dados);
 void exibirBanner();
 void exibirRequisitosBanana();
 void exibirRequisitosMilho();
@@ -151,7 +174,7 @@ void setup() {
   Serial.begin(115200);
   delay(1000);  // Delay maior para estabilização
   
-  Serial.println("🔄 Iniciando sistema...");
+  Monitor.println("🔄 Iniciando sistema...");
   delay(500);
   
   // Banner inicial
@@ -169,30 +192,30 @@ void setup() {
   releLigado = false;
   
   // Inicializa DHT22 com verificação
-  Serial.println("[INIT] 🔄 Inicializando DHT22...");
+  Monitor.println("[INIT] 🔄 Inicializando DHT22...");
   dht.begin();
   delay(2000);  // DHT22 precisa de tempo para estabilizar
   
-  Serial.println("[INIT] ✅ Pinos configurados");
-  Serial.println("[INIT] ✅ DHT22 inicializado");
-  Serial.println("[INIT] ✅ Sistema pronto para operação");
+  Monitor.println("[INIT] ✅ Pinos configurados");
+  Monitor.println("[INIT] ✅ DHT22 inicializado");
+  Monitor.println("[INIT] ✅ Sistema pronto para operação");
   
   // Exibe cultura selecionada
-  Serial.println();
-  Serial.print("🌾 Cultura selecionada: ");
+  Monitor.println();
+  Monitor.print("🌾 Cultura selecionada: ");
   if (culturaAtual == CULTURA_BANANA) {
-    Serial.println("BANANA 🍌");
+    Monitor.println("BANANA 🍌");
     exibirRequisitosBanana();
   } else {
-    Serial.println("MILHO 🌽");
+    Monitor.println("MILHO 🌽");
     exibirRequisitosMilho();
   }
   
-  Serial.println();
-  Serial.println("═══════════════════════════════════════════════════════════════");
-  Serial.println("  < 📊 INICIANDO MONITORAMENTO...>");
-  Serial.println("═══════════════════════════════════════════════════════════════");
-  Serial.println();
+  Monitor.println();
+  Monitor.println("═══════════════════════════════════════════════════════════════");
+  Monitor.println("  < 📊 INICIANDO MONITORAMENTO...>");
+  Monitor.println("═══════════════════════════════════════════════════════════════");
+  Monitor.println();
   
   delay(2000);  // Aguarda estabilização
 }
@@ -217,10 +240,14 @@ void loop() {
       decidirIrrigacao();
     }
     
-    // Exibe status
+    // Exibe status (ou envia a linha compacta)
+#if TELEMETRIA_COMPACTA
+    enviarTelemetria();
+#else
     exibirStatus();
     
-    Serial.println();
+    Monitor.println();
+#endif
   }
   
   delay(10);  // Pequeno delay para não sobrecarregar
@@ -330,14 +357,14 @@ void lerSensores() {
     
     // Display de aplicação
     if (!fertilizante_aplicado) {
-      Serial.println("\n🚜💨💨💨 [APLICAÇÃO DE FERTILIZANTES] 💨💨💨🚜");
+      Monitor.println("\n🚜💨💨💨 [APLICAÇÃO DE FERTILIZANTES] 💨💨💨🚜");
       fertilizante_aplicado = true;
     }
-    Serial.print("   🔵 Aplicando NITROGÊNIO: ");
-    Serial.print(dosagem_N, 0);
-    Serial.print(" g/m² → Efeito: ");
-    Serial.print(ajuste_N, 2);
-    Serial.println(" pH (acidifica solo)");
+    Monitor.print("   🔵 Aplicando NITROGÊNIO: ");
+    Monitor.print(dosagem_N, 0);
+    Monitor.print(" g/m² → Efeito: ");
+    Monitor.print(ajuste_N, 2);
+    Monitor.println(" pH (acidifica solo)");
   }
   if (fosforoOK) {
     float ajuste_P = dosagem_P * -0.025; // Ex: 10 g/m² × -0.025 = -0.25 pH
@@ -345,14 +372,14 @@ void lerSensores() {
     
     // Display de aplicação
     if (!fertilizante_aplicado) {
-      Serial.println("\n🚜💨💨💨 [APLICAÇÃO DE FERTILIZANTES] 💨💨💨🚜");
+      Monitor.println("\n🚜💨💨💨 [APLICAÇÃO DE FERTILIZANTES] 💨💨💨🚜");
       fertilizante_aplicado = true;
     }
-    Serial.print("   🟡 Aplicando FÓSFORO: ");
-    Serial.print(dosagem_P, 0);
-    Serial.print(" g/m² → Efeito: ");
-    Serial.print(ajuste_P, 2);
-    Serial.println(" pH (acidifica solo)");
+    Monitor.print("   🟡 Aplicando FÓSFORO: ");
+    Monitor.print(dosagem_P, 0);
+    Monitor.print(" g/m² → Efeito: ");
+    Monitor.print(ajuste_P, 2);
+    Monitor.println(" pH (acidifica solo)");
   }
   if (potassioOK) {
     float ajuste_K = dosagem_K * 0.005;  // Ex: 20 g/m² × 0.005 = +0.10 pH
@@ -360,23 +387,23 @@ void lerSensores() {
     
     // Display de aplicação
     if (!fertilizante_aplicado) {
-      Serial.println("\n🚜💨💨💨 [APLICAÇÃO DE FERTILIZANTES] 💨💨💨🚜");
+      Monitor.println("\n🚜💨💨💨 [APLICAÇÃO DE FERTILIZANTES] 💨💨💨🚜");
       fertilizante_aplicado = true;
     }
-    Serial.print("   🟢 Aplicando POTÁSSIO: ");
-    Serial.print(dosagem_K, 0);
-    Serial.print(" g/m² → Efeito: +");
-    Serial.print(ajuste_K, 2);
-    Serial.println(" pH (alcaliniza solo)");
+    Monitor.print("   🟢 Aplicando POTÁSSIO: ");
+    Monitor.print(dosagem_K, 0);
+    Monitor.print(" g/m² → Efeito: +");
+    Monitor.print(ajuste_K, 2);
+    Monitor.println(" pH (alcaliniza solo)");
   }
   
   // Finaliza display de aplicação
   if (fertilizante_aplicado) {
-    Serial.print("   ✅ Fertilização concluída! Ajuste total: ");
-    if (ajustePH > 0) Serial.print("+");
-    Serial.print(ajustePH, 2);
-    Serial.println(" pH");
-    Serial.println("🚜💨💨💨💨💨💨💨💨💨💨💨💨💨💨💨💨💨💨💨💨💨🚜\n");
+    Monitor.print("   ✅ Fertilização concluída! Ajuste total: ");
+    if (ajustePH > 0) Monitor.print("+");
+    Monitor.print(ajustePH, 2);
+    Monitor.println(" pH");
+    Monitor.println("🚜💨💨💨💨💨💨💨💨💨💨💨💨💨💨💨💨💨💨💨💨💨🚜\n");
   }
   
   // pH Final = pH Base (LDR) + Ajustes NPK (dosagem-dependente)
@@ -388,91 +415,91 @@ void lerSensores() {
   phSolo = constrain(phSolo, 3.0, 9.0);
   
   // Display detalhado (debug)
-  Serial.println("\n📊 [SENSOR LDR/pH - SUPER FILTRADO 🔒]");
-  Serial.print("   💡 Lux = ");
-  Serial.print(ldrLux, 0);
+  Monitor.println("\n📊 [SENSOR LDR/pH - SUPER FILTRADO 🔒]");
+  Monitor.print("   💡 Lux = ");
+  Monitor.print(ldrLux, 0);
   
   // Classificação da luminosidade
   if (ldrLux < 100) {
-    Serial.println(" lux → 🌑 ESCURO TOTAL");
+    Monitor.println(" lux → 🌑 ESCURO TOTAL");
   } else if (ldrLux < 1000) {
-    Serial.println(" lux → 🌘 MUITO ESCURO");
+    Monitor.println(" lux → 🌘 MUITO ESCURO");
   } else if (ldrLux < 10000) {
-    Serial.println(" lux → 🌤️ ILUMINAÇÃO NORMAL");
+    Monitor.println(" lux → 🌤️ ILUMINAÇÃO NORMAL");
   } else if (ldrLux < 50000) {
-    Serial.println(" lux → ☀️ MUITO CLARO");
+    Monitor.println(" lux → ☀️ MUITO CLARO");
   } else {
-    Serial.println(" lux → 🔆 LUZ SOLAR DIRETA (máx 100.000)");
+    Monitor.println(" lux → 🔆 LUZ SOLAR DIRETA (máx 100.000)");
   }
   
   // Indica se o filtro já está estável
-  Serial.print("   🔒 Filtro: ");
+  Monitor.print("   🔒 Filtro: ");
   if (array_preenchido) {
-    Serial.println("✅ 100% estável (ruído removido)");
+    Monitor.println("✅ 100% estável (ruído removido)");
   } else {
-    Serial.print("⏳ Estabilizando ");
-    Serial.print(indice_ldr);
-    Serial.print("/");
-    Serial.println(NUM_LEITURAS_LDR);
+    Monitor.print("⏳ Estabilizando ");
+    Monitor.print(indice_ldr);
+    Monitor.print("/");
+    Monitor.println(NUM_LEITURAS_LDR);
   }
   
-  Serial.println("\n   📐 REGRAS DE CONVERSÃO LDR → pH:");
-  Serial.print("   � ADC Value: ");
-  Serial.print(ldrValue);
-  Serial.print(" / 4095 (média de ");
-  Serial.print(NUM_LEITURAS_LDR);
-  Serial.println(" leituras)");
-  Serial.print("   🔄 Fórmula: pH = 9.0 - (");
-  Serial.print(ldrValue);
-  Serial.println(" / 4095) × 6.0");
+  Monitor.println("\n   📐 REGRAS DE CONVERSÃO LDR → pH:");
+  Monitor.print("   � ADC Value: ");
+  Monitor.print(ldrValue);
+  Monitor.print(" / 4095 (média de ");
+  Monitor.print(NUM_LEITURAS_LDR);
+  Monitor.println(" leituras)");
+  Monitor.print("   🔄 Fórmula: pH = 9.0 - (");
+  Monitor.print(ldrValue);
+  Monitor.println(" / 4095) × 6.0");
   
   // Exibe cálculo de pH com ajustes NPK baseados em dosagem
-  Serial.print("   🧪 pH Base (LDR): ");
-  Serial.println(pHBase, 2);
+  Monitor.print("   🧪 pH Base (LDR): ");
+  Monitor.println(pHBase, 2);
   
   if (ajustePH != 0.0) {
-    Serial.print("   ⚗️  Ajuste NPK (dosagem-proporcional): ");
-    if (ajustePH > 0) Serial.print("+");
-    Serial.print(ajustePH, 2);
-    Serial.println(" pH");
+    Monitor.print("   ⚗️  Ajuste NPK (dosagem-proporcional): ");
+    if (ajustePH > 0) Monitor.print("+");
+    Monitor.print(ajustePH, 2);
+    Monitor.println(" pH");
     
     // Determina dosagens para exibir
     float dose_N = (culturaAtual == CULTURA_BANANA) ? BANANA_N : MILHO_N;
     float dose_P = (culturaAtual == CULTURA_BANANA) ? BANANA_P : MILHO_P;
     float dose_K = (culturaAtual == CULTURA_BANANA) ? BANANA_K : MILHO_K;
     
-    Serial.print("   📦 Fertilizantes aplicados: ");
+    Monitor.print("   📦 Fertilizantes aplicados: ");
     if (nitrogenioOK) {
-      Serial.print("N=");
-      Serial.print(dose_N, 0);
-      Serial.print("g/m² (");
-      Serial.print(dose_N * -0.03, 2);
-      Serial.print(" pH) ");
+      Monitor.print("N=");
+      Monitor.print(dose_N, 0);
+      Monitor.print("g/m² (");
+      Monitor.print(dose_N * -0.03, 2);
+      Monitor.print(" pH) ");
     }
     if (fosforoOK) {
-      Serial.print("P=");
-      Serial.print(dose_P, 0);
-      Serial.print("g/m² (");
-      Serial.print(dose_P * -0.025, 2);
-      Serial.print(" pH) ");
+      Monitor.print("P=");
+      Monitor.print(dose_P, 0);
+      Monitor.print("g/m² (");
+      Monitor.print(dose_P * -0.025, 2);
+      Monitor.print(" pH) ");
     }
     if (potassioOK) {
-      Serial.print("K=");
-      Serial.print(dose_K, 0);
-      Serial.print("g/m² (+");
-      Serial.print(dose_K * 0.005, 2);
-      Serial.print(" pH)");
+      Monitor.print("K=");
+      Monitor.print(dose_K, 0);
+      Monitor.print("g/m² (+");
+      Monitor.print(dose_K * 0.005, 2);
+      Monitor.print(" pH)");
     }
-    Serial.println();
+    Monitor.println();
   }
   
   // Exibe pH Final com detalhamento dos ajustes ao lado
-  Serial.print("   🎯 pH Final: ");
-  Serial.print(phSolo, 2);
+  Monitor.print("   🎯 pH Final: ");
+  Monitor.print(phSolo, 2);
   
   // Mostra influências NPK ao lado do pH Final
   if (nitrogenioOK || fosforoOK || potassioOK) {
-    Serial.print(" [");
+    Monitor.print(" [");
     
     // Determina dosagens para cálculo
     float dose_N = (culturaAtual == CULTURA_BANANA) ? BANANA_N : MILHO_N;
@@ -481,34 +508,34 @@ void lerSensores() {
     
     bool primeiro = true;
     if (nitrogenioOK) {
-      Serial.print("N:");
-      Serial.print(dose_N * -0.03, 2);
+      Monitor.print("N:");
+      Monitor.print(dose_N * -0.03, 2);
       primeiro = false;
     }
     if (fosforoOK) {
-      if (!primeiro) Serial.print(" ");
-      Serial.print("P:");
-      Serial.print(dose_P * -0.025, 2);
+      if (!primeiro) Monitor.print(" ");
+      Monitor.print("P:");
+      Monitor.print(dose_P * -0.025, 2);
       primeiro = false;
     }
     if (potassioOK) {
-      if (!primeiro) Serial.print(" ");
-      Serial.print("K:+");
-      Serial.print(dose_K * 0.005, 2);
+      if (!primeiro) Monitor.print(" ");
+      Monitor.print("K:+");
+      Monitor.print(dose_K * 0.005, 2);
     }
-    Serial.print("]");
+    Monitor.print("]");
   }
-  Serial.println();
+  Monitor.println();
   
   // Classificação do pH
   if (phSolo < PH_MINIMO) {
-    Serial.println("                    → 🟥 ÁCIDO");
+    Monitor.println("                    → 🟥 ÁCIDO");
   } else if (phSolo > PH_MAXIMO) {
-    Serial.println("                    → 🟦 ALCALINO");
+    Monitor.println("                    → 🟦 ALCALINO");
   } else {
-    Serial.println("                    → 🟩 NEUTRO (IDEAL)");
+    Monitor.println("                    → 🟩 NEUTRO (IDEAL)");
   }
-  Serial.println();
+  Monitor.println();
   // ─────────────────────────────────────────────────────────────────────────
   // 3. Leitura de Umidade e Temperatura (DHT22)
   // ─────────────────────────────────────────────────────────────────────────
@@ -517,7 +544,7 @@ void lerSensores() {
   
   // Validação
   if (isnan(temperaturaAr) || isnan(umidadeAr)) {
-    Serial.println("❌ [ERRO] Falha na leitura do DHT22!");
+    Monitor.println("❌ [ERRO] Falha na leitura do DHT22!");
     temperaturaAr = 25.0;   // Valor padrão
     umidadeAr = 60.0;
   }
@@ -634,28 +661,28 @@ void ligarIrrigacao(String motivo) {
   digitalWrite(RELAY_PIN, HIGH);
   releLigado = true;
   
-  Serial.println();
-  Serial.println("💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧");
-  Serial.println("  🚨 IRRIGAÇÃO LIGADA!");
-  Serial.println("💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧");
-  Serial.print("  📌 Motivo: ");
-  Serial.println(motivo);
-  Serial.println("💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧");
-  Serial.println();
+  Monitor.println();
+  Monitor.println("💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧");
+  Monitor.println("  🚨 IRRIGAÇÃO LIGADA!");
+  Monitor.println("💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧");
+  Monitor.print("  📌 Motivo: ");
+  Monitor.println(motivo);
+  Monitor.println("💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧💧");
+  Monitor.println();
 }
 
 void desligarIrrigacao(String motivo) {
   digitalWrite(RELAY_PIN, LOW);
   releLigado = false;
   
-  Serial.println();
-  Serial.println("⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️");
-  Serial.println("  ✅ IRRIGAÇÃO DESLIGADA");
-  Serial.println("⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️");
-  Serial.print("  📌 Motivo: ");
-  Serial.println(motivo);
-  Serial.println("⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️");
-  Serial.println();
+  Monitor.println();
+  Monitor.println("⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️");
+  Monitor.println("  ✅ IRRIGAÇÃO DESLIGADA");
+  Monitor.println("⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️");
+  Monitor.print("  📌 Motivo: ");
+  Monitor.println(motivo);
+  Monitor.println("⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️⏸️");
+  Monitor.println();
 }
 
 // ═══════════════════════════════════════════════════════════════════════════
@@ -663,60 +690,60 @@ void desligarIrrigacao(String motivo) {
 // ═══════════════════════════════════════════════════════════════════════════
 
 void exibirStatus() {
-  Serial.println("═══════════════════════════════════════════════════════════════");
-  Serial.print("  📊 LEITURA #");
-  Serial.print(contadorLeituras);
-  Serial.print(" - ");
-  Serial.print(millis() / 1000);
-  Serial.println("s");
-  Serial.println("═══════════════════════════════════════════════════════════════");
+  Monitor.println("═══════════════════════════════════════════════════════════════");
+  Monitor.print("  📊 LEITURA #");
+  Monitor.print(contadorLeituras);
+  Monitor.print(" - ");
+  Monitor.print(millis() / 1000);
+  Monitor.println("s");
+  Monitor.println("═══════════════════════════════════════════════════════════════");
   
   // ─────────────────────────────────────────────────────────────────────────
   // Sensores NPK
   // ─────────────────────────────────────────────────────────────────────────
-  Serial.println("\n🧪 NPK - Níveis de Nutrientes:");
-  Serial.print("   🔵 Nitrogênio (N): ");
-  Serial.print(nitrogenioOK ? "✅ OK" : "❌ BAIXO");
-  if (culturaAtual == CULTURA_MILHO) Serial.print(" [CRÍTICO p/ milho]");
-  Serial.println();
+  Monitor.println("\n🧪 NPK - Níveis de Nutrientes:");
+  Monitor.print("   🔵 Nitrogênio (N): ");
+  Monitor.print(nitrogenioOK ? "✅ OK" : "❌ BAIXO");
+  if (culturaAtual == CULTURA_MILHO) Monitor.print(" [CRÍTICO p/ milho]");
+  Monitor.println();
   
-  Serial.print("   🟡 Fósforo (P):    ");
-  Serial.println(fosforoOK ? "✅ OK" : "❌ BAIXO");
+  Monitor.print("   🟡 Fósforo (P):    ");
+  Monitor.println(fosforoOK ? "✅ OK" : "❌ BAIXO");
   
-  Serial.print("   🟢 Potássio (K):   ");
-  Serial.print(potassioOK ? "✅ OK" : "❌ BAIXO");
-  if (culturaAtual == CULTURA_BANANA) Serial.print(" [CRÍTICO p/ banana]");
-  Serial.println();
+  Monitor.print("   🟢 Potássio (K):   ");
+  Monitor.print(potassioOK ? "✅ OK" : "❌ BAIXO");
+  if (culturaAtual == CULTURA_BANANA) Monitor.print(" [CRÍTICO p/ banana]");
+  Monitor.println();
   
   // Status geral NPK
   bool npkAdequado = verificarNPKAdequado();
-  Serial.print("\n   📋 Status NPK: ");
+  Monitor.print("\n   📋 Status NPK: ");
   if (npkAdequado) {
-    Serial.println("✅ ADEQUADO para a cultura");
+    Monitor.println("✅ ADEQUADO para a cultura");
   } else {
-    Serial.println("⚠️  INSUFICIENTE - Aplicar fertilizantes!");
+    Monitor.println("⚠️  INSUFICIENTE - Aplicar fertilizantes!");
   }
   
   // ─────────────────────────────────────────────────────────────────────────
   // pH do Solo com Simulação de Efeito NPK
   // ─────────────────────────────────────────────────────────────────────────
-  Serial.println("\n🧪 pH do Solo:");
-  //Serial.print("   💡 Luminosidade: ");
-  //Serial.print(ldrLux, 0);
-  Serial.println(" lux");
+  Monitor.println("\n🧪 pH do Solo:");
+  //Monitor.print("   💡 Luminosidade: ");
+  //Monitor.print(ldrLux, 0);
+  Monitor.println(" lux");
   
   // Calcula pH base (sem NPK) para comparação
   float pHBase_display = 9.0 - (ldrValue / 4095.0) * 6.0;
   
-  Serial.print("   📊 LDR Value: ");
-  Serial.print(ldrValue);
-  Serial.print(" → pH Base: ");
-  Serial.print(pHBase_display, 2);
+  Monitor.print("   📊 LDR Value: ");
+  Monitor.print(ldrValue);
+  Monitor.print(" → pH Base: ");
+  Monitor.print(pHBase_display, 2);
   
   // Se houver fertilizantes aplicados, mostra transformação
   if (nitrogenioOK || fosforoOK || potassioOK) {
-    Serial.println();
-    Serial.println("   🚜 Após aplicação de fertilizantes:");
+    Monitor.println();
+    Monitor.println("   🚜 Após aplicação de fertilizantes:");
     
     // Calcula dosagens
     float dose_N = (culturaAtual == CULTURA_BANANA) ? BANANA_N : MILHO_N;
@@ -725,110 +752,146 @@ void exibirStatus() {
     
     // Mostra cada nutriente aplicado e seu efeito
     if (nitrogenioOK) {
-      Serial.print("      🔵 Nitrogênio (");
-      Serial.print(dose_N, 0);
-      Serial.print(" g/m²) → ");
-      Serial.print(dose_N * -0.03, 2);
-      Serial.println(" pH (acidifica)");
+      Monitor.print("      🔵 Nitrogênio (");
+      Monitor.print(dose_N, 0);
+      Monitor.print(" g/m²) → ");
+      Monitor.print(dose_N * -0.03, 2);
+      Monitor.println(" pH (acidifica)");
     }
     if (fosforoOK) {
-      Serial.print("      🟡 Fósforo (");
-      Serial.print(dose_P, 0);
-      Serial.print(" g/m²) → ");
-      Serial.print(dose_P * -0.025, 2);
-      Serial.println(" pH (acidifica)");
+      Monitor.print("      🟡 Fósforo (");
+      Monitor.print(dose_P, 0);
+      Monitor.print(" g/m²) → ");
+      Monitor.print(dose_P * -0.025, 2);
+      Monitor.println(" pH (acidifica)");
     }
     if (potassioOK) {
-      Serial.print("      🟢 Potássio (");
-      Serial.print(dose_K, 0);
-      Serial.print(" g/m²) → +");
-      Serial.print(dose_K * 0.005, 2);
-      Serial.println(" pH (alcaliniza)");
+      Monitor.print("      🟢 Potássio (");
+      Monitor.print(dose_K, 0);
+      Monitor.print(" g/m²) → +");
+      Monitor.print(dose_K * 0.005, 2);
+      Monitor.println(" pH (alcaliniza)");
     }
     
-    Serial.print("   🎯 pH Final: ");
-    Serial.print(phSolo, 2);
-    Serial.print(" (");
+    Monitor.print("   🎯 pH Final: ");
+    Monitor.print(phSolo, 2);
+    Monitor.print(" (");
     float variacao = phSolo - pHBase_display;
-    if (variacao > 0) Serial.print("+");
-    Serial.print(variacao, 2);
-    Serial.println(" em relação ao base)");
+    if (variacao > 0) Monitor.print("+");
+    Monitor.print(variacao, 2);
+    Monitor.println(" em relação ao base)");
   } else {
-    Serial.print(" → pH Final: ");
-    Serial.println(phSolo, 2);
+    Monitor.print(" → pH Final: ");
+    Monitor.println(phSolo, 2);
   }
   
-  Serial.print("\n   📋 Status: ");
+  Monitor.print("\n   📋 Status: ");
   if (phSolo < PH_MINIMO) {
-    Serial.println("🟥 ÁCIDO (< " + String(PH_MINIMO, 1) + ")");
-    Serial.println("   💡 Recomendação: Aplicar Fósforo (P) e Potássio (K)");
+    Monitor.println("🟥 ÁCIDO (< " + String(PH_MINIMO, 1) + ")");
+    Monitor.println("   💡 Recomendação: Aplicar Fósforo (P) e Potássio (K)");
   } else if (phSolo > PH_MAXIMO) {
-    Serial.println("🟦 ALCALINO (> " + String(PH_MAXIMO, 1) + ")");
-    Serial.println("   💡 Recomendação: Aplicar Nitrogênio (N)");
+    Monitor.println("🟦 ALCALINO (> " + String(PH_MAXIMO, 1) + ")");
+    Monitor.println("   💡 Recomendação: Aplicar Nitrogênio (N)");
   } else {
-    Serial.println("🟩 NEUTRO (" + String(PH_MINIMO, 1) + "-" + String(PH_MAXIMO, 1) + ") - IDEAL");
+    Monitor.println("🟩 NEUTRO (" + String(PH_MINIMO, 1) + "-" + String(PH_MAXIMO, 1) + ") - IDEAL");
   }
   
   // ─────────────────────────────────────────────────────────────────────────
   // Temperatura e Umidade
   // ─────────────────────────────────────────────────────────────────────────
-  Serial.println("\n🌡️ Condições Ambientais:");
-  Serial.print("   🌡️  Temperatura: ");
-  Serial.print(temperaturaAr, 1);
-  Serial.print(" °C ");
-  if (temperaturaAr < 15) Serial.println("❄️ BAIXA");
-  else if (temperaturaAr < 25) Serial.println("✅ IDEAL");
-  else if (temperaturaAr < 35) Serial.println("🌡️ ELEVADA");
-  else Serial.println("🔥 CRÍTICA");
+  Monitor.println("\n🌡️ Condições Ambientais:");
+  Monitor.print("   🌡️  Temperatura: ");
+  Monitor.print(temperaturaAr, 1);
+  Monitor.print(" °C ");
+  if (temperaturaAr < 15) Monitor.println("❄️ BAIXA");
+  else if (temperaturaAr < 25) Monitor.println("✅ IDEAL");
+  else if (temperaturaAr < 35) Monitor.println("🌡️ ELEVADA");
+  else Monitor.println("🔥 CRÍTICA");
   
-  Serial.print("   💧 Umidade Solo: ");
-  Serial.print(umidadeSolo, 1);
-  Serial.print(" % ");
-  if (umidadeSolo < UMIDADE_MINIMA) Serial.println("🏜️ SECO - IRRIGAR!");
-  else if (umidadeSolo < UMIDADE_IDEAL) Serial.println("⚠️ ABAIXO DO IDEAL");
-  else if (umidadeSolo < UMIDADE_MAXIMA) Serial.println("✅ IDEAL");
-  else Serial.println("☔ ENCHARCADO");
+  Monitor.print("   💧 Umidade Solo: ");
+  Monitor.print(umidadeSolo, 1);
+  Monitor.print(" % ");
+  if (umidadeSolo < UMIDADE_MINIMA) Monitor.println("🏜️ SECO - IRRIGAR!");
+  else if (umidadeSolo < UMIDADE_IDEAL) Monitor.println("⚠️ ABAIXO DO IDEAL");
+  else if (umidadeSolo < UMIDADE_MAXIMA) Monitor.println("✅ IDEAL");
+  else Monitor.println("☔ ENCHARCADO");
   
   // ─────────────────────────────────────────────────────────────────────────
   // Estado da Irrigação
   // ─────────────────────────────────────────────────────────────────────────
-  Serial.println("\n💧 Sistema de Irrigação:");
-  Serial.print("   🔌 Relé: ");
-  Serial.println(releLigado ? "⚡ LIGADO (irrigando)" : "⏸️ DESLIGADO");
+  Monitor.println("\n💧 Sistema de Irrigação:");
+  Monitor.print("   🔌 Relé: ");
+  Monitor.println(releLigado ? "⚡ LIGADO (irrigando)" : "⏸️ DESLIGADO");
   
-  Serial.print("   🤖 Modo: ");
-  Serial.println(irrigacaoAutomatica ? "AUTOMÁTICO ✅" : "MANUAL");
+  Monitor.print("   🤖 Modo: ");
+  Monitor.println(irrigacaoAutomatica ? "AUTOMÁTICO ✅" : "MANUAL");
   
   // ─────────────────────────────────────────────────────────────────────────
   // Recomendações
   // ─────────────────────────────────────────────────────────────────────────
-  Serial.println("\n💡 Recomendações:");
+  Monitor.println("\n💡 Recomendações:");
   
   if (!npkAdequado) {
-    Serial.println("   ⚠️ Aplicar fertilizantes NPK conforme necessidade");
+    Monitor.println("   ⚠️ Aplicar fertilizantes NPK conforme necessidade");
     if (culturaAtual == CULTURA_BANANA && !potassioOK) {
-      Serial.println("   🍌 URGENTE: Aplicar Potássio (20 g/m²)");
+      Monitor.println("   🍌 URGENTE: Aplicar Potássio (20 g/m²)");
     }
     if (culturaAtual == CULTURA_MILHO && !nitrogenioOK) {
-      Serial.println("   🌽 URGENTE: Aplicar Nitrogênio (12 g/m²)");
+      Monitor.println("   🌽 URGENTE: Aplicar Nitrogênio (12 g/m²)");
     }
   }
   
   if (phSolo < PH_MINIMO || phSolo > PH_MAXIMO) {
-    Serial.println("   ⚠️ Corrigir pH do solo com NPK adequado");
+    Monitor.println("   ⚠️ Corrigir pH do solo com NPK adequado");
   }
   
   if (umidadeSolo < UMIDADE_MINIMA) {
-    Serial.println("   💧 Irrigação necessária AGORA");
+    Monitor.println("   💧 Irrigação necessária AGORA");
   } else if (umidadeSolo > UMIDADE_MAXIMA) {
-    Serial.println("   ⏸️ Suspender irrigação - Solo encharcado");
+    Monitor.println("   ⏸️ Suspender irrigação - Solo encharcado");
   }
   
   if (temperaturaAr > 30) {
-    Serial.println("   🌡️ Temperatura alta - Aumentar frequência de irrigação");
+    Monitor.println("   🌡️ Temperatura alta - Aumentar frequência de irrigação");
+  }
+  
+  Monitor.println("═══════════════════════════════════════════════════════════════");
+}
+
+// ═══════════════════════════════════════════════════════════════════════════
+// TELEMETRIA COMPACTA
+// ═══════════════════════════════════════════════════════════════════════════
+// Formato (uma linha por leitura, ~40 bytes):
+//   $FT,<leitura>,<cultura>,<N>,<P>,<K>,<pH>,<temperatura>,<umidade>,<relé>*<CRC>
+//   $FT,42,0,1,0,1,6.52,23.4,45.2,1*C427
+// cultura: 0 = banana, 1 = milho; N/P/K/relé: 0 ou 1
+// CRC: CRC-16/CCITT-FALSE (hex) dos bytes entre '$' e '*'
+
+uint16_t crc16(const char* dados) {
+  uint16_t crc = 0xFFFF;
+  while (*dados) {
+    crc ^= (uint16_t)(uint8_t)(*dados++) << 8;
+    for (int bit = 0; bit < 8; bit++) {
+      crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+    }
   }
+  return crc;
+}
+
+void enviarTelemetria() {
+  char payload[80];
+  char crc[5];
+  
+  snprintf(payload, sizeof(payload), "FT,%d,%d,%d,%d,%d,%.2f,%.1f,%.1f,%d",
+           contadorLeituras, culturaAtual,
+           nitrogenioOK, fosforoOK, potassioOK,
+           phSolo, temperaturaAr, umidadeSolo, releLigado);
+  snprintf(crc, sizeof(crc), "%04X", crc16(payload));
   
-  Serial.println("═══════════════════════════════════════════════════════════════");
+  Serial.print('$');
+  Serial.print(payload);
+  Serial.print('*');
+  Serial.println(crc);
 }
 
 // ═══════════════════════════════════════════════════════════════════════════
@@ -836,37 +899,37 @@ void exibirStatus() {
 // ═══════════════════════════════════════════════════════════════════════════
 
 void exibirBanner() {
-  Serial.println("\n\n");
-  Serial.println("═══════════════════════════════════════════════════════════════");
-  Serial.println("  🚜 FARMTECH SOLUTIONS - SISTEMA DE IRRIGAÇÃO INTELIGENTE");
-  Serial.println("═══════════════════════════════════════════════════════════════");
-  Serial.println("  📡 Fase 2: Coleta de Dados e Automação");
-  Serial.println("  🌾 Culturas: Milho e Banana");
-  Serial.println("  📊 Sensores: NPK, pH (LDR), Umidade (DHT22), Relé");
-  Serial.println("═══════════════════════════════════════════════════════════════");
-  Serial.println("  👥 Grupo 59 FIAP - Outubro 2025");
-  Serial.println("═══════════════════════════════════════════════════════════════");
-  Serial.println();
+  Monitor.println("\n\n");
+  Monitor.println("═══════════════════════════════════════════════════════════════");
+  Monitor.println("  🚜 FARMTECH SOLUTIONS - SISTEMA DE IRRIGAÇÃO INTELIGENTE");
+  Monitor.println("═══════════════════════════════════════════════════════════════");
+  Monitor.println("  📡 Fase 2: Coleta de Dados e Automação");
+  Monitor.println("  🌾 Culturas: Milho e Banana");
+  Monitor.println("  📊 Sensores: NPK, pH (LDR), Umidade (DHT22), Relé");
+  Monitor.println("═══════════════════════════════════════════════════════════════");
+  Monitor.println("  👥 Grupo 59 FIAP - Outubro 2025");
+  Monitor.println("═══════════════════════════════════════════════════════════════");
+  Monitor.println();
 }
 
 void exibirRequisitosBanana() {
-  Serial.println("\n📋 REQUISITOS NUTRICIONAIS - BANANA 🍌:");
-  Serial.println("   🔵 Nitrogênio (N):  " + String(BANANA_N) + " g/m² (Alta)");
-  Serial.println("   🟡 Fósforo (P):     " + String(BANANA_P) + " g/m² (Média)");
-  Serial.println("   🟢 Potássio (K):    " + String(BANANA_K) + " g/m² (CRÍTICA!)");
-  Serial.println("\n   ⚠️ BANANA = EXTREMAMENTE EXIGENTE EM POTÁSSIO!");
-  Serial.println("   💡 K melhora sabor, tamanho e resistência ao transporte");
-  Serial.println("   📊 pH ideal: 5.5-7.5");
-  Serial.println("   💧 Umidade ideal: 60-70%");
+  Monitor.println("\n📋 REQUISITOS NUTRICIONAIS - BANANA 🍌:");
+  Monitor.println("   🔵 Nitrogênio (N):  " + String(BANANA_N) + " g/m² (Alta)");
+  Monitor.println("   🟡 Fósforo (P):     " + String(BANANA_P) + " g/m² (Média)");
+  Monitor.println("   🟢 Potássio (K):    " + String(BANANA_K) + " g/m² (CRÍTICA!)");
+  Monitor.println("\n   ⚠️ BANANA = EXTREMAMENTE EXIGENTE EM POTÁSSIO!");
+  Monitor.println("   💡 K melhora sabor, tamanho e resistência ao transporte");
+  Monitor.println("   📊 pH ideal: 5.5-7.5");
+  Monitor.println("   💧 Umidade ideal: 60-70%");
 }
 
 void exibirRequisitosMilho() {
-  Serial.println("\n📋 REQUISITOS NUTRICIONAIS - MILHO 🌽:");
-  Serial.println("   🔵 Nitrogênio (N):  " + String(MILHO_N) + " g/m² (CRÍTICA!)");
-  Serial.println("   🟡 Fósforo (P):     " + String(MILHO_P) + " g/m² (Alta)");
-  Serial.println("   🟢 Potássio (K):    " + String(MILHO_K) + " g/m² (Média)");
-  Serial.println("\n   ⚠️ MILHO = ALTA DEMANDA DE NITROGÊNIO!");
-  Serial.println("   💡 N fundamental para produção de grãos e proteínas");
-  Serial.println("   📊 pH ideal: 5.5-7.5");
-  Serial.println("   💧 Umidade ideal: 50-60%");
+  Monitor.println("\n📋 REQUISITOS NUTRICIONAIS - MILHO 🌽:");
+  Monitor.println("   🔵 Nitrogênio (N):  " + String(MILHO_N) + " g/m² (CRÍTICA!)");
+  Monitor.println("   🟡 Fósforo (P):     " + String(MILHO_P) + " g/m² (Alta)");
+  Monitor.println("   🟢 Potássio (K):    " + String(MILHO_K) + " g/m² (Média)");
+  Monitor.println("\n   ⚠️ MILHO = ALTA DEMANDA DE NITROGÊNIO!");
+  Monitor.println("   💡 N fundamental para produção de grãos e proteínas");
+  Monitor.println("   📊 pH ideal: 5.5-7.5");
+  Monitor.println("   💧 Umidade ideal: 50-60%");
 }
@@ -9,9 +9,249 @@ import serial
 import time
 import csv
 import json
+import binascii
 from datetime import datetime
 import re
 
+# Campos de uma leitura, na ordem em que o firmware imprime o bloco
+FRAME_FIELDS = ['nitrogenio', 'fosforo', 'potassio', 'ph_solo',
+                'temperatura', 'umidade_solo', 'irrigacao_ativa']
+
+# Cabeçalho "📊 LEITURA #12 - 60s" que abre cada bloco
+_FRAME_HEADER = b'LEITURA #'
+
+_FLAG_VALUES = {'✅'.encode(): 1, '❌'.encode(): 0, b'LIGADO': 1, b'DESLIGADO': 0}
+
+# Um bloco inteiro em um padrão pré-compilado, aplicado em bytes do rótulo
+# do nitrogênio ao fim da linha do relé (endpos). Os intervalos ".*" pulam
+# as linhas sem dados recuando do fim até o rótulo (busca por literal do
+# re, bem mais rápida que ".*?"); no bloco cada rótulo aparece uma vez, e
+# uma ocorrência em que o valor não casa ("pH do Solo:", "pH Base:") é
+# ignorada.
+_FRAME_START = 'Nitrogênio (N):'.encode()
+_FRAME_END = 'Relé:'.encode()
+_FRAME_RE = re.compile(
+    r'Nitrogênio \(N\): *(✅|❌)'
+    r'.*Fósforo \(P\): *(✅|❌)'
+    r'.*Potássio \(K\): *(✅|❌)'
+    r'.*pH(?: Final:)? (\d+(?:\.\d*)?)'
+    r'.*Temperatura: *(-?\d+(?:\.\d*)?)'
+    r'.*Umidade Solo: *(-?\d+(?:\.\d*)?)'
+    r'.*Relé:[^\n]*?(DESLIGADO|LIGADO)'.encode(),
+    re.DOTALL)
+
+# Do rótulo do nitrogênio ao relé cabem ~600 bytes; um bloco aberto maior
+# que isso sem fechar é descartado (rótulo fora de um bloco de leitura)
+MAX_FRAME_BYTES = 4096
+
+# Telemetria compacta do firmware (TELEMETRIA_COMPACTA=1), uma linha por leitura:
+#   $FT,<leitura>,<cultura>,<N>,<P>,<K>,<pH>,<temperatura>,<umidade>,<relé>*<CRC>
+# CRC-16/CCITT-FALSE em hexadecimal dos bytes entre '$' e '*'
+TELEMETRY_PREFIX = b'$FT,'
+TELEMETRY_CULTURAS = ['banana', 'milho']
+
+
+def telemetry_crc(payload):
+    """CRC-16/CCITT-FALSE (o mesmo de crc16() no firmware)"""
+    return binascii.crc_hqx(payload, 0xFFFF)
+
+
+def encode_telemetry(reading, seq, cultura='banana'):
+    """
+    Monta a linha compacta de uma leitura (como enviarTelemetria() no firmware)
+    
+    Args:
+        reading (dict): Leitura com os campos de FRAME_FIELDS
+        seq (int): Número da leitura no dispositivo
+        cultura (str): 'banana' ou 'milho'
+    
+    Returns:
+        bytes: Linha terminada em CRLF
+    """
+    payload = (f"FT,{seq},{TELEMETRY_CULTURAS.index(cultura)},"
+               f"{int(reading['nitrogenio'])},{int(reading['fosforo'])},"
+               f"{int(reading['potassio'])},{reading['ph_solo']:.2f},"
+               f"{reading['temperatura']:.1f},{reading['umidade_solo']:.1f},"
+               f"{int(reading['irrigacao_ativa'])}").encode('ascii')
+    return b'$' + payload + b'*%04X\r\n' % telemetry_crc(payload)
+
+
+def decode_telemetry(line):
+    """
+    Decodifica uma linha compacta
+    
+    Args:
+        line (bytes): Linha iniciada em '$FT,'
+    
+    Returns:
+        tuple: (seq, leitura) ou None se a linha estiver corrompida
+    """
+    line = line.rstrip()
+    star = line.rfind(b'*')
+    if star < 0:
+        return None
+    
+    payload = line[1:star]
+    try:
+        if int(line[star + 1:], 16) != telemetry_crc(payload):
+            return None
+        _, seq, cultura, n, p, k, ph, temp, umid, rele = payload.split(b',')
+        return int(seq), {
+            'nitrogenio': int(n),
+            'fosforo': int(p),
+            'potassio': int(k),
+            'ph_solo': float(ph),
+            'temperatura': float(temp),
+            'umidade_solo': float(umid),
+            'irrigacao_ativa': int(rele),
+            'cultura': TELEMETRY_CULTURAS[int(cultura)],
+        }
+    except (ValueError, IndexError):
+        return None
+
+
+class SensorFrameParser:
+    """
+    Parser incremental do Serial Monitor do ESP32
+    
+    O estado é o início do bloco ainda aberto no buffer. Cada feed procura
+    o rótulo do nitrogênio (bytes.find) e aplica _FRAME_RE uma vez ao
+    bloco: sem decodificar, sem regex linha a linha, e a leitura é montada
+    só quando o bloco fecha. Linhas entre o nitrogênio e o relé apenas se
+    acumulam; um cabeçalho de bloco antes do relé descarta o bloco parcial.
+    
+    Ao receber a primeira linha de telemetria compacta ($FT,...) o parser
+    passa a decodificar só esse formato; sem ela, segue no texto.
+    """
+    
+    def __init__(self):
+        """Inicializa o parser com o buffer vazio"""
+        self._buffer = b''
+        self.compact = False
+        self.crc_errors = 0
+        self.lost_frames = 0
+        self._last_seq = None
+    
+    def reset(self):
+        """Descarta o bloco parcial e volta a detectar o formato"""
+        self._buffer = b''
+        self.compact = False
+        self._last_seq = None
+    
+    def feed(self, data):
+        """
+        Processa bytes recebidos da porta serial
+        
+        Args:
+            data (bytes): Uma ou mais linhas em qualquer fatiamento (uma
+                          linha de read_until ou o buffer inteiro); str é aceita
+        
+        Returns:
+            list: Leituras (dict) dos blocos que fecharam
+        """
+        if data.__class__ is str:
+            data = data.encode('utf-8')
+        if self.compact:
+            return self._feed_telemetry(self._buffer + data)
+        
+        if data[-1:] == b'\n' and TELEMETRY_PREFIX not in data:
+            buffer = self._buffer
+            if not buffer:
+                if _FRAME_START not in data and _FRAME_HEADER not in data:
+                    # Linha completa fora de um bloco (a maioria, lendo
+                    # linha a linha): nada a guardar nem a extrair
+                    return []
+            elif (buffer[-1:] == b'\n' and _FRAME_END not in data
+                  and _FRAME_HEADER not in data and len(buffer) < MAX_FRAME_BYTES):
+                # Linha completa no meio do bloco: só acumula até o relé
+                self._buffer = buffer + data
+                return []
+        
+        buffer = self._buffer + data if self._buffer else data
+        if TELEMETRY_PREFIX in buffer:
+            self.compact = True
+            return self._feed_telemetry(buffer)
+        
+        readings = []
+        timestamp = None
+        pos = 0
+        size = len(buffer)
+        
+        while True:
+            start = buffer.find(_FRAME_START, pos)
+            if start < 0:
+                # Guarda só a última linha incompleta (rótulo pode estar partido)
+                pos = max(pos, buffer.rfind(b'\n', pos) + 1)
+                break
+            
+            rele = buffer.find(_FRAME_END, start)
+            end = buffer.find(b'\n', rele) if rele >= 0 else -1
+            header = buffer.find(_FRAME_HEADER, start, rele if end >= 0 else size)
+            if header >= 0:
+                # Bloco novo antes do relé: recomeça por ele
+                pos = header + len(_FRAME_HEADER)
+                continue
+            if end < 0:
+                if size - start > MAX_FRAME_BYTES:
+                    pos = start + len(_FRAME_START)
+                    continue
+                # Linha do relé ainda não chegou: espera o próximo feed
+                pos = start
+                break
+            
+            match = _FRAME_RE.match(buffer, start, end)
+            if match is None:
+                # Bloco sem algum dos campos
+                pos = start + len(_FRAME_START)
+                continue
+            
+            if timestamp is None:
+                # Blocos fechados no mesmo feed chegaram juntos
+                timestamp = datetime.now().isoformat()
+            n, p, k, ph, temperatura, umidade, relay = match.groups()
+            readings.append({
+                'nitrogenio': _FLAG_VALUES[n],
+                'fosforo': _FLAG_VALUES[p],
+                'potassio': _FLAG_VALUES[k],
+                'ph_solo': float(ph),
+                'temperatura': float(temperatura),
+                'umidade_solo': float(umidade),
+                'irrigacao_ativa': _FLAG_VALUES[relay],
+                'timestamp': timestamp,
+            })
+            pos = end
+        
+        self._buffer = buffer[pos:]
+        return readings
+    
+    def _feed_telemetry(self, buffer):
+        """Decodifica as linhas compactas completas do buffer"""
+        end = buffer.rfind(b'\n') + 1
+        self._buffer = buffer[end:]
+        
+        readings = []
+        start = buffer.find(TELEMETRY_PREFIX, 0, end)
+        while start >= 0:
+            line_end = buffer.find(b'\n', start)
+            decoded = decode_telemetry(buffer[start:line_end])
+            start = buffer.find(TELEMETRY_PREFIX, line_end, end)
+            
+            if decoded is None:
+                self.crc_errors += 1
+                continue
+            
+            seq, reading = decoded
+            # Sequência pulada = linhas perdidas (menor = dispositivo reiniciou)
+            if self._last_seq is not None and seq > self._last_seq + 1:
+                self.lost_frames += seq - self._last_seq - 1
+            self._last_seq = seq
+            
+            reading['timestamp'] = datetime.now().isoformat()
+            readings.append(reading)
+        
+        return readings
+
+
 class SerialDataCollector:
     """Coleta dados do ESP32 via Serial"""
     
@@ -27,6 +267,8 @@ class SerialDataCollector:
         self.baudrate = baudrate
         self.serial_conn = None
         self.data_buffer = []
+        self.parser = SensorFrameParser()
+        self._pending = []
         
     def connect(self):
         """Conecta à porta serial"""
@@ -39,9 +281,32 @@ class SerialDataCollector:
             print(f"❌ Erro ao conectar: {e}")
             return False
     
+    def read_reading(self):
+        """
+        Lê a porta até fechar uma leitura
+        
+        Cada read pega tudo o que já está no buffer da porta (ou espera o
+        próximo byte até o timeout), então uma porta com dados acumulados é
+        drenada em blocos. read_until do pyserial lê um byte por chamada e
+        custava mais que o próprio parser.
+        
+        Returns:
+            dict: Leitura completa, ou None se o timeout da porta expirou
+        """
+        while not self._pending:
+            data = self.serial_conn.read(max(1, self.serial_conn.in_waiting))
+            if not data:
+                return None
+            self._pending = self.parser.feed(data)
+        
+        return self._pending.pop(0)
+    
     def parse_sensor_data(self, line):
         """
-        Extrai dados de uma linha do Serial Monitor
+        Extrai dados de uma linha do Serial Monitor (parser legado)
+        
+        Mantido para compatibilidade e como referência do benchmark;
+        a coleta usa SensorFrameParser.
         
         Formato esperado:
         🧪 NPK - Níveis de Nutrientes:
@@ -50,7 +315,7 @@ class SerialDataCollector:
            🟢 Potássio (K):   ✅ OK
         
         🧪 pH do Solo:
-           📊 LDR Value: 2048 → pH 6.5
+           📊 LDR Value: 2048 → pH Base: 6.50 → pH Final: 6.50
         
         🌡️ Condições Ambientais:
            🌡️  Temperatura: 25.3 °C ✅ IDEAL
@@ -82,8 +347,8 @@ class SerialDataCollector:
         if 'Potássio' in line:
             data['potassio'] = 1 if '✅ OK' in line else 0
         
-        # Parse pH
-        ph_match = re.search(r'pH (\d+\.?\d*)', line)
+        # Parse pH ("pH 6.5" ou "pH Final: 6.52" do firmware atual)
+        ph_match = re.search(r'pH(?: Final:)? (\d+\.?\d*)', line)
         if ph_match:
             data['ph_solo'] = float(ph_match.group(1))
         
@@ -122,43 +387,28 @@ class SerialDataCollector:
         start_time = time.time()
         end_time = start_time + (duration_minutes * 60)
         
-        current_reading = {}
-        
         try:
             with open(output_file, 'w', newline='') as csvfile:
                 fieldnames = ['timestamp', 'temperatura', 'umidade_solo', 'ph_solo',
                             'nitrogenio', 'fosforo', 'potassio', 'irrigacao_ativa']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
                 writer.writeheader()
                 
                 while time.time() < end_time:
-                    if self.serial_conn.in_waiting > 0:
-                        line = self.serial_conn.readline().decode('utf-8', errors='ignore').strip()
-                        
-                        if line:
-                            # Parse linha
-                            parsed = self.parse_sensor_data(line)
-                            
-                            # Atualiza reading atual
-                            for key, value in parsed.items():
-                                if value is not None:
-                                    current_reading[key] = value
-                            
-                            # Se temos todos os dados, salva
-                            if all(current_reading.get(k) is not None for k in fieldnames):
-                                writer.writerow(current_reading)
-                                csvfile.flush()
-                                
-                                # Mostra progresso
-                                elapsed = (time.time() - start_time) / 60
-                                print(f"⏱️  {elapsed:.1f}min | "
-                                      f"Temp: {current_reading['temperatura']}°C | "
-                                      f"Umid: {current_reading['umidade_solo']}% | "
-                                      f"pH: {current_reading['ph_solo']}")
-                                
-                                current_reading = {}
+                    # Bloqueia até o bloco fechar (ou o timeout de 1s da porta)
+                    current_reading = self.read_reading()
+                    if current_reading is None:
+                        continue
+                    
+                    writer.writerow(current_reading)
+                    csvfile.flush()
                     
-                    time.sleep(0.1)
+                    # Mostra progresso
+                    elapsed = (time.time() - start_time) / 60
+                    print(f"⏱️  {elapsed:.1f}min | "
+                          f"Temp: {current_reading['temperatura']}°C | "
+                          f"Umid: {current_reading['umidade_solo']}% | "
+                          f"pH: {current_reading['ph_solo']}")
         
         except KeyboardInterrupt:
             print("\n⚠️  Coleta interrompida pelo usuário")
@@ -176,6 +426,113 @@ class SerialDataCollector:
             print("🔌 Desconectado")
 
 
+def _sample_frame(index):
+    """Bloco de leitura no formato impresso pelo firmware (src/main.cpp)"""
+    rele = "⚡ LIGADO (irrigando)" if index % 2 else "⏸️ DESLIGADO"
+    lines = [
+        "═══════════════════════════════════════════════════════════════",
+        f"  📊 LEITURA #{index} - {index * 5}s",
+        "═══════════════════════════════════════════════════════════════",
+        "",
+        "🧪 NPK - Níveis de Nutrientes:",
+        "   🔵 Nitrogênio (N): ✅ OK",
+        "   🟡 Fósforo (P):    ❌ BAIXO",
+        "   🟢 Potássio (K):   ✅ OK [CRÍTICO p/ banana]",
+        "",
+        "   📋 Status NPK: ✅ ADEQUADO para a cultura",
+        "",
+        "🧪 pH do Solo:",
+        f"   📊 LDR Value: {2000 + index % 90} → pH Base: 6.52 → pH Final: 6.52",
+        "",
+        "   📋 Status: 🟩 NEUTRO (5.5-7.5) - IDEAL",
+        "",
+        "🌡️ Condições Ambientais:",
+        f"   🌡️  Temperatura: {20 + index % 15}.4 °C ✅ IDEAL",
+        f"   💧 Umidade Solo: {40 + index % 30}.2 % ⚠️ ABAIXO DO IDEAL",
+        "",
+        "💧 Sistema de Irrigação:",
+        f"   🔌 Relé: {rele}",
+        "   🤖 Modo: AUTOMÁTICO ✅",
+        "",
+        "💡 Recomendações:",
+        "   💧 Irrigação necessária AGORA",
+        "═══════════════════════════════════════════════════════════════",
+    ]
+    return [(line + "\r\n").encode('utf-8') for line in lines]
+
+
+def benchmark_parser(frames=2000):
+    """
+    Compara o parser legado (parse_sensor_data) com o SensorFrameParser
+    
+    Args:
+        frames (int): Blocos de leitura processados por cada parser
+    
+    Returns:
+        dict: Linhas/s de cada parser e o ganho
+    """
+    lines = [line for index in range(frames) for line in _sample_frame(index)]
+    
+    # Legado: o laço que collect_data usava (sem o sleep de 100 ms); com o
+    # "pH Final:" reconhecido ele fecha as mesmas leituras que o parser novo
+    collector = SerialDataCollector()
+    fieldnames = ['timestamp', *FRAME_FIELDS]
+    legacy_readings = 0
+    current = {}
+    start = time.perf_counter()
+    for raw in lines:
+        line = raw.decode('utf-8', errors='ignore').strip()
+        if not line:
+            continue
+        for key, value in collector.parse_sensor_data(line).items():
+            if value is not None:
+                current[key] = value
+        if all(current.get(k) is not None for k in fieldnames):
+            legacy_readings += 1
+            current = {}
+    legacy_time = time.perf_counter() - start
+    
+    # Parser incremental, uma linha por feed (porta ociosa)
+    parser = SensorFrameParser()
+    start = time.perf_counter()
+    for raw in lines:
+        parser.feed(raw)
+    line_time = time.perf_counter() - start
+    
+    # Parser incremental em blocos de 4 KiB (porta com dados acumulados)
+    stream = b''.join(lines)
+    parser = SensorFrameParser()
+    readings = 0
+    start = time.perf_counter()
+    for offset in range(0, len(stream), 4096):
+        readings += len(parser.feed(stream[offset:offset + 4096]))
+    parser_time = time.perf_counter() - start
+    
+    # Mesmas leituras em telemetria compacta, também em blocos de 4 KiB
+    compact = b''.join(encode_telemetry(reading, index)
+                       for index, reading in enumerate(SensorFrameParser().feed(stream)))
+    parser = SensorFrameParser()
+    start = time.perf_counter()
+    for offset in range(0, len(compact), 4096):
+        parser.feed(compact[offset:offset + 4096])
+    compact_time = time.perf_counter() - start
+    
+    return {
+        'linhas': len(lines),
+        'leituras': readings,
+        'leituras_legado': legacy_readings,
+        'legado_linhas_s': len(lines) / legacy_time,
+        'linha_a_linha_s': len(lines) / line_time,
+        'parser_linhas_s': len(lines) / parser_time,
+        'ganho': legacy_time / parser_time,
+        'ganho_linha_a_linha': legacy_time / line_time,
+        'bytes_texto': len(stream) / frames,
+        'bytes_compacto': len(compact) / frames,
+        'texto_leituras_s': frames / parser_time,
+        'compacto_leituras_s': frames / compact_time,
+    }
+
+
 def listar_portas_disponiveis():
     """Lista todas as portas seriais disponíveis"""
     import serial.tools.list_ports
@@ -189,8 +546,25 @@ def listar_portas_disponiveis():
 
 
 if __name__ == "__main__":
+    import sys
+    
     print("🌾 FarmTech Solutions - Coletor de Dados Serial\n")
     
+    # --bench: microbenchmark do parser (não precisa de porta serial)
+    if '--bench' in sys.argv:
+        result = benchmark_parser()
+        print(f"📏 {result['linhas']} linhas, {result['leituras']} leituras "
+              f"(legado: {result['leituras_legado']})")
+        print(f"   Legado: {result['legado_linhas_s']:,.0f} linhas/s")
+        print(f"   SensorFrameParser (linha a linha): {result['linha_a_linha_s']:,.0f} linhas/s "
+              f"({result['ganho_linha_a_linha']:.1f}x)")
+        print(f"   SensorFrameParser (blocos de 4 KiB): {result['parser_linhas_s']:,.0f} linhas/s "
+              f"({result['ganho']:.1f}x)")
+        print(f"\n📦 Telemetria compacta ($FT,...*CRC) vs texto:")
+        print(f"   Bytes por leitura: {result['bytes_compacto']:.0f} vs {result['bytes_texto']:.0f}")
+        print(f"   Leituras/s: {result['compacto_leituras_s']:,.0f} vs {result['texto_leituras_s']:,.0f}")
+        exit(0)
+    
     # Lista portas disponíveis
     portas = listar_portas_disponiveis()
     
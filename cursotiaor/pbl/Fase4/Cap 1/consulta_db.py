@@ -11,6 +11,8 @@ import sys
 from pathlib import Path
 from datetime import datetime
 
+from database.queries import DASHBOARD_QUERIES
+
 # Configurar encoding UTF-8
 sys.stdout.reconfigure(encoding='utf-8')
 
@@ -64,22 +66,7 @@ def exibir_ultimas_leituras(conn, limit=10):
     print(f"📊 ÚLTIMAS {limit} LEITURAS DE SENSORES")
     print("="*80)
     
-    cursor.execute(f"""
-        SELECT 
-            id,
-            timestamp,
-            temperatura,
-            umidade_solo,
-            ph_solo,
-            nitrogenio,
-            fosforo,
-            potassio,
-            irrigacao_ativa,
-            cultura
-        FROM sensor_readings
-        ORDER BY timestamp DESC
-        LIMIT {limit}
-    """)
+    cursor.execute(DASHBOARD_QUERIES['recent_readings']['sql'], (limit,))
     
     leituras = cursor.fetchall()
     
@@ -107,22 +94,7 @@ def exibir_acoes_irrigacao(conn, limit=10):
     print(f"💧 ÚLTIMAS {limit} AÇÕES DE IRRIGAÇÃO")
     print("="*80)
     
-    cursor.execute(f"""
-        SELECT 
-            i.id,
-            i.timestamp,
-            i.acao,
-            i.motivo,
-            i.volume_aplicado,
-            i.duracao_minutos,
-            s.temperatura,
-            s.umidade_solo,
-            s.cultura
-        FROM irrigation_actions i
-        JOIN sensor_readings s ON i.reading_id = s.id
-        ORDER BY i.timestamp DESC
-        LIMIT {limit}
-    """)
+    cursor.execute(DASHBOARD_QUERIES['recent_actions']['sql'], (limit,))
     
     acoes = cursor.fetchall()
     
@@ -147,23 +119,7 @@ def exibir_previsoes(conn, limit=5):
     print(f"🔮 ÚLTIMAS {limit} PREVISÕES DE MACHINE LEARNING")
     print("="*80)
     
-    cursor.execute(f"""
-        SELECT 
-            p.id,
-            p.timestamp,
-            p.volume_irrigacao,
-            p.dosagem_n,
-            p.dosagem_p,
-            p.dosagem_k,
-            p.rendimento_estimado,
-            p.confianca,
-            p.modelo_versao,
-            s.cultura
-        FROM predictions p
-        JOIN sensor_readings s ON p.reading_id = s.id
-        ORDER BY p.timestamp DESC
-        LIMIT {limit}
-    """)
+    cursor.execute(DASHBOARD_QUERIES['recent_predictions']['sql'], (limit,))
     
     previsoes = cursor.fetchall()
     
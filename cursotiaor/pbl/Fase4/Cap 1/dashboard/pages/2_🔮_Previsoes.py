@@ -213,14 +213,7 @@ st.subheader("📈 Histórico de Previsões")
 
 @st.cache_data(ttl=10)
 def load_predictions():
-    query = """
-    SELECT p.*, s.temperatura, s.umidade_solo, s.ph_solo
-    FROM predictions p
-    JOIN sensor_readings s ON p.reading_id = s.id
-    ORDER BY p.timestamp DESC
-    LIMIT 50
-    """
-    return pd.read_sql_query(query, db.conn)
+    return db.run_query('predictions_history', (50,))
 
 try:
     df_pred = load_predictions()
@@ -13,7 +13,8 @@ import sys
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
-from database.database_manager import FarmTechDatabase
+from database.database_manager import FarmTechDatabase, ROLLUP_METRICS
+from database.retention import load_retention_policy
 
 st.set_page_config(page_title="Tendências - FarmTech", page_icon="📈", layout="wide")
 
@@ -42,49 +43,111 @@ with col2:
         ["Todas", "banana", "milho"]
     )
 
+# Períodos -> (janela, granularidade do rollup usado nos indicadores)
+PERIODOS_ROLLUP = {
+    "Últimas 24 horas": (pd.Timedelta(hours=24), 'minute'),
+    "Últimos 7 dias": (pd.Timedelta(days=7), 'hour'),
+    "Últimos 30 dias": (pd.Timedelta(days=30), 'hour'),
+    "Todos": (None, 'day')
+}
+
+@st.cache_data(ttl=300)
+def load_retencao_bruta():
+    """Prazo das leituras brutas na política de retenção em vigor (None = sem limite)"""
+    dias = load_retention_policy(db).get('sensor_readings')
+    return None if dias is None else pd.Timedelta(days=dias)
+
+def usa_rollups(periodo_sel):
+    """
+    Período maior que a retenção das leituras brutas
+    
+    A retenção apaga as leituras brutas depois do prazo; períodos mais
+    longos são montados com as médias dos rollups.
+    """
+    janela = PERIODOS_ROLLUP[periodo_sel][0]
+    retencao = load_retencao_bruta()
+    return janela is None or (retencao is not None and janela > retencao)
+
 @st.cache_data(ttl=30)
 def load_time_series_data(periodo_sel, cultura_sel):
-    query = """
-    SELECT 
-        s.id,
-        s.timestamp,
-        s.temperatura,
-        s.umidade_solo,
-        s.ph_solo,
-        s.nitrogenio as nitrogenio_ok,
-        s.fosforo as fosforo_ok,
-        s.potassio as potassio_ok,
-        s.irrigacao_ativa,
-        s.cultura,
-        i.duracao_minutos,
-        i.volume_aplicado as volume_litros
-    FROM sensor_readings s
-    LEFT JOIN irrigation_actions i ON s.id = i.reading_id
-    ORDER BY s.timestamp
-    """
-    df = pd.read_sql_query(query, db.conn)
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    janela, granularidade = PERIODOS_ROLLUP[periodo_sel]
+    if usa_rollups(periodo_sel):
+        return load_rollup_series(janela, granularidade, cultura_sel)
     
-    # Filtrar por período
-    if periodo_sel == "Últimas 24 horas":
-        df = df[df['timestamp'] >= df['timestamp'].max() - pd.Timedelta(hours=24)]
-    elif periodo_sel == "Últimos 7 dias":
-        df = df[df['timestamp'] >= df['timestamp'].max() - pd.Timedelta(days=7)]
-    elif periodo_sel == "Últimos 30 dias":
-        df = df[df['timestamp'] >= df['timestamp'].max() - pd.Timedelta(days=30)]
+    # Período e cultura filtrados no SQL (índice cultura+timestamp)
+    start = '1970-01-01 00:00:00'  # sem limite inferior
+    ultimo = db.run_query('latest_timestamp').iloc[0, 0]
+    if pd.notna(ultimo):
+        start = (pd.to_datetime(ultimo) - janela).strftime('%Y-%m-%d %H:%M:%S')
     
-    # Filtrar por cultura
     if cultura_sel != "Todas":
-        df = df[df['cultura'] == cultura_sel]
+        df = db.run_query('time_series_cultura', (cultura_sel, start))
+    else:
+        df = db.run_query('time_series', (start,))
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    df['npk_adequado'] = (df['nitrogenio_ok'] & df['fosforo_ok'] & df['potassio_ok']).astype(int)
+    
+    return df
+
+def load_rollup_series(janela, granularidade, cultura_sel):
+    """Série com um ponto por bucket do rollup (culturas somadas antes das médias)"""
+    cultura = None if cultura_sel == "Todas" else cultura_sel
+    
+    start = None
+    if janela is not None:
+        ultimo_bucket = db.get_latest_rollup_bucket(granularidade)
+        if ultimo_bucket is not None:
+            start = (pd.to_datetime(ultimo_bucket) - janela).strftime('%Y-%m-%d %H:%M:%S')
+    
+    rollups = db.get_rollups(granularidade, start=start, cultura=cultura)
+    
+    agregacoes = {'n': 'sum', 'npk_ok': 'sum', 'irrigacoes': 'sum'}
+    for metrica in ROLLUP_METRICS:
+        agregacoes[f'{metrica}_sum'] = 'sum'
+    buckets = rollups.groupby('bucket', as_index=False).agg(agregacoes)
+    
+    df = pd.DataFrame({'timestamp': pd.to_datetime(buckets['bucket'])})
+    for metrica in ROLLUP_METRICS:
+        df[metrica] = buckets[f'{metrica}_sum'] / buckets['n']
+    df['npk_adequado'] = (buckets['npk_ok'] / buckets['n']).round().astype(int)
+    df['irrigacoes'] = buckets['irrigacoes']
+    df['cultura'] = cultura_sel
+    # Duração e volume ficam nas ações de irrigação, apagadas com as leituras
+    df['duracao_minutos'] = float('nan')
+    df['volume_litros'] = float('nan')
     
     return df
 
+@st.cache_data(ttl=30)
+def load_period_summary(periodo_sel, cultura_sel):
+    """Indicadores do período calculados a partir dos rollups"""
+    janela, granularidade = PERIODOS_ROLLUP[periodo_sel]
+    cultura = None if cultura_sel == "Todas" else cultura_sel
+    
+    start = None
+    if janela is not None:
+        ultimo_bucket = db.get_latest_rollup_bucket('minute')
+        if ultimo_bucket is not None:
+            start = pd.to_datetime(ultimo_bucket) - janela
+            start = start.floor('h' if granularidade == 'hour' else 'min')
+            start = start.strftime('%Y-%m-%d %H:%M:%S')
+    
+    return db.get_rollup_summary(granularidade, start=start, cultura=cultura)
+
 try:
     df = load_time_series_data(periodo, cultura_filtro)
+    resumo = load_period_summary(periodo, cultura_filtro)
     
     if df.empty:
         st.warning("⚠️ Nenhum dado disponível para o período selecionado.")
     else:
+        retencao = load_retencao_bruta()
+        if usa_rollups(periodo):
+            prazo = (f"Leituras brutas são mantidas por {retencao.days} dias: as"
+                     if retencao is not None else "As")
+            st.caption(f"ℹ️ {prazo} séries deste período usam as médias por "
+                       f"{'hora' if PERIODOS_ROLLUP[periodo][1] == 'hour' else 'dia'} dos rollups")
+        
         # Estatísticas do período
         st.subheader("📊 Estatísticas do Período")
         
@@ -92,23 +155,23 @@ try:
         
         col1.metric(
             "📝 Total de Leituras",
-            f"{len(df):,}",
+            f"{resumo['total_leituras']:,}",
             help="Número de medições realizadas"
         )
         
         col2.metric(
             "🌡️ Temp. Média",
-            f"{df['temperatura'].mean():.1f}°C",
+            f"{resumo['temperatura_media']:.1f}°C",
             help="Temperatura média do período"
         )
         
         col3.metric(
             "💧 Umidade Média",
-            f"{df['umidade_solo'].mean():.1f}%",
+            f"{resumo['umidade_solo_media']:.1f}%",
             help="Umidade média do solo"
         )
         
-        irrigacoes = df['duracao_minutos'].notna().sum()
+        irrigacoes = resumo['irrigacoes']
         col4.metric(
             "🚰 Irrigações",
             f"{irrigacoes}",
@@ -118,7 +181,7 @@ try:
         volume_total = df['volume_litros'].sum() if 'volume_litros' in df else 0
         col5.metric(
             "💦 Volume Total",
-            f"{volume_total:.0f} L",
+            "n/d" if usa_rollups(periodo) else f"{volume_total:.0f} L",
             help="Volume total irrigado"
         )
         
@@ -218,7 +281,6 @@ try:
         
         with col2:
             # pH vs NPK
-            df['npk_adequado'] = (df['nitrogenio_ok'] & df['fosforo_ok'] & df['potassio_ok']).astype(int)
             fig2 = px.box(
                 df,
                 x='npk_adequado',
@@ -259,6 +321,11 @@ try:
                         title='💦 Volume por Cultura'
                     )
                     st.plotly_chart(fig4, use_container_width=True)
+        elif usa_rollups(periodo):
+            disponivel = (f"só ficam disponíveis nos últimos {retencao.days} dias"
+                          if retencao is not None else "não entram nos rollups")
+            st.info(f"🚰 {resumo['irrigacoes']} irrigações no período. Duração e volume "
+                    f"{disponivel}.")
         else:
             st.info("Nenhuma irrigação registrada no período selecionado.")
         
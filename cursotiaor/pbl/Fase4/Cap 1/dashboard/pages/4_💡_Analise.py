@@ -29,26 +29,7 @@ st.markdown("---")
 
 @st.cache_data(ttl=60)
 def load_analysis_data():
-    query = """
-    SELECT 
-        s.id,
-        s.timestamp,
-        s.temperatura,
-        s.umidade_solo,
-        s.ph_solo,
-        s.nitrogenio as nitrogenio_ok,
-        s.fosforo as fosforo_ok,
-        s.potassio as potassio_ok,
-        s.irrigacao_ativa,
-        s.cultura,
-        i.duracao_minutos,
-        i.volume_aplicado as volume_litros,
-        i.motivo as motivo_irrigacao
-    FROM sensor_readings s
-    LEFT JOIN irrigation_actions i ON s.id = i.reading_id
-    ORDER BY s.timestamp DESC
-    """
-    df = pd.read_sql_query(query, db.conn)
+    df = db.run_query('analysis_data')
     df['timestamp'] = pd.to_datetime(df['timestamp'])
     return df
 
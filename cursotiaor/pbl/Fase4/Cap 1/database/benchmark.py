@@ -0,0 +1,344 @@
+"""
+FarmTech Solutions - Benchmark de Ingestão
+==========================================
+Mede vazão e latência da ingestão (FarmTechDatabase + AutoIngestion) com
+leituras sintéticas (SyntheticSource) em cada configuração de
+BENCHMARK_CONFIGS: modo de gravação, tamanho do lote, perfil de
+armazenamento (journal WAL/DELETE, synchronous) e backend.
+
+Por configuração:
+- leituras/s gravadas
+- latência p50/p95/p99 de cada gravação (um ciclo ou um lote)
+- crescimento do banco em disco (bytes e bytes por leitura)
+- pico de memória (RSS) do processo
+
+Cada configuração roda em um subprocesso próprio (o pico de RSS é só
+dela). O resultado em JSON serve de base para comparar versões:
+
+Uso:
+    python database/benchmark.py                     # todas as configurações
+    python database/benchmark.py wal_lote_500 legacy_ciclo --readings 20000
+    python database/benchmark.py --rate 500 --output bench-v1.json
+    python database/benchmark.py --compare bench-v1.json --tolerance 0.2
+    python database/benchmark.py --list
+
+postgres_lote_500 só roda com $FARMTECH_PG_DSN (grava no banco informado).
+"""
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from database.database_manager import AutoIngestion, BASE_DIR, open_database
+from database.logs import configure_logging
+
+# Versão do formato do JSON de resultados
+BENCHMARK_FORMAT = 1
+
+# Configurações medidas:
+# modo 'ciclo' = AutoIngestion.ingest_cycle (leitura, previsão e ação, 3 commits)
+# modo 'lote' = insert_readings_batch direto, batch_size leituras por transação
+# modo 'pipeline' = AutoIngestion.start_pipeline (produtor/previsão/gravação)
+BENCHMARK_CONFIGS = {
+    'legacy_ciclo': {'storage_profile': 'legacy', 'modo': 'ciclo', 'max_leituras': 2000},
+    'wal_ciclo': {'storage_profile': 'default', 'modo': 'ciclo', 'max_leituras': 5000},
+    'wal_lote_100': {'storage_profile': 'default', 'modo': 'lote', 'batch_size': 100},
+    'wal_lote_500': {'storage_profile': 'default', 'modo': 'lote', 'batch_size': 500},
+    'wal_full_lote_500': {'storage_profile': {'synchronous': 'FULL'},
+                          'modo': 'lote', 'batch_size': 500},
+    'wal_off_lote_500': {'storage_profile': {'synchronous': 'OFF'},
+                         'modo': 'lote', 'batch_size': 500},
+    'legacy_lote_500': {'storage_profile': 'legacy', 'modo': 'lote', 'batch_size': 500},
+    'edge_lote_500': {'storage_profile': 'edge', 'modo': 'lote', 'batch_size': 500},
+    'wal_pipeline_500': {'storage_profile': 'default', 'modo': 'pipeline', 'batch_size': 500},
+    'particionado_lote_500': {'backend': 'partitioned', 'storage_profile': 'default',
+                              'modo': 'lote', 'batch_size': 500},
+    'postgres_lote_500': {'backend': 'postgres', 'modo': 'lote', 'batch_size': 500},
+}
+
+
+def _percentiles(values):
+    """p50/p95/p99/máximo em milissegundos"""
+    if not values:
+        return None
+    values_ms = np.asarray(values) * 1000
+    p50, p95, p99 = np.percentile(values_ms, [50, 95, 99])
+    return {'p50': round(float(p50), 3), 'p95': round(float(p95), 3),
+            'p99': round(float(p99), 3), 'max': round(float(values_ms.max()), 3)}
+
+
+def _peak_rss_mb():
+    """Pico de memória residente do processo (None sem o módulo resource)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KiB, macOS em bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _storage_bytes(db, data_dir):
+    """Espaço ocupado pelo banco (arquivos do diretório ou o banco PostgreSQL)"""
+    if data_dir is None:
+        return db._fetchone("SELECT pg_database_size(current_database())")[0]
+    return sum(path.stat().st_size for path in Path(data_dir).rglob('*') if path.is_file())
+
+
+def _count_readings(db):
+    return db._fetchone("SELECT COUNT(*) FROM sensor_readings")[0]
+
+
+def _timed(function, latencies):
+    """Envolve function anotando a duração de cada chamada em latencies"""
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - started)
+    return wrapper
+
+
+def run_benchmark(name, readings=5000, rate=None, devices=4):
+    """
+    Mede uma configuração em um banco temporário
+
+    Args:
+        name (str): Nome em BENCHMARK_CONFIGS
+        readings (int): Leituras geradas (limitado por 'max_leituras')
+        rate (float): Leituras por segundo da fonte (None = sem pausa)
+        devices (int): Dispositivos simulados
+
+    Returns:
+        dict: Configuração e métricas
+    """
+    config = BENCHMARK_CONFIGS[name]
+    backend = config.get('backend', 'sqlite')
+    mode = config['modo']
+    batch_size = config.get('batch_size', 1)
+    readings = min(readings, config.get('max_leituras', readings))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if backend == 'postgres':
+            db, data_dir = open_database(backend), None
+        else:
+            db = open_database(backend, db_path=Path(tmp_dir) / 'farmtech_bench.db',
+                               storage_profile=config.get('storage_profile', 'default'))
+            data_dir = tmp_dir
+
+        # device_id único: no PostgreSQL o banco persiste entre execuções
+        ingestion = AutoIngestion(db, data_source='synthetic', rate=rate, devices=devices,
+                                  max_readings=readings,
+                                  device_prefix=f"bench-{uuid.uuid4().hex[:8]}", seed=42)
+        size_before = _storage_bytes(db, data_dir)
+        count_before = _count_readings(db)
+        latencies = []
+
+        started = time.perf_counter()
+        if mode == 'ciclo':
+            ingestion.is_running = True
+            cycle = _timed(ingestion.ingest_cycle, latencies)
+            while ingestion.is_running:
+                cycle()
+            # O último ciclo só detecta o fim da fonte
+            latencies.pop()
+        elif mode == 'lote':
+            insert = _timed(db.insert_readings_batch, latencies)
+            batch = []
+            while True:
+                sensor_data = ingestion.read_sensor_data()
+                if sensor_data is not None:
+                    prediction = ingestion.predict_with_model(sensor_data)
+                    batch.append(ingestion._build_batch_item(sensor_data, prediction))
+                if batch and (sensor_data is None or len(batch) >= batch_size):
+                    insert(batch)
+                    batch = []
+                if sensor_data is None:
+                    break
+        elif mode == 'pipeline':
+            db.insert_readings_batch = _timed(db.insert_readings_batch, latencies)
+            ingestion.start_pipeline(batch_size=batch_size, flush_interval=1.0,
+                                     max_readings=readings)
+        else:
+            raise ValueError(f"Modo de benchmark desconhecido: {mode}")
+        elapsed = time.perf_counter() - started
+
+        stored = _count_readings(db) - count_before
+        growth = _storage_bytes(db, data_dir) - size_before
+        db.close()
+
+    return {
+        'nome': name,
+        'backend': backend,
+        'modo': mode,
+        'batch_size': batch_size,
+        'storage_profile': config.get('storage_profile'),
+        'leituras': stored,
+        'taxa_alvo': rate,
+        'segundos': round(elapsed, 3),
+        'leituras_por_s': round(stored / elapsed, 1) if elapsed else None,
+        'gravacoes': len(latencies),
+        'latencia_ms': _percentiles(latencies),
+        'crescimento_bytes': growth,
+        'bytes_por_leitura': round(growth / stored, 1) if stored else None,
+        'rss_pico_mb': _peak_rss_mb(),
+    }
+
+
+def _run_isolated(name, readings, rate, devices):
+    """Roda uma configuração em um subprocesso e lê o JSON da saída"""
+    command = [sys.executable, str(Path(__file__).resolve()), name, '--in-process',
+               '--readings', str(readings), '--devices', str(devices), '--output', '-']
+    if rate:
+        command += ['--rate', str(rate)]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{name}: {completed.stderr.strip().splitlines()[-1:]}")
+    return json.loads(completed.stdout)['resultados'][0]
+
+
+def _environment():
+    """Versões e máquina, para comparar resultados entre execuções"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def run_suite(names, readings=5000, rate=None, devices=4, isolate=True):
+    """
+    Mede várias configurações
+
+    Returns:
+        dict: Relatório no formato do JSON de resultados
+    """
+    results = []
+    for name in names:
+        if BENCHMARK_CONFIGS[name].get('backend') == 'postgres' \
+                and not os.environ.get('FARMTECH_PG_DSN'):
+            print(f"⏭️ {name}: defina FARMTECH_PG_DSN para medir o PostgreSQL",
+                  file=sys.stderr)
+            continue
+        if isolate:
+            results.append(_run_isolated(name, readings, rate, devices))
+        else:
+            results.append(run_benchmark(name, readings, rate, devices))
+
+    return {
+        'formato': BENCHMARK_FORMAT,
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'ambiente': _environment(),
+        'parametros': {'leituras': readings, 'taxa': rate, 'dispositivos': devices},
+        'resultados': results,
+    }
+
+
+def compare_reports(report, baseline, tolerance=0.2):
+    """
+    Compara um relatório com outro de referência
+
+    Regressão: vazão abaixo de (1 - tolerance) × referência ou latência
+    p99 acima de (1 + tolerance) × referência.
+
+    Returns:
+        list: (nome, leituras/s atual, referência, p99 atual, referência, regrediu)
+    """
+    reference = {result['nome']: result for result in baseline['resultados']}
+    rows = []
+    for result in report['resultados']:
+        base = reference.get(result['nome'])
+        if base is None:
+            continue
+        p99 = (result['latencia_ms'] or {}).get('p99')
+        base_p99 = (base['latencia_ms'] or {}).get('p99')
+        regressed = (result['leituras_por_s'] < base['leituras_por_s'] * (1 - tolerance)
+                     or (p99 is not None and base_p99 is not None
+                         and p99 > base_p99 * (1 + tolerance)))
+        rows.append((result['nome'], result['leituras_por_s'], base['leituras_por_s'],
+                     p99, base_p99, regressed))
+    return rows
+
+
+def print_report(report):
+    """Imprime o relatório como tabela"""
+    print(f"\n⏱️ Benchmark de ingestão ({report['parametros']['leituras']} leituras, "
+          f"taxa: {report['parametros']['taxa'] or 'máxima'})")
+    print(f"   {'configuração':<22} {'leituras/s':>10} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'B/leitura':>9} {'RSS MB':>7}")
+    for result in report['resultados']:
+        latency = result['latencia_ms'] or {}
+        print(f"   {result['nome']:<22} {result['leituras_por_s']:>10.0f} "
+              f"{latency.get('p50', 0):>8.2f} {latency.get('p99', 0):>8.2f} "
+              f"{result['bytes_por_leitura'] or 0:>9.0f} {result['rss_pico_mb'] or 0:>7.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de ingestão do FarmTech")
+    parser.add_argument('configs', nargs='*', help="Configurações (padrão: todas)")
+    parser.add_argument('--readings', type=int, default=5000, help="Leituras por configuração")
+    parser.add_argument('--rate', type=float, help="Leituras/s da fonte (padrão: máxima)")
+    parser.add_argument('--devices', type=int, default=4, help="Dispositivos simulados")
+    parser.add_argument('--output', help="Grava o relatório JSON ('-' = saída padrão)")
+    parser.add_argument('--compare', help="JSON de referência para detectar regressões")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Variação aceita na comparação (0.2 = 20%%)")
+    parser.add_argument('--in-process', action='store_true',
+                        help="Roda no mesmo processo (RSS vira o pico acumulado)")
+    parser.add_argument('--list', action='store_true', help="Lista as configurações")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, config in BENCHMARK_CONFIGS.items():
+            print(f"{name:<22} {config}")
+        sys.exit(0)
+
+    unknown = [name for name in args.configs if name not in BENCHMARK_CONFIGS]
+    if unknown:
+        parser.error(f"configurações desconhecidas: {', '.join(unknown)}")
+
+    # Só avisos no console e nada em farmtech.log: o log não entra na medida
+    configure_logging(level='WARNING', force=True)
+
+    report = run_suite(args.configs or list(BENCHMARK_CONFIGS), readings=args.readings,
+                       rate=args.rate, devices=args.devices, isolate=not args.in_process)
+
+    if args.output == '-':
+        json.dump(report, sys.stdout)
+        sys.exit(0)
+
+    print_report(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False),
+                                     encoding='utf-8')
+        print(f"\n💾 Relatório salvo em {args.output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        rows = compare_reports(report, baseline, args.tolerance)
+        print(f"\n📊 Comparação com {args.compare} (tolerância {args.tolerance:.0%}):")
+        for name, rate_now, rate_base, p99, base_p99, regressed in rows:
+            print(f"   {'❌' if regressed else '✅'} {name}: {rate_now:.0f} vs {rate_base:.0f} "
+                  f"leituras/s, p99 {p99} vs {base_p99} ms")
+        sys.exit(1 if any(row[-1] for row in rows) else 0)
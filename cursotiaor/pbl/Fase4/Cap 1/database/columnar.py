@@ -0,0 +1,294 @@
+"""
+FarmTech Solutions - Exportação/Importação Colunar
+==================================================
+Exporta as tabelas do banco para Parquet (ou Arrow IPC) particionado por
+cultura e data, em streaming, e importa esses arquivos de volta.
+
+Estrutura gerada (partições no formato Hive):
+    exports/sensor_readings/cultura=banana/data=2025-11-25/part-0.parquet
+    exports/predictions/data=2025-11-25/part-0.parquet
+    exports/culturas/part-0.parquet
+
+Leitura direta nos modelos e no R:
+    pd.read_parquet('exports/sensor_readings')
+    arrow::open_dataset('exports/sensor_readings')
+"""
+
+import logging
+import shutil
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from database.database_manager import FarmTechDatabase, ROLLUP_GRANULARITIES
+
+# Tabela -> (coluna de cultura, coluna de tempo) usadas no particionamento
+PARTITIONS = {
+    'sensor_readings': ('cultura', 'timestamp'),
+    'predictions': (None, 'timestamp'),
+    'irrigation_actions': (None, 'timestamp'),
+    'culturas': (None, None)
+}
+for _granularity in ROLLUP_GRANULARITIES:
+    PARTITIONS[f'sensor_rollup_{_granularity}'] = ('cultura', 'bucket')
+
+# Colunas 0/1 gravadas como booleanas nos arquivos
+FLAG_COLUMNS = {'nitrogenio', 'fosforo', 'potassio', 'irrigacao_ativa'}
+
+# Coluna de partição derivada da coluna de tempo (descartada na importação)
+DATE_PARTITION = 'data'
+
+FORMATS = {
+    'parquet': 'parquet',
+    'ipc': 'ipc'
+}
+
+
+class ColumnarExporter:
+    """Exporta e importa tabelas FarmTech em formato colunar"""
+
+    def __init__(self, db: FarmTechDatabase, file_format='parquet',
+                 compression='zstd', row_group_rows=100000):
+        """
+        Inicializa o exportador
+
+        Args:
+            db: Instância do FarmTechDatabase
+            file_format (str): 'parquet' ou 'ipc' (Arrow IPC/Feather v2)
+            compression (str): Codec ('zstd', 'snappy', 'lz4', None)
+            row_group_rows (int): Linhas por row group (e por leitura no SQLite)
+        """
+        if file_format not in FORMATS:
+            raise ValueError(f"Formato desconhecido: {file_format}")
+
+        self.db = db
+        self.file_format = file_format
+        self.compression = compression
+        self.row_group_rows = row_group_rows
+
+    def export_all(self, output_dir='exports'):
+        """
+        Exporta todas as tabelas conhecidas
+
+        Returns:
+            dict: Linhas exportadas por tabela
+        """
+        tables = [t for t in self.db.list_tables() if t in PARTITIONS]
+        return {
+            table: self.export_table(table, Path(output_dir) / table)
+            for table in tables
+        }
+
+    def export_table(self, table, output_dir):
+        """
+        Exporta uma tabela em streaming para arquivos particionados
+
+        Lê o SQLite em blocos de row_group_rows (keyset por rowid), então a
+        memória não cresce com o tamanho da tabela.
+
+        Returns:
+            int: Linhas exportadas
+        """
+        cultura_col, time_col = PARTITIONS[table]
+        schema = self.table_schema(table)
+
+        partition_fields = []
+        if cultura_col:
+            partition_fields.append(pa.field(cultura_col, pa.string()))
+        if time_col:
+            schema = schema.append(pa.field(DATE_PARTITION, pa.string()))
+            partition_fields.append(pa.field(DATE_PARTITION, pa.string()))
+
+        output_dir = Path(output_dir)
+        if output_dir.exists():
+            shutil.rmtree(output_dir)
+
+        counter = {'rows': 0}
+
+        def batches():
+            for df in self._read_chunks(table):
+                df = self._to_arrow_types(df, schema)
+                if time_col:
+                    df[DATE_PARTITION] = df[time_col].dt.strftime('%Y-%m-%d')
+                counter['rows'] += len(df)
+                yield pa.RecordBatch.from_pandas(df, schema=schema, preserve_index=False)
+
+        ds.write_dataset(
+            batches(),
+            output_dir,
+            schema=schema,
+            format=FORMATS[self.file_format],
+            file_options=self._file_options(),
+            partitioning=(
+                ds.partitioning(pa.schema(partition_fields), flavor='hive')
+                if partition_fields else None
+            ),
+            basename_template=f"part-{{i}}.{self.file_format}",
+            min_rows_per_group=self.row_group_rows,
+            max_rows_per_group=self.row_group_rows,
+            existing_data_behavior='overwrite_or_ignore'
+        )
+
+        logging.info(f"📦 {table}: {counter['rows']} linhas exportadas para {output_dir}")
+        return counter['rows']
+
+    def import_all(self, source_dir='exports'):
+        """
+        Importa todas as tabelas encontradas em source_dir
+
+        Rollups exportados são importados como estão; sem eles, os rollups
+        são recalculados a partir das leituras importadas.
+
+        Returns:
+            dict: Linhas importadas por tabela
+        """
+        source_dir = Path(source_dir)
+        available = [t for t in PARTITIONS if (source_dir / t).exists()]
+        has_rollups = any(t.startswith('sensor_rollup_') for t in available)
+
+        # Leituras antes de previsões/ações (FOREIGN KEY)
+        order = ['culturas', 'sensor_readings', 'predictions', 'irrigation_actions']
+        available.sort(key=lambda t: order.index(t) if t in order else len(order))
+
+        imported = {}
+        for table in available:
+            imported[table] = self.import_table(
+                table, source_dir / table,
+                update_rollups=not has_rollups
+            )
+        return imported
+
+    def import_table(self, table, source_dir, update_rollups=True):
+        """
+        Importa arquivos colunares para uma tabela (INSERT OR REPLACE por chave)
+
+        Args:
+            table (str): Tabela de destino
+            source_dir: Diretório exportado por export_table
+            update_rollups (bool): Recalcula rollups após importar leituras
+
+        Returns:
+            int: Linhas importadas
+        """
+        dataset = ds.dataset(
+            source_dir,
+            format=FORMATS[self.file_format],
+            partitioning=ds.HivePartitioning.discover(infer_dictionary=False)
+        )
+        # Exportações antigas não têm colunas acrescentadas depois (ex.: device_id)
+        columns = [column for column, _ in self._table_columns(table)
+                   if column in dataset.schema.names]
+
+        sql = (f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) "
+               f"VALUES ({', '.join('?' * len(columns))})")
+
+        total = 0
+        for batch in dataset.to_batches(columns=columns, batch_size=self.row_group_rows):
+            df = batch.to_pandas()
+            for column in df.columns:
+                if pd.api.types.is_datetime64_any_dtype(df[column]):
+                    df[column] = (df[column].dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+                                  .str.removesuffix('.000000'))
+            rows = df.astype(object).where(df.notna(), None)
+            with self.db.write_transaction() as cursor:
+                cursor.executemany(sql, rows.itertuples(index=False, name=None))
+            total += len(df)
+
+        if table == 'sensor_readings' and update_rollups:
+            self.db.rebuild_rollups()
+
+        logging.info(f"📥 {table}: {total} linhas importadas de {source_dir}")
+        return total
+
+    def table_schema(self, table):
+        """Schema Arrow tipado a partir das colunas declaradas no SQLite"""
+        fields = []
+        for column, declared in self._table_columns(table):
+            declared = declared.upper()
+            if column in FLAG_COLUMNS:
+                arrow_type = pa.bool_()
+            elif declared.startswith('INTEGER'):
+                arrow_type = pa.int64()
+            elif declared.startswith('REAL'):
+                arrow_type = pa.float64()
+            elif declared.startswith('DATETIME'):
+                arrow_type = pa.timestamp('us')
+            else:
+                arrow_type = pa.string()
+            fields.append(pa.field(column, arrow_type))
+        return pa.schema(fields)
+
+    def _table_columns(self, table):
+        """Lista (coluna, tipo declarado) de uma tabela"""
+        if table not in PARTITIONS:
+            raise ValueError(f"Tabela não suportada: {table}")
+        with self.db.read_connection() as conn:
+            return [(row[1], row[2]) for row in conn.execute(f"PRAGMA table_info({table})")]
+
+    def _read_chunks(self, table):
+        """Lê uma tabela em blocos ordenados por rowid"""
+        last_rowid = 0
+        while True:
+            with self.db.read_connection() as conn:
+                df = pd.read_sql_query(
+                    f"SELECT rowid AS _rowid, * FROM {table} "
+                    f"WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    conn, params=(last_rowid, self.row_group_rows)
+                )
+            if df.empty:
+                return
+            last_rowid = int(df['_rowid'].iloc[-1])
+            yield df.drop(columns='_rowid')
+            if len(df) < self.row_group_rows:
+                return
+
+    @staticmethod
+    def _to_arrow_types(df, schema):
+        """Converte colunas do pandas para os tipos do schema"""
+        for field in schema:
+            if field.name not in df.columns:
+                continue
+            if pa.types.is_timestamp(field.type):
+                df[field.name] = pd.to_datetime(df[field.name], format='ISO8601')
+            elif pa.types.is_boolean(field.type):
+                df[field.name] = df[field.name].astype(bool)
+        return df
+
+    def _file_options(self):
+        """Opções de escrita do formato (compressão)"""
+        file_format = ds.ParquetFileFormat() if self.file_format == 'parquet' else ds.IpcFileFormat()
+        return file_format.make_write_options(compression=self.compression)
+
+
+if __name__ == "__main__":
+    # Uso:
+    #   python database/columnar.py export [diretório] [--ipc]
+    #   python database/columnar.py import [diretório] [--ipc]
+    if len(sys.argv) < 2 or sys.argv[1] not in ('export', 'import'):
+        print("Uso: python database/columnar.py export|import [diretório] [--ipc]")
+        sys.exit(1)
+
+    command = sys.argv[1]
+    args = [arg for arg in sys.argv[2:] if not arg.startswith('--')]
+    directory = args[0] if args else 'exports'
+    file_format = 'ipc' if '--ipc' in sys.argv else 'parquet'
+
+    db = FarmTechDatabase('database/farmtech.db')
+    exporter = ColumnarExporter(db, file_format=file_format)
+
+    try:
+        if command == 'export':
+            result = exporter.export_all(directory)
+            print(f"\n📦 Exportação {file_format} em {directory}:")
+        else:
+            result = exporter.import_all(directory)
+            print(f"\n📥 Importação {file_format} de {directory}:")
+        for table, rows in result.items():
+            print(f"   {table}: {rows} linhas")
+    finally:
+        db.close()
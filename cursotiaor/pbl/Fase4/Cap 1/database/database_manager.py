@@ -7,12 +7,17 @@ Suporta SQLite (dev) e PostgreSQL (prod)
 
 import sqlite3
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import schedule
 import time
 import json
 import logging
+import os
+import importlib
+import queue
 import sys
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
 # Definir diretório base do projeto
@@ -20,26 +25,412 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 LOG_FILE = BASE_DIR / 'farmtech.log'
 DB_PATH = BASE_DIR / 'database' / 'farmtech.db'
 
+# Permite importar database.* e módulos da raiz ao rodar como script
+sys.path.append(str(BASE_DIR))
+
+from database.logs import ThroughputLog, configure_logging
+from database.metrics import (
+    BATCH_SIZE, DB_WRITE_SECONDS, PIPELINE_ERRORS, PREDICTION_SECONDS, QUERY_SECONDS,
+    QUEUE_DEPTH, READINGS_INGESTED, READINGS_SPOOLED, SPOOL_PENDING
+)
+from database.queries import DASHBOARD_QUERIES
+from database.sources import build_source
+
 # Configurar encoding UTF-8 para Windows
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
     sys.stderr.reconfigure(encoding='utf-8')
 
-# Configurar logging com UTF-8
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
+# Configurar logging com UTF-8 (modo async: QueueHandler + QueueListener,
+# ver database/logs.py)
+configure_logging(LOG_FILE, level=os.environ.get('FARMTECH_LOG_LEVEL', 'INFO'),
+                  mode=os.environ.get('FARMTECH_LOG_MODE', 'sync'))
+
+# Tabela de leituras e seus índices (também usados pelas partições mensais)
+SQL_CREATE_READINGS = [
+    '''
+    CREATE TABLE IF NOT EXISTS sensor_readings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        temperatura REAL NOT NULL,
+        umidade_solo REAL NOT NULL,
+        ph_solo REAL NOT NULL,
+        nitrogenio INTEGER NOT NULL,
+        fosforo INTEGER NOT NULL,
+        potassio INTEGER NOT NULL,
+        irrigacao_ativa INTEGER NOT NULL,
+        cultura VARCHAR(50) NOT NULL,
+        device_id VARCHAR(100)
+    )
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_timestamp 
+    ON sensor_readings(timestamp)
+    ''',
+    # Filtro por cultura + ordenação por tempo (dashboard/consulta_db)
+    '''
+    CREATE INDEX IF NOT EXISTS idx_cultura_timestamp 
+    ON sensor_readings(cultura, timestamp)
+    '''
+]
+
+# Chave natural: dispositivo + horário da medição. Leituras sem dispositivo
+# ou sem horário de medição ficam com device_id NULL, fora da chave.
+# Tabelas antigas recebem a coluna em _add_reading_key (ALTER TABLE).
+SQL_CREATE_READING_KEY = '''
+    CREATE UNIQUE INDEX IF NOT EXISTS {schema}idx_device_timestamp
+    ON sensor_readings(device_id, timestamp) WHERE device_id IS NOT NULL
+'''
+
+# Colunas de valores de uma leitura, na ordem de _reading_row
+READING_COLUMNS = ['timestamp', 'temperatura', 'umidade_solo', 'ph_solo', 'nitrogenio',
+                   'fosforo', 'potassio', 'irrigacao_ativa', 'cultura', 'device_id']
+
+# Upsert pela chave natural: leitura reenviada substitui os valores gravados
+SQL_READING_CONFLICT = (
+    "ON CONFLICT (device_id, timestamp) WHERE device_id IS NOT NULL DO UPDATE SET "
+    + ', '.join(f"{column} = excluded.{column}" for column in READING_COLUMNS[1:-1])
 )
 
+# Leituras de um dispositivo mais antigas que (última medição gravada -
+# janela) são recusadas; FarmTechDatabase.late_data_window (None = sem limite)
+LATE_DATA_WINDOW = timedelta(hours=24)
+
+# Comandos de inserção compartilhados entre o caminho linha a linha e o lote
+# (timestamp opcional: sem ele vale o horário da gravação)
+SQL_INSERT_READING = f'''
+    INSERT INTO sensor_readings 
+    (timestamp, temperatura, umidade_solo, ph_solo, nitrogenio, 
+     fosforo, potassio, irrigacao_ativa, cultura, device_id)
+    VALUES (COALESCE(?, CURRENT_TIMESTAMP), ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    {SQL_READING_CONFLICT}
+'''
+
+# Chaves (dispositivo, sequência) já gravadas: reenvio do spool sem duplicar
+SQL_CREATE_INGEST_KEYS = '''
+    CREATE TABLE IF NOT EXISTS ingest_keys (
+        device VARCHAR(100) NOT NULL,
+        seq INTEGER NOT NULL,
+        reading_id INTEGER NOT NULL,
+        ingested_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (device, seq)
+    )
+'''
+
+SQL_INSERT_INGEST_KEY = '''
+    INSERT INTO ingest_keys (device, seq, reading_id) VALUES (?, ?, ?)
+'''
+
+SQL_INSERT_PREDICTION = '''
+    INSERT INTO predictions 
+    (reading_id, volume_irrigacao, dosagem_n, dosagem_p, 
+     dosagem_k, rendimento_estimado, confianca, modelo_versao)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+SQL_INSERT_ACTION = '''
+    INSERT INTO irrigation_actions 
+    (reading_id, acao, motivo, volume_aplicado, duracao_minutos)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+# Rollups por intervalo de tempo: granularidade -> formato do bucket
+ROLLUP_GRANULARITIES = {
+    'minute': '%Y-%m-%d %H:%M:00',
+    'hour': '%Y-%m-%d %H:00:00',
+    'day': '%Y-%m-%d 00:00:00'
+}
+
+# Duração de um bucket de cada granularidade (recálculo de buckets)
+ROLLUP_STEPS = {
+    'minute': timedelta(minutes=1),
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1)
+}
+
+# Colunas agregadas nos rollups (count, sum, min, max, soma dos quadrados)
+ROLLUP_METRICS = ['temperatura', 'umidade_solo', 'ph_solo']
+
+
+def _rollup_table(granularity):
+    """Nome da tabela de rollup de uma granularidade"""
+    if granularity not in ROLLUP_GRANULARITIES:
+        raise ValueError(f"Granularidade desconhecida: {granularity}")
+    return f"sensor_rollup_{granularity}"
+
+
+def _rollup_upsert_sql(granularity, source='sensor_readings', where='id BETWEEN ? AND ?'):
+    """
+    INSERT ... SELECT que agrega as leituras de um intervalo de IDs
+    e soma o resultado aos buckets já existentes
+    
+    Args:
+        granularity (str): Chave de ROLLUP_GRANULARITIES
+        source (str): Tabela de leituras (ex.: partição anexada 'p_2025_11.sensor_readings')
+        where (str): Filtro das leituras agregadas (padrão: intervalo de IDs)
+    """
+    table = _rollup_table(granularity)
+    bucket_format = ROLLUP_GRANULARITIES[granularity]
+    
+    select_cols = []
+    update_cols = []
+    for metric in ROLLUP_METRICS:
+        select_cols += [f"SUM({metric})", f"MIN({metric})",
+                        f"MAX({metric})", f"SUM({metric} * {metric})"]
+        update_cols += [
+            f"{metric}_sum = {metric}_sum + excluded.{metric}_sum",
+            f"{metric}_min = MIN({metric}_min, excluded.{metric}_min)",
+            f"{metric}_max = MAX({metric}_max, excluded.{metric}_max)",
+            f"{metric}_sumsq = {metric}_sumsq + excluded.{metric}_sumsq"
+        ]
+    
+    metric_cols = ', '.join(
+        f"{metric}_{agg}" for metric in ROLLUP_METRICS
+        for agg in ('sum', 'min', 'max', 'sumsq')
+    )
+    
+    return f'''
+        INSERT INTO {table}
+        (bucket, cultura, n, {metric_cols}, npk_ok, irrigacoes)
+        SELECT strftime('{bucket_format}', timestamp), cultura, COUNT(*),
+               {', '.join(select_cols)},
+               SUM(nitrogenio AND fosforo AND potassio),
+               SUM(irrigacao_ativa)
+        FROM {source}
+        WHERE {where}
+        GROUP BY 1, 2
+        ON CONFLICT(bucket, cultura) DO UPDATE SET
+            n = n + excluded.n,
+            {', '.join(update_cols)},
+            npk_ok = npk_ok + excluded.npk_ok,
+            irrigacoes = irrigacoes + excluded.irrigacoes
+    '''
+
+
+SQL_ROLLUP_UPSERT = {
+    granularity: _rollup_upsert_sql(granularity)
+    for granularity in ROLLUP_GRANULARITIES
+}
+
+# Filtro do recálculo de um bucket (cultura, início, fim)
+ROLLUP_BUCKET_WHERE = 'cultura = ? AND timestamp >= ? AND timestamp < ?'
+
+# Colunas somadas dos rollups (ajustadas pela diferença em upserts)
+ROLLUP_ADDITIVE = ['n'] + [
+    f"{metric}_{agg}" for metric in ROLLUP_METRICS for agg in ('sum', 'sumsq')
+] + ['npk_ok', 'irrigacoes']
+
+
+def _rollup_adjust_sql(granularity):
+    """
+    UPDATE que soma a diferença de leituras regravadas a um bucket existente
+    
+    Parâmetros: um valor por coluna de ROLLUP_ADDITIVE, dois (novo mínimo)
+    e dois (novo máximo) por métrica (None mantém o atual), bucket e cultura.
+    CASE em vez de MIN/MAX escalar: mesma sintaxe no SQLite e no PostgreSQL.
+    """
+    sets = [f"{column} = {column} + ?" for column in ROLLUP_ADDITIVE]
+    for metric in ROLLUP_METRICS:
+        sets += [
+            f"{metric}_min = CASE WHEN ? < {metric}_min THEN ? ELSE {metric}_min END",
+            f"{metric}_max = CASE WHEN ? > {metric}_max THEN ? ELSE {metric}_max END"
+        ]
+    return (f"UPDATE {_rollup_table(granularity)} SET {', '.join(sets)} "
+            f"WHERE bucket = ? AND cultura = ?")
+
+
+def _rollup_insert_sql(granularity):
+    """INSERT de um bucket novo a partir dos valores de uma leitura"""
+    columns = ['bucket', 'cultura'] + ROLLUP_ADDITIVE + [
+        f"{metric}_{agg}" for metric in ROLLUP_METRICS for agg in ('min', 'max')
+    ]
+    return (f"INSERT INTO {_rollup_table(granularity)} ({', '.join(columns)}) "
+            f"VALUES ({', '.join(['?'] * len(columns))})")
+
+
+SQL_ROLLUP_ADJUST = {
+    granularity: _rollup_adjust_sql(granularity) for granularity in ROLLUP_GRANULARITIES
+}
+SQL_ROLLUP_INSERT = {
+    granularity: _rollup_insert_sql(granularity) for granularity in ROLLUP_GRANULARITIES
+}
+
+
+def _rollup_bounds(timestamp):
+    """
+    Bucket de cada granularidade que contém um horário
+    
+    Returns:
+        dict: granularidade -> (início, fim) no formato 'AAAA-MM-DD HH:MM:SS'
+    """
+    moment = datetime.fromisoformat(timestamp)
+    bounds = {}
+    for granularity, bucket_format in ROLLUP_GRANULARITIES.items():
+        start = datetime.strptime(moment.strftime(bucket_format), '%Y-%m-%d %H:%M:%S')
+        end = start + ROLLUP_STEPS[granularity]
+        bounds[granularity] = (start.strftime('%Y-%m-%d %H:%M:%S'),
+                               end.strftime('%Y-%m-%d %H:%M:%S'))
+    return bounds
+
+
+def _rollup_contribution(values, sign=1):
+    """
+    Colunas somadas de uma leitura em um bucket (sign=-1 para retirá-la)
+    
+    Args:
+        values (tuple): (temperatura, umidade_solo, ph_solo, nitrogenio,
+                        fosforo, potassio, irrigacao_ativa)
+    
+    Returns:
+        dict: Coluna de ROLLUP_ADDITIVE -> valor
+    """
+    contribution = {'n': sign}
+    for metric, value in zip(ROLLUP_METRICS, values[:3]):
+        contribution[f"{metric}_sum"] = sign * value
+        contribution[f"{metric}_sumsq"] = sign * value * value
+    nitrogenio, fosforo, potassio, irrigacao_ativa = values[3:]
+    contribution['npk_ok'] = sign * int(bool(nitrogenio and fosforo and potassio))
+    contribution['irrigacoes'] = sign * int(irrigacao_ativa)
+    return contribution
+
+
+def _rollup_extremes(rows):
+    """
+    Mínimo e máximo de cada métrica em leituras (valores de _rollup_contribution)
+    
+    Returns:
+        list: (mínimo, máximo) por métrica de ROLLUP_METRICS ((None, None) sem leituras)
+    """
+    if not rows:
+        return [(None, None)] * len(ROLLUP_METRICS)
+    return [(min(row[index] for row in rows), max(row[index] for row in rows))
+            for index in range(len(ROLLUP_METRICS))]
+
+
+def _format_timestamp(value):
+    """
+    Horário de medição no formato gravado ('AAAA-MM-DD HH:MM:SS[.ffffff]', UTC)
+    
+    Returns:
+        str: Horário normalizado (None se não informado)
+    """
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime('%Y-%m-%d %H:%M:%S.%f').removesuffix('.000000')
+
+
+def _add_reading_key(conn, schema='main'):
+    """
+    Cria a chave natural (device_id, timestamp) em uma tabela de leituras,
+    acrescentando a coluna device_id a tabelas anteriores a ela
+    
+    Args:
+        conn: Conexão (ou cursor) SQLite
+        schema (str): Banco da tabela ('main' ou partição anexada)
+    
+    Returns:
+        bool: True se a coluna device_id foi acrescentada
+    """
+    columns = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info(sensor_readings)")}
+    added = 'device_id' not in columns
+    if added:
+        conn.execute(f"ALTER TABLE {schema}.sensor_readings ADD COLUMN device_id VARCHAR(100)")
+    conn.execute(SQL_CREATE_READING_KEY.format(schema=f"{schema}."))
+    return added
+
+# Perfis de armazenamento do SQLite
+# - journal_mode/synchronous: aplicados na conexão de escrita
+# - mmap_size/cache_size/temp_store: aplicados em todas as conexões
+# - read_pool_size: conexões somente leitura (0 = leituras usam a de escrita)
+# - busy_timeout_ms: espera por lock quando outro processo está escrevendo
+# - auto_vacuum: INCREMENTAL permite devolver espaço em pequenos passos
+STORAGE_PROFILES = {
+    # Comportamento original: journal padrão, uma única conexão
+    'legacy': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'mmap_size': 0,
+        'cache_size': -2000,
+        'temp_store': 'DEFAULT',
+        'read_pool_size': 0,
+        'busy_timeout_ms': 5000,
+        'auto_vacuum': 'NONE'
+    },
+    # Padrão: WAL permite que o dashboard leia enquanto a ingestão grava
+    'default': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 64 * 1024 * 1024,
+        'cache_size': -16000,
+        'temp_store': 'MEMORY',
+        'read_pool_size': 4,
+        'busy_timeout_ms': 5000,
+        'auto_vacuum': 'INCREMENTAL'
+    },
+    # Gateways de campo com pouca RAM e flash
+    'edge': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 8 * 1024 * 1024,
+        'cache_size': -4000,
+        'temp_store': 'MEMORY',
+        'read_pool_size': 2,
+        'busy_timeout_ms': 5000,
+        'auto_vacuum': 'INCREMENTAL'
+    },
+    # Ingestão máxima; tolera perder as últimas transações em queda de energia
+    'throughput': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64000,
+        'temp_store': 'MEMORY',
+        'read_pool_size': 8,
+        'busy_timeout_ms': 5000,
+        'auto_vacuum': 'INCREMENTAL'
+    }
+}
+
+
+def resolve_storage_profile(profile):
+    """
+    Resolve um perfil de armazenamento
+    
+    Args:
+        profile: Nome em STORAGE_PROFILES ou dict com as chaves a sobrescrever
+                 sobre o perfil 'default'
+    
+    Returns:
+        dict: Perfil completo
+    """
+    if profile is None:
+        profile = 'default'
+    
+    if isinstance(profile, str):
+        if profile not in STORAGE_PROFILES:
+            raise ValueError(f"Perfil de armazenamento desconhecido: {profile}")
+        return dict(STORAGE_PROFILES[profile])
+    
+    resolved = dict(STORAGE_PROFILES['default'])
+    resolved.update(profile)
+    return resolved
+
+
 class FarmTechDatabase:
     """Gerenciador do banco de dados FarmTech"""
     
-    def __init__(self, db_path=None):
-        """Inicializa conexão com banco de dados"""
+    def __init__(self, db_path=None, storage_profile='default'):
+        """
+        Inicializa conexão com banco de dados
+        
+        Args:
+            db_path: Caminho do arquivo SQLite
+            storage_profile: Nome em STORAGE_PROFILES ou dict de pragmas
+        """
         if db_path is None:
             db_path = DB_PATH
         
@@ -48,50 +439,143 @@ class FarmTechDatabase:
         db_path.parent.mkdir(parents=True, exist_ok=True)
         
         self.db_path = str(db_path)
+        self.storage_profile = resolve_storage_profile(storage_profile)
         self.conn = None
+        self._write_lock = threading.RLock()
+        self._read_pool = None
+        self.late_data_window = LATE_DATA_WINDOW
+        self.ingest_counters = {'atualizadas': 0, 'fora_da_janela': 0, 'ja_gravadas': 0}
+        self._watermarks = {}
+        self.throughput = ThroughputLog('Ingestão')
         self.connect()
         self.create_tables()
+        self._open_read_pool()
         logging.info(f"✅ Banco de dados inicializado: {self.db_path}")
     
     def connect(self):
-        """Conecta ao banco de dados"""
+        """Conecta ao banco de dados (conexão de escrita)"""
         try:
             self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
             self.conn.row_factory = sqlite3.Row  # Retorna dict-like rows
+            self._apply_pragmas(self.conn, writer=True)
             return True
         except Exception as e:
             logging.error(f"❌ Erro ao conectar: {e}")
             return False
     
+    def _apply_pragmas(self, conn, writer):
+        """Aplica os pragmas do perfil de armazenamento a uma conexão"""
+        profile = self.storage_profile
+        
+        conn.execute(f"PRAGMA busy_timeout = {int(profile['busy_timeout_ms'])}")
+        if writer:
+            # Só tem efeito em banco novo (antes da primeira tabela);
+            # bancos existentes usam RetentionManager.enable_incremental_vacuum
+            conn.execute(f"PRAGMA auto_vacuum = {profile['auto_vacuum']}")
+        if writer and not self._is_memory_db():
+            conn.execute(f"PRAGMA journal_mode = {profile['journal_mode']}")
+        if writer:
+            conn.execute(f"PRAGMA synchronous = {profile['synchronous']}")
+        conn.execute(f"PRAGMA mmap_size = {int(profile['mmap_size'])}")
+        conn.execute(f"PRAGMA cache_size = {int(profile['cache_size'])}")
+        conn.execute(f"PRAGMA temp_store = {profile['temp_store']}")
+    
+    def _is_memory_db(self):
+        """Indica se o banco é em memória (sem arquivo para compartilhar)"""
+        return self.db_path == ':memory:' or self.db_path.startswith('file::memory:')
+    
+    def _open_read_pool(self):
+        """Abre o pool de conexões somente leitura"""
+        pool_size = int(self.storage_profile['read_pool_size'])
+        if pool_size <= 0 or self._is_memory_db():
+            return
+        
+        uri = Path(self.db_path).resolve().as_uri() + '?mode=ro'
+        self._read_pool = queue.LifoQueue()
+        for _ in range(pool_size):
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._apply_pragmas(conn, writer=False)
+            self._read_pool.put(conn)
+    
+    @contextmanager
+    def read_connection(self):
+        """
+        Empresta uma conexão somente leitura do pool
+        
+        Sem pool (perfil 'legacy' ou banco em memória) devolve a conexão
+        de escrita.
+        
+        Exemplo:
+            with db.read_connection() as conn:
+                df = pd.read_sql_query(query, conn)
+        """
+        if self._read_pool is None:
+            yield self.conn
+            return
+        
+        conn = self._read_pool.get()
+        try:
+            yield conn
+        finally:
+            self._read_pool.put(conn)
+    
+    @contextmanager
+    def write_transaction(self):
+        """
+        Abre uma transação de escrita (BEGIN IMMEDIATE) na conexão de escrita
+        
+        Segura o lock de escrita da instância até o commit; em caso de
+        exceção faz rollback e propaga o erro.
+        
+        Exemplo:
+            with db.write_transaction() as cursor:
+                cursor.execute(...)
+        """
+        with self._write_lock:
+            if self.conn.in_transaction:
+                self.conn.commit()
+            
+            cursor = self.conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield cursor
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+    
+    def execute_maintenance(self, sql, script=False):
+        """
+        Executa PRAGMA/VACUUM na conexão de escrita, fora de transação
+        
+        Args:
+            sql (str): Comando a executar
+            script (bool): Usa executescript, que avança o comando até o fim
+                           (necessário para PRAGMA incremental_vacuum, que
+                           libera uma página por passo)
+        
+        Returns:
+            list: Linhas retornadas pelo comando (vazia com script=True)
+        """
+        with self._write_lock:
+            if self.conn.in_transaction:
+                self.conn.commit()
+            if script:
+                self.conn.executescript(sql)
+                return []
+            return self.conn.execute(sql).fetchall()
+    
     def create_tables(self):
         """Cria estrutura de tabelas se não existirem"""
         cursor = self.conn.cursor()
         
-        # Tabela: sensor_readings
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sensor_readings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                temperatura REAL NOT NULL,
-                umidade_solo REAL NOT NULL,
-                ph_solo REAL NOT NULL,
-                nitrogenio INTEGER NOT NULL,
-                fosforo INTEGER NOT NULL,
-                potassio INTEGER NOT NULL,
-                irrigacao_ativa INTEGER NOT NULL,
-                cultura VARCHAR(50) NOT NULL
-            )
-        ''')
-        
-        # Índices para performance
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_timestamp 
-            ON sensor_readings(timestamp)
-        ''')
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_cultura 
-            ON sensor_readings(cultura)
-        ''')
+        # Tabela: sensor_readings e índices para performance
+        for sql in SQL_CREATE_READINGS:
+            cursor.execute(sql)
+        _add_reading_key(cursor)
+        # Substituído por idx_cultura_timestamp, do qual é prefixo
+        cursor.execute("DROP INDEX IF EXISTS idx_cultura")
         
         # Tabela: predictions
         cursor.execute('''
@@ -115,6 +599,12 @@ class FarmTechDatabase:
             ON predictions(timestamp)
         ''')
         
+        # Remoção em cascata da retenção localiza filhos pela leitura
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_predictions_reading 
+            ON predictions(reading_id)
+        ''')
+        
         # Tabela: irrigation_actions
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS irrigation_actions (
@@ -134,6 +624,15 @@ class FarmTechDatabase:
             ON irrigation_actions(timestamp)
         ''')
         
+        # Remoção em cascata da retenção localiza filhos pela leitura
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_actions_reading 
+            ON irrigation_actions(reading_id)
+        ''')
+        
+        # Tabela: ingest_keys (idempotência do spool)
+        cursor.execute(SQL_CREATE_INGEST_KEYS)
+        
         # Tabela: culturas
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS culturas (
@@ -155,11 +654,36 @@ class FarmTechDatabase:
             ON culturas(nome)
         ''')
         
+        # Tabelas de rollup (minuto, hora, dia) por cultura
+        metric_ddl = ',\n'.join(
+            f"{metric}_{agg} REAL NOT NULL" for metric in ROLLUP_METRICS
+            for agg in ('sum', 'min', 'max', 'sumsq')
+        )
+        for granularity in ROLLUP_GRANULARITIES:
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {_rollup_table(granularity)} (
+                    bucket DATETIME NOT NULL,
+                    cultura VARCHAR(50) NOT NULL,
+                    n INTEGER NOT NULL,
+                    {metric_ddl},
+                    npk_ok INTEGER NOT NULL,
+                    irrigacoes INTEGER NOT NULL,
+                    PRIMARY KEY (bucket, cultura)
+                )
+            ''')
+        
         self.conn.commit()
         logging.info("✅ Tabelas criadas/verificadas com sucesso")
         
         # Popula culturas padrão
         self._seed_culturas()
+        
+        # Banco criado antes dos rollups: preenche a partir das leituras
+        cursor.execute(f"SELECT 1 FROM {_rollup_table('day')} LIMIT 1")
+        rollups_empty = cursor.fetchone() is None
+        cursor.execute("SELECT 1 FROM sensor_readings LIMIT 1")
+        if rollups_empty and cursor.fetchone() is not None:
+            self.rebuild_rollups()
     
     def _seed_culturas(self):
         """Insere culturas padrão se não existirem"""
@@ -188,32 +712,26 @@ class FarmTechDatabase:
             data (dict): Dicionário com dados do sensor
         
         Returns:
-            int: ID do registro inserido
+            int: ID do registro inserido (None se fora da janela de atraso)
         """
-        cursor = self.conn.cursor()
+        if self._natural_key(data) is not None:
+            # Com chave natural: deduplicação e janela de atraso do lote
+            reading = {key: value for key, value in data.items()
+                       if key not in ('prediction', 'irrigation_action')}
+            return self.insert_readings_batch([reading])[0]
         
-        cursor.execute('''
-            INSERT INTO sensor_readings 
-            (temperatura, umidade_solo, ph_solo, nitrogenio, 
-             fosforo, potassio, irrigacao_ativa, cultura)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data['temperatura'],
-            data['umidade_solo'],
-            data['ph_solo'],
-            int(data['nitrogenio']),
-            int(data['fosforo']),
-            int(data['potassio']),
-            int(data['irrigacao_ativa']),
-            data['cultura']
-        ))
-        
-        self.conn.commit()
-        reading_id = cursor.lastrowid
+        with self._write_lock, DB_WRITE_SECONDS.time(operacao='leitura'):
+            cursor = self.conn.cursor()
+            cursor.execute(SQL_INSERT_READING, self._reading_row(data))
+            reading_id = cursor.lastrowid
+            self._update_rollups(cursor, reading_id, reading_id)
+            self.conn.commit()
+        READINGS_INGESTED.inc(status='nova')
         
-        logging.info(f"📊 Leitura inserida: ID {reading_id} | "
-                    f"Temp: {data['temperatura']}°C | "
-                    f"Umid: {data['umidade_solo']}%")
+        logging.debug("📊 Leitura inserida: ID %s | Temp: %s°C | Umid: %s%%",
+                      reading_id, data['temperatura'], data['umidade_solo'],
+                      extra={'event': 'leitura'})
+        self.throughput.add(leituras=1)
         
         return reading_id
     
@@ -228,14 +746,531 @@ class FarmTechDatabase:
         Returns:
             int: ID da previsão inserida
         """
-        cursor = self.conn.cursor()
+        with self._write_lock, DB_WRITE_SECONDS.time(operacao='previsao'):
+            cursor = self.conn.cursor()
+            cursor.execute(SQL_INSERT_PREDICTION,
+                           self._prediction_row(reading_id, prediction_data))
+            self.conn.commit()
         
-        cursor.execute('''
-            INSERT INTO predictions 
-            (reading_id, volume_irrigacao, dosagem_n, dosagem_p, 
-             dosagem_k, rendimento_estimado, confianca, modelo_versao)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        pred_id = cursor.lastrowid
+        
+        logging.debug("🔮 Previsão inserida: ID %s | Volume: %sL/m²",
+                      pred_id, prediction_data.get('volume_irrigacao'),
+                      extra={'event': 'previsao'})
+        self.throughput.add(previsoes=1)
+        
+        return pred_id
+    
+    def insert_irrigation_action(self, reading_id, acao, motivo, volume=None, duracao=None):
+        """Insere ação de irrigação"""
+        with self._write_lock, DB_WRITE_SECONDS.time(operacao='acao'):
+            cursor = self.conn.cursor()
+            cursor.execute(SQL_INSERT_ACTION,
+                           (reading_id, acao, motivo, volume, duracao))
+            self.conn.commit()
+        
+        logging.debug("💧 Ação de irrigação: %s - %s", acao, motivo,
+                      extra={'event': 'acao'})
+        self.throughput.add(acoes=1)
+        
+        return cursor.lastrowid
+    
+    def insert_readings_batch(self, readings):
+        """
+        Insere um lote de leituras em uma única transação
+        
+        Cada item é o mesmo dict aceito por insert_sensor_reading e pode
+        trazer as chaves opcionais 'prediction' (dict de insert_prediction),
+        'irrigation_action' (dict com acao, motivo, volume, duracao),
+        'device_id' e 'ingest_key' ((dispositivo, sequência), ver
+        database/spool.py). Leituras, previsões e ações são gravadas com
+        executemany e um único commit.
+        
+        Deduplicação:
+        - ingest_key já gravada: item ignorado (reenvio do spool)
+        - mesma chave natural (device_id, timestamp) já gravada: upsert dos
+          valores, previsão/ação substituídas e a diferença aplicada aos
+          buckets de rollup afetados
+        - timestamp anterior a (última medição do dispositivo -
+          late_data_window): leitura recusada
+        
+        Args:
+            readings (list): Lista de dicionários com dados dos sensores
+        
+        Returns:
+            list: IDs das leituras na mesma ordem da entrada (o ID já
+                  gravado para chaves repetidas, None para recusadas)
+        """
+        readings = list(readings)
+        if not readings:
+            return []
+        
+        keys = [self._natural_key(data) for data in readings]
+        
+        # BEGIN IMMEDIATE garante o lock de escrita antes de ler o
+        # último ID, então os IDs do lote são consecutivos
+        started = time.perf_counter()
+        with self.write_transaction() as cursor:
+            ingested = self._ingested_ids(cursor, readings)
+            existing = self._existing_readings(cursor, {key for key in keys if key})
+            oldest_allowed = self._oldest_allowed(keys)
+            
+            # Classifica cada item; repetições da chave natural no lote
+            # ficam com os valores da última ocorrência
+            status = []
+            last_seen = {}
+            for index, (data, key) in enumerate(zip(readings, keys)):
+                ingest_key = self._ingest_key(data)
+                if ingest_key is not None and ingest_key in ingested:
+                    status.append('ja_gravada')
+                    continue
+                if ingest_key is not None:
+                    ingested[ingest_key] = None
+                
+                if key is not None and key not in existing:
+                    limit = oldest_allowed.get(key[0])
+                    if limit is not None and key[1] < limit:
+                        status.append('fora_da_janela')
+                        continue
+                
+                status.append('atualizada' if key in existing else 'nova')
+                if key is not None:
+                    if key in last_seen:
+                        status[last_seen[key]] = 'repetida'
+                    last_seen[key] = index
+            
+            updates = [(existing[keys[i]][0], readings[i])
+                       for i, state in enumerate(status) if state == 'atualizada']
+            new_readings = [readings[i] for i, state in enumerate(status) if state == 'nova']
+            
+            # Upserts antes das inserções: no SQLite o ON CONFLICT consome
+            # valores do AUTOINCREMENT e os novos IDs vêm depois deles
+            if updates:
+                self._upsert_existing(cursor, updates, existing)
+            
+            reading_ids, n_predictions, n_actions = [], 0, 0
+            if new_readings:
+                reading_ids, n_predictions, n_actions = self._insert_batch_rows(
+                    cursor, new_readings
+                )
+            
+            ids_by_key = {key: value[0] for key, value in existing.items()}
+            new_ids = iter(reading_ids)
+            result = [None] * len(readings)
+            for index, state in enumerate(status):
+                if state == 'nova':
+                    result[index] = next(new_ids)
+                    if keys[index] is not None:
+                        ids_by_key[keys[index]] = result[index]
+                elif state == 'atualizada':
+                    result[index] = ids_by_key[keys[index]]
+            
+            key_rows = []
+            for index, (data, state) in enumerate(zip(readings, status)):
+                if state == 'repetida':
+                    result[index] = ids_by_key[keys[index]]
+                ingest_key = self._ingest_key(data)
+                if state == 'ja_gravada':
+                    result[index] = ingested[ingest_key]
+                elif ingest_key is not None and result[index] is not None:
+                    if ingested.get(ingest_key) is None:
+                        ingested[ingest_key] = result[index]
+                        key_rows.append((*ingest_key, result[index]))
+            if key_rows:
+                self._record_ingest_keys(cursor, key_rows)
+        
+        DB_WRITE_SECONDS.observe(time.perf_counter() - started, operacao='lote')
+        BATCH_SIZE.observe(len(readings))
+        
+        # Marca d'água só avança depois do commit
+        for key, state in zip(keys, status):
+            if key is not None and state in ('nova', 'atualizada'):
+                if key[1] > self._watermarks.get(key[0], ''):
+                    self._watermarks[key[0]] = key[1]
+        
+        counts = {state: status.count(state) for state in set(status)}
+        for state, count in counts.items():
+            READINGS_INGESTED.inc(count, status=state)
+        updated = counts.get('atualizada', 0)
+        late = counts.get('fora_da_janela', 0)
+        skipped = counts.get('ja_gravada', 0) + counts.get('repetida', 0)
+        self.ingest_counters['atualizadas'] += updated
+        self.ingest_counters['fora_da_janela'] += late
+        self.ingest_counters['ja_gravadas'] += skipped
+        
+        logging.debug("📦 Lote inserido: %d leituras | %d previsões | %d ações | "
+                      "%d atualizadas | %d já gravadas",
+                      len(reading_ids), n_predictions, n_actions, updated, skipped,
+                      extra={'event': 'lote'})
+        self.throughput.add(leituras=len(reading_ids), previsoes=n_predictions,
+                            acoes=n_actions, atualizadas=updated,
+                            ja_gravadas=skipped, recusadas=late)
+        if late:
+            logging.warning("⚠️ %d leituras recusadas: mais antigas que a "
+                            "janela de atraso (%s)", late, self.late_data_window,
+                            extra={'event': 'recusadas'})
+        
+        return result
+    
+    def _natural_key(self, data):
+        """Chave natural (device_id, timestamp normalizado) ou None"""
+        row = self._reading_row(data)
+        if row[-1] is None:
+            return None
+        return (row[-1], row[0])
+    
+    def _oldest_allowed(self, keys):
+        """
+        Horário mais antigo aceito por dispositivo (marca d'água - janela)
+        
+        A marca d'água é a última medição gravada do dispositivo, buscada
+        no banco na primeira vez e mantida em memória depois.
+        
+        Returns:
+            dict: device_id -> 'AAAA-MM-DD HH:MM:SS' (sem entrada = sem limite)
+        """
+        if self.late_data_window is None:
+            return {}
+        
+        limits = {}
+        for device in {key[0] for key in keys if key}:
+            if device not in self._watermarks:
+                row = self._fetchone(
+                    "SELECT MAX(timestamp) FROM sensor_readings WHERE device_id = ?",
+                    (device,)
+                )
+                self._watermarks[device] = _format_timestamp(row[0]) or ''
+            if self._watermarks[device]:
+                watermark = datetime.fromisoformat(self._watermarks[device])
+                limits[device] = _format_timestamp(watermark - self.late_data_window)
+        return limits
+    
+    def _existing_readings(self, cursor, keys):
+        """
+        Leituras já gravadas com as chaves naturais do lote (transação aberta)
+        
+        Returns:
+            dict: (device_id, timestamp) -> (reading_id, cultura, valores
+                  gravados de _rollup_contribution)
+        """
+        found = {}
+        for source, source_keys in self._reading_key_sources(keys).items():
+            found.update(self._find_reading_keys(cursor, source, source_keys))
+        return found
+    
+    def _reading_key_sources(self, keys):
+        """Tabela de leituras onde procurar cada chave natural"""
+        return {'sensor_readings': keys} if keys else {}
+    
+    def _find_reading_keys(self, cursor, source, keys):
+        """Busca chaves naturais em uma tabela (uma consulta por dispositivo)"""
+        by_device = {}
+        for device, timestamp in keys:
+            by_device.setdefault(device, []).append(timestamp)
+        
+        found = {}
+        sql = self._adapt_sql(
+            f"SELECT id, timestamp, cultura, {', '.join(READING_COLUMNS[1:8])} "
+            f"FROM {source} WHERE device_id = ? AND timestamp BETWEEN ? AND ?"
+        )
+        for device, timestamps in by_device.items():
+            cursor.execute(sql, (device, min(timestamps), max(timestamps)))
+            for reading_id, timestamp, cultura, *values in cursor.fetchall():
+                key = (device, _format_timestamp(timestamp))
+                if key in keys:
+                    found[key] = (reading_id, cultura, tuple(values))
+        return found
+    
+    def _upsert_existing(self, cursor, updates, existing):
+        """
+        Aplica leituras reenviadas a linhas já gravadas (transação aberta)
+        
+        Os valores passam pelo INSERT ... ON CONFLICT da chave natural;
+        previsões e ações trazidas no item substituem as anteriores; os
+        buckets de rollup da leitura (cultura antiga e nova) recebem a
+        diferença entre os valores gravados e os novos.
+        
+        Args:
+            updates (list): (reading_id, leitura)
+            existing (dict): Resultado de _existing_readings
+        """
+        self._upsert_reading_rows(cursor, updates)
+        
+        replaced = {'predictions': [], 'irrigation_actions': []}
+        prediction_rows, action_rows = [], []
+        changes = []
+        for reading_id, data in updates:
+            row = self._reading_row(data)
+            _, old_cultura, old_values = existing[self._natural_key(data)]
+            changes.append((row[0], old_cultura, old_values, row[8], row[1:8]))
+            
+            prediction = data.get('prediction')
+            if prediction:
+                replaced['predictions'].append((reading_id,))
+                prediction_rows.append(self._prediction_row(reading_id, prediction))
+            action = data.get('irrigation_action')
+            if action:
+                replaced['irrigation_actions'].append((reading_id,))
+                action_rows.append((reading_id, action['acao'], action.get('motivo'),
+                                    action.get('volume'), action.get('duracao')))
+        
+        for table, rows in replaced.items():
+            if rows:
+                cursor.executemany(
+                    self._adapt_sql(f"DELETE FROM {table} WHERE reading_id = ?"), rows
+                )
+        if prediction_rows:
+            cursor.executemany(self._adapt_sql(SQL_INSERT_PREDICTION), prediction_rows)
+        if action_rows:
+            cursor.executemany(self._adapt_sql(SQL_INSERT_ACTION), action_rows)
+        
+        self._adjust_rollups(cursor, changes)
+    
+    def _upsert_reading_rows(self, cursor, updates):
+        """Regrava leituras pela chave natural com INSERT ... ON CONFLICT"""
+        cursor.executemany(SQL_INSERT_READING,
+                           [self._reading_row(data) for _, data in updates])
+    
+    def _adjust_rollups(self, cursor, changes):
+        """
+        Aplica aos rollups a diferença das leituras regravadas
+        
+        Retira os valores antigos e soma os novos em cada bucket, sem
+        depender das leituras brutas (que a retenção pode já ter apagado).
+        Mínimo e máximo só podem crescer pela diferença: buckets que
+        perderam uma leitura e ainda têm todas as brutas são recalculados
+        delas para ficarem exatos.
+        
+        Args:
+            changes (list): (timestamp, cultura antiga, valores antigos,
+                            cultura nova, valores novos)
+        """
+        deltas = {}
+        for timestamp, old_cultura, old_values, cultura, values in changes:
+            for granularity, (start, end) in _rollup_bounds(timestamp).items():
+                removed = deltas.setdefault((granularity, start, end, old_cultura), {})
+                added = deltas.setdefault((granularity, start, end, cultura), {})
+                removed.setdefault('removidas', []).append(old_values)
+                added.setdefault('novas', []).append(values)
+        
+        for (granularity, start, end, cultura), delta in deltas.items():
+            sums = dict.fromkeys(ROLLUP_ADDITIVE, 0)
+            for sign, key in ((-1, 'removidas'), (1, 'novas')):
+                for values in delta.get(key, []):
+                    for column, value in _rollup_contribution(values, sign).items():
+                        sums[column] += value
+            extremes = _rollup_extremes(delta.get('novas', []))
+            
+            cursor.execute(
+                self._adapt_sql(SQL_ROLLUP_ADJUST[granularity]),
+                (*sums.values(),
+                 *(value for low, high in extremes for value in (low, low, high, high)),
+                 start, cultura)
+            )
+            if cursor.rowcount == 0 and delta.get('novas'):
+                # Bucket inexistente (ex.: já descartado): só as leituras novas
+                added = dict.fromkeys(ROLLUP_ADDITIVE, 0)
+                for values in delta['novas']:
+                    for column, value in _rollup_contribution(values).items():
+                        added[column] += value
+                cursor.execute(
+                    self._adapt_sql(SQL_ROLLUP_INSERT[granularity]),
+                    (start, cultura, *added.values(),
+                     *(value for pair in extremes for value in pair))
+                )
+            elif delta.get('removidas'):
+                self._refresh_bucket(cursor, granularity, start, end, cultura)
+    
+    def _refresh_bucket(self, cursor, granularity, start, end, cultura):
+        """
+        Recalcula um bucket das leituras brutas se todas ainda existem
+        
+        O bucket só é substituído quando o número de leituras brutas é
+        igual ao n do rollup (nada foi apagado pela retenção).
+        """
+        count = self._count_bucket_readings(cursor, start, end, cultura)
+        cursor.execute(
+            self._adapt_sql(f"DELETE FROM {_rollup_table(granularity)} "
+                            f"WHERE bucket = ? AND cultura = ? AND n = ?"),
+            (start, cultura, count)
+        )
+        if cursor.rowcount:
+            self._aggregate_bucket(cursor, granularity, start, end, cultura)
+    
+    def _bucket_sources(self, start):
+        """Tabelas de leituras que podem conter um bucket"""
+        return ['sensor_readings']
+    
+    def _count_bucket_readings(self, cursor, start, end, cultura):
+        """Leituras brutas gravadas em um bucket"""
+        count = 0
+        for source in self._bucket_sources(start):
+            cursor.execute(
+                self._adapt_sql(f"SELECT COUNT(*) FROM {source} WHERE {ROLLUP_BUCKET_WHERE}"),
+                (cultura, start, end)
+            )
+            count += cursor.fetchone()[0]
+        return count
+    
+    def _aggregate_bucket(self, cursor, granularity, start, end, cultura):
+        """Agrega as leituras de um bucket ao rollup (bucket já removido)"""
+        cursor.execute(
+            _rollup_upsert_sql(granularity, where=ROLLUP_BUCKET_WHERE),
+            (cultura, start, end)
+        )
+    
+    @staticmethod
+    def _ingest_key(data):
+        """Chave (dispositivo, sequência) da leitura ou None"""
+        key = data.get('ingest_key')
+        if key is None:
+            return None
+        device, seq = key
+        return (str(device), int(seq))
+    
+    def _ingested_ids(self, cursor, readings):
+        """
+        IDs das leituras do lote cujas chaves já estão em ingest_keys
+        
+        Returns:
+            dict: {(dispositivo, sequência): reading_id}
+        """
+        seqs_by_device = {}
+        for data in readings:
+            key = self._ingest_key(data)
+            if key is not None:
+                seqs_by_device.setdefault(key[0], []).append(key[1])
+        
+        known = {}
+        sql = self._adapt_sql(
+            "SELECT seq, reading_id FROM ingest_keys "
+            "WHERE device = ? AND seq BETWEEN ? AND ?"
+        )
+        for device, seqs in seqs_by_device.items():
+            cursor.execute(sql, (device, min(seqs), max(seqs)))
+            for seq, reading_id in cursor.fetchall():
+                known[(device, seq)] = reading_id
+        return known
+    
+    def _record_ingest_keys(self, cursor, rows):
+        """Registra as chaves (dispositivo, sequência, reading_id) gravadas"""
+        cursor.executemany(SQL_INSERT_INGEST_KEY, rows)
+    
+    def _insert_batch_rows(self, cursor, readings):
+        """
+        Grava leituras, previsões e ações de um lote (transação já aberta)
+        
+        Returns:
+            tuple: (IDs das leituras, nº de previsões, nº de ações)
+        """
+        reading_ids = self._insert_reading_rows(cursor, readings)
+        
+        prediction_rows = []
+        action_rows = []
+        for reading_id, data in zip(reading_ids, readings):
+            prediction = data.get('prediction')
+            if prediction:
+                prediction_rows.append(
+                    self._prediction_row(reading_id, prediction)
+                )
+            
+            action = data.get('irrigation_action')
+            if action:
+                action_rows.append((
+                    reading_id,
+                    action['acao'],
+                    action.get('motivo'),
+                    action.get('volume'),
+                    action.get('duracao')
+                ))
+        
+        if prediction_rows:
+            cursor.executemany(SQL_INSERT_PREDICTION, prediction_rows)
+        if action_rows:
+            cursor.executemany(SQL_INSERT_ACTION, action_rows)
+        
+        self._update_rollups(cursor, reading_ids[0], reading_ids[-1])
+        
+        return reading_ids, len(prediction_rows), len(action_rows)
+    
+    def _insert_reading_rows(self, cursor, readings):
+        """
+        Grava as leituras de um lote com IDs consecutivos (transação aberta)
+        
+        Returns:
+            list: IDs atribuídos, na ordem da entrada
+        """
+        reading_rows = [self._reading_row(data) for data in readings]
+        
+        first_id = self._next_reading_id(cursor)
+        cursor.executemany(SQL_INSERT_READING, reading_rows)
+        return list(range(first_id, first_id + len(reading_rows)))
+    
+    def _update_rollups(self, cursor, first_id, last_id):
+        """Soma as leituras do intervalo de IDs aos rollups (transação aberta)"""
+        for sql in SQL_ROLLUP_UPSERT.values():
+            cursor.execute(sql, (first_id, last_id))
+    
+    def rebuild_rollups(self):
+        """
+        Recalcula todos os rollups a partir de sensor_readings
+        
+        Usado para preencher bancos criados antes dos rollups. Leituras
+        já removidas de sensor_readings deixam de ser contadas.
+        """
+        with self.write_transaction() as cursor:
+            for granularity in ROLLUP_GRANULARITIES:
+                cursor.execute(f"DELETE FROM {_rollup_table(granularity)}")
+            cursor.execute("SELECT MIN(id), MAX(id) FROM sensor_readings")
+            first_id, last_id = cursor.fetchone()
+            if first_id is not None:
+                self._update_rollups(cursor, first_id, last_id)
+        
+        logging.info("📊 Rollups recalculados a partir de sensor_readings")
+    
+    @staticmethod
+    def _next_reading_id(cursor):
+        """Retorna o próximo ID que o AUTOINCREMENT de sensor_readings usará"""
+        cursor.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'sensor_readings'"
+        )
+        row = cursor.fetchone()
+        last_seq = row[0] if row else 0
+        
+        cursor.execute("SELECT MAX(id) FROM sensor_readings")
+        last_id = cursor.fetchone()[0] or 0
+        
+        return max(last_seq, last_id) + 1
+    
+    @staticmethod
+    def _reading_row(data):
+        """
+        Converte dict de leitura na tupla de parâmetros do INSERT
+        
+        A chave opcional 'timestamp' (horário da medição, UTC) é gravada
+        como 'AAAA-MM-DD HH:MM:SS[.ffffff]'; sem ela fica None. 'device_id'
+        só é gravado junto com o horário da medição (chave natural).
+        """
+        timestamp = _format_timestamp(data.get('timestamp'))
+        device_id = data.get('device_id') if timestamp is not None else None
+        
+        return (
+            timestamp,
+            data['temperatura'],
+            data['umidade_solo'],
+            data['ph_solo'],
+            int(data['nitrogenio']),
+            int(data['fosforo']),
+            int(data['potassio']),
+            int(data['irrigacao_ativa']),
+            data['cultura'],
+            str(device_id) if device_id else None
+        )
+    
+    @staticmethod
+    def _prediction_row(reading_id, prediction_data):
+        """Converte dict de previsão na tupla de parâmetros do INSERT"""
+        return (
             reading_id,
             prediction_data.get('volume_irrigacao'),
             prediction_data.get('dosagem_n'),
@@ -244,64 +1279,270 @@ class FarmTechDatabase:
             prediction_data.get('rendimento_estimado'),
             prediction_data.get('confianca', 0.95),
             prediction_data.get('modelo_versao', 'v1.0')
-        ))
+        )
+    
+    def get_recent_readings(self, limit=100, cultura=None):
+        """
+        Retorna leituras recentes
         
-        self.conn.commit()
-        pred_id = cursor.lastrowid
+        Args:
+            limit (int): Número de registros
+            cultura (str): Filtrar por cultura (opcional)
+        
+        Returns:
+            DataFrame: Dados das leituras
+        """
+        if cultura:
+            return self.run_query('recent_readings_cultura', [cultura, limit])
+        return self.run_query('recent_readings', [limit])
+    
+    def run_query(self, name, params=()):
+        """
+        Executa uma consulta registrada em DASHBOARD_QUERIES
         
-        logging.info(f"🔮 Previsão inserida: ID {pred_id} | "
-                    f"Volume: {prediction_data.get('volume_irrigacao')}L/m²")
+        Args:
+            name (str): Chave de DASHBOARD_QUERIES
+            params: Parâmetros posicionais da consulta
         
-        return pred_id
+        Returns:
+            DataFrame: Resultado da consulta
+        """
+        with QUERY_SECONDS.time(consulta=name):
+            return self.read_dataframe(DASHBOARD_QUERIES[name]['sql'], params)
     
-    def insert_irrigation_action(self, reading_id, acao, motivo, volume=None, duracao=None):
-        """Insere ação de irrigação"""
-        cursor = self.conn.cursor()
+    def read_dataframe(self, sql, params=()):
+        """Executa uma consulta em uma conexão de leitura e retorna DataFrame"""
+        with self.read_connection() as conn:
+            return pd.read_sql_query(self._adapt_sql(sql), conn, params=params)
+    
+    def _fetchone(self, sql, params=()):
+        """Executa uma consulta em uma conexão de leitura e retorna a primeira linha"""
+        with self.read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(self._adapt_sql(sql), params)
+            return cursor.fetchone()
+    
+    @staticmethod
+    def _adapt_sql(sql):
+        """
+        Ajusta SQL com parâmetros '?' ao dialeto do backend
         
-        cursor.execute('''
-            INSERT INTO irrigation_actions 
-            (reading_id, acao, motivo, volume_aplicado, duracao_minutos)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (reading_id, acao, motivo, volume, duracao))
+        No SQLite não há o que ajustar; backends com outro paramstyle
+        sobrescrevem este método.
+        """
+        return sql
+    
+    def iter_readings(self, start=None, end=None, cultura=None,
+                      chunk_rows=10000, as_numpy=False):
+        """
+        Percorre leituras em ordem (timestamp, id) em blocos de tamanho fixo
         
-        self.conn.commit()
-        logging.info(f"💧 Ação de irrigação: {acao} - {motivo}")
+        Pagina por keyset (último timestamp e id vistos) em vez de OFFSET,
+        então cada bloco custa o mesmo independente da posição e a memória
+        fica limitada a chunk_rows linhas. A conexão de leitura é devolvida
+        ao pool entre um bloco e outro.
         
-        return cursor.lastrowid
+        Args:
+            start: Início do intervalo (inclusive), datetime ou string
+            end: Fim do intervalo (exclusive), datetime ou string
+            cultura (str): Filtrar por cultura (opcional)
+            chunk_rows (int): Linhas por bloco
+            as_numpy (bool): Gera arrays estruturados NumPy em vez de DataFrames
+        
+        Yields:
+            DataFrame (ou numpy.recarray) com até chunk_rows leituras
+        """
+        # Limites abertos: strings vazias/alta ordenação cobrem qualquer timestamp
+        start = '' if start is None else str(start)
+        end = '\uffff' if end is None else str(end)
+        
+        yield from self._iter_reading_chunks(
+            self.read_connection, start, end, cultura, chunk_rows, as_numpy
+        )
     
-    def get_recent_readings(self, limit=100, cultura=None):
+    @staticmethod
+    def _iter_reading_chunks(connection, start, end, cultura, chunk_rows, as_numpy):
         """
-        Retorna leituras recentes
+        Laço de paginação por keyset de iter_readings
         
         Args:
-            limit (int): Número de registros
+            connection: Função que devolve um context manager com a conexão
+                        usada em cada bloco
+        """
+        if cultura:
+            query = DASHBOARD_QUERIES['iter_readings_cultura']['sql']
+            prefix = [cultura]
+        else:
+            query = DASHBOARD_QUERIES['iter_readings']['sql']
+            prefix = []
+        
+        last_timestamp, last_id = start, 0
+        while True:
+            # O limite inferior avança junto com o keyset para o índice
+            # começar a busca no último timestamp visto
+            params = prefix + [last_timestamp, end, last_timestamp, last_id, chunk_rows]
+            with connection() as conn:
+                chunk = pd.read_sql_query(query, conn, params=params)
+            
+            if chunk.empty:
+                return
+            
+            last_timestamp = chunk['timestamp'].iloc[-1]
+            last_id = int(chunk['id'].iloc[-1])
+            
+            yield chunk.to_records(index=False) if as_numpy else chunk
+            
+            if len(chunk) < chunk_rows:
+                return
+    
+    def audit_query_plans(self, queries=None):
+        """
+        Roda EXPLAIN QUERY PLAN em cada consulta registrada
+        
+        Marca como problema varreduras completas sem índice ("SCAN t") e,
+        como aviso, ordenações em B-tree temporária.
+        
+        Args:
+            queries (dict): Registro a auditar (padrão: DASHBOARD_QUERIES)
+        
+        Returns:
+            list: Um dict por consulta com plano, problemas e avisos
+        """
+        if queries is None:
+            queries = DASHBOARD_QUERIES
+        
+        report = []
+        with self.read_connection() as conn:
+            for name, query in queries.items():
+                plan = [
+                    row[3] for row in conn.execute(
+                        "EXPLAIN QUERY PLAN " + query['sql'], query['params']
+                    )
+                ]
+                
+                problems = []
+                warnings = []
+                for detail in plan:
+                    if detail.startswith('SCAN ') and ' USING ' not in detail:
+                        if not query.get('full_scan_ok'):
+                            problems.append(detail)
+                    if 'TEMP B-TREE' in detail:
+                        warnings.append(detail)
+                
+                report.append({
+                    'name': name,
+                    'plan': plan,
+                    'problems': problems,
+                    'warnings': warnings
+                })
+        
+        return report
+    
+    def get_rollups(self, granularity='hour', start=None, end=None, cultura=None):
+        """
+        Retorna os buckets de rollup com médias e desvios derivados
+        
+        Args:
+            granularity (str): 'minute', 'hour' ou 'day'
+            start: Início do intervalo (inclusive), datetime ou string
+            end: Fim do intervalo (exclusive), datetime ou string
             cultura (str): Filtrar por cultura (opcional)
         
         Returns:
-            DataFrame: Dados das leituras
+            DataFrame: Um registro por (bucket, cultura)
+        """
+        query = f"SELECT * FROM {_rollup_table(granularity)}"
+        conditions, params = self._rollup_filters(start, end, cultura)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY bucket, cultura"
+        
+        df = self.read_dataframe(query, params)
+        
+        for metric in ROLLUP_METRICS:
+            mean = df[f'{metric}_sum'] / df['n']
+            variance = (df[f'{metric}_sumsq'] / df['n'] - mean ** 2).clip(lower=0)
+            df[f'{metric}_media'] = mean
+            df[f'{metric}_desvio'] = variance ** 0.5
+        
+        return df
+    
+    def get_rollup_summary(self, granularity='day', start=None, end=None, cultura=None):
+        """
+        Agrega os rollups de um intervalo em indicadores únicos
+        
+        Args: iguais a get_rollups
+        
+        Returns:
+            dict: total de leituras, médias, mínimos, máximos, desvios,
+                  leituras com NPK adequado e irrigações
         """
-        query = "SELECT * FROM sensor_readings"
+        sums = ', '.join(
+            f"SUM({metric}_sum), MIN({metric}_min), MAX({metric}_max), SUM({metric}_sumsq)"
+            for metric in ROLLUP_METRICS
+        )
+        query = (f"SELECT SUM(n), {sums}, SUM(npk_ok), SUM(irrigacoes) "
+                 f"FROM {_rollup_table(granularity)}")
+        conditions, params = self._rollup_filters(start, end, cultura)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        
+        row = self._fetchone(query, params)
+        
+        n = row[0] or 0
+        summary = {'total_leituras': n}
+        for i, metric in enumerate(ROLLUP_METRICS):
+            total, minimum, maximum, sumsq = row[1 + i * 4: 5 + i * 4]
+            mean = total / n if n else None
+            summary[f'{metric}_media'] = mean
+            summary[f'{metric}_min'] = minimum
+            summary[f'{metric}_max'] = maximum
+            summary[f'{metric}_desvio'] = (
+                max(0.0, sumsq / n - mean ** 2) ** 0.5 if n else None
+            )
+        summary['npk_ok'] = row[-2] or 0
+        summary['irrigacoes'] = row[-1] or 0
+        
+        return summary
+    
+    def get_latest_rollup_bucket(self, granularity='minute'):
+        """Retorna o bucket mais recente da granularidade (ou None)"""
+        return self._fetchone(f"SELECT MAX(bucket) FROM {_rollup_table(granularity)}")[0]
+    
+    @staticmethod
+    def _rollup_filters(start, end, cultura):
+        """Monta condições WHERE comuns às consultas de rollup"""
+        conditions = []
         params = []
         
+        if start is not None:
+            conditions.append("bucket >= ?")
+            params.append(str(start))
+        if end is not None:
+            conditions.append("bucket < ?")
+            params.append(str(end))
         if cultura:
-            query += " WHERE cultura = ?"
+            conditions.append("cultura = ?")
             params.append(cultura)
         
-        query += " ORDER BY timestamp DESC LIMIT ?"
-        params.append(limit)
-        
-        df = pd.read_sql_query(query, self.conn, params=params)
-        return df
+        return conditions, params
     
     def get_statistics(self):
         """Retorna estatísticas gerais do banco"""
-        cursor = self.conn.cursor()
-        
+        with self.read_connection() as conn:
+            return self._compute_statistics(conn.cursor())
+    
+    def _compute_statistics(self, cursor):
+        """Calcula as estatísticas gerais usando o cursor informado"""
         stats = {}
         
-        # Total de leituras
-        cursor.execute("SELECT COUNT(*) FROM sensor_readings")
-        stats['total_leituras'] = cursor.fetchone()[0]
+        # Total de leituras e médias vêm do rollup diário (poucas linhas)
+        cursor.execute(f'''
+            SELECT SUM(n), SUM(temperatura_sum), SUM(umidade_solo_sum)
+            FROM {_rollup_table('day')}
+        ''')
+        total, temp_sum, umid_sum = cursor.fetchone()
+        stats['total_leituras'] = total or 0
         
         # Total de previsões
         cursor.execute("SELECT COUNT(*) FROM predictions")
@@ -311,44 +1552,106 @@ class FarmTechDatabase:
         cursor.execute("SELECT COUNT(*) FROM irrigation_actions")
         stats['total_acoes'] = cursor.fetchone()[0]
         
-        # Média de temperatura
-        cursor.execute("SELECT AVG(temperatura) FROM sensor_readings")
-        stats['temperatura_media'] = cursor.fetchone()[0]
-        
-        # Média de umidade
-        cursor.execute("SELECT AVG(umidade_solo) FROM sensor_readings")
-        stats['umidade_media'] = cursor.fetchone()[0]
+        # Médias de temperatura e umidade
+        stats['temperatura_media'] = temp_sum / total if total else None
+        stats['umidade_media'] = umid_sum / total if total else None
         
         return stats
     
+    def list_tables(self):
+        """Lista as tabelas do banco (exceto tabelas internas do SQLite)"""
+        with self.read_connection() as conn:
+            rows = conn.execute(
+                "SELECT name FROM sqlite_master "
+                "WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            ).fetchall()
+        return [row[0] for row in rows]
+
     def export_to_csv(self, table_name, output_file):
         """Exporta tabela para CSV"""
-        df = pd.read_sql_query(f"SELECT * FROM {table_name}", self.conn)
+        if table_name not in self.list_tables():
+            raise ValueError(f"Tabela inexistente: {table_name}")
+
+        df = self.read_dataframe(f"SELECT * FROM {table_name}")
         df.to_csv(output_file, index=False)
         logging.info(f"📁 Tabela {table_name} exportada para {output_file}")
         return df
     
     def close(self):
-        """Fecha conexão com banco"""
+        """Fecha conexões com banco (escrita e pool de leitura)"""
+        self.throughput.flush()
+        if self._read_pool is not None:
+            while not self._read_pool.empty():
+                self._read_pool.get_nowait().close()
+            self._read_pool = None
+        
         if self.conn:
             self.conn.close()
             logging.info("🔌 Conexão com banco fechada")
 
 
+# Backends de armazenamento com a mesma API de FarmTechDatabase:
+# nome -> (módulo, classe), importados só quando usados
+STORAGE_BACKENDS = {
+    'sqlite': ('database.database_manager', 'FarmTechDatabase'),
+    'partitioned': ('database.partitioned', 'PartitionedFarmTechDatabase'),
+    'postgres': ('database.postgres', 'PostgresFarmTechDatabase')
+}
+
+
+def open_database(backend='sqlite', **kwargs):
+    """
+    Abre o banco com o backend de armazenamento escolhido
+    
+    Args:
+        backend (str): Chave de STORAGE_BACKENDS
+        **kwargs: Argumentos repassados ao construtor do backend
+    
+    Returns:
+        FarmTechDatabase (ou subclasse)
+    """
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Backend de armazenamento desconhecido: {backend}")
+    
+    module_name, class_name = STORAGE_BACKENDS[backend]
+    backend_class = getattr(importlib.import_module(module_name), class_name)
+    return backend_class(**kwargs)
+
+
+# Marcador de fim de fluxo propagado entre os estágios do pipeline
+_PIPELINE_END = object()
+
+
 class AutoIngestion:
     """Sistema de ingestão automática de dados"""
     
-    def __init__(self, db: FarmTechDatabase, data_source='simulate'):
+    def __init__(self, db: FarmTechDatabase, data_source='simulate', spool=None,
+                 **source_options):
         """
         Inicializa sistema de ingestão
         
         Args:
             db: Instância do FarmTechDatabase
-            data_source: 'simulate', 'serial', ou 'csv'
+            data_source: 'simulate', 'serial', 'csv' (CSV/Parquet) ou 'synthetic'
+            spool: IngestionSpool (database/spool.py) que guarda as leituras
+                   em disco enquanto o banco estiver indisponível
+            **source_options: Opções da fonte (database/sources.py), ex.:
+                serial: port='/dev/ttyUSB0', baudrate=115200, cultura='banana'
+                csv: paths=['sensor_data_banana.csv'], speed=3600
+        
+        Exemplo:
+            AutoIngestion(db, 'csv', paths=['sensor_data_banana.csv',
+                                            'sensor_data_milho.csv'], speed=None)
         """
         self.db = db
         self.data_source = data_source
         self.is_running = False
+        self.spool = spool
+        if spool is not None:
+            SPOOL_PENDING.set_function(lambda: spool.pending)
+        self.source = None
+        if data_source != 'simulate':
+            self.source = build_source(data_source, **source_options)
     
     def read_sensor_data(self):
         """Lê dados dos sensores (simulado ou real)"""
@@ -369,14 +1672,10 @@ class AutoIngestion:
             }
             return data
         
-        elif self.data_source == 'serial':
-            # TODO: Implementar leitura serial real
-            pass
-        
-        elif self.data_source == 'csv':
-            # TODO: Implementar leitura de CSV
-            pass
+        # Serial ou reprodução de arquivo; None quando a fonte acabou
+        return self.source.read()
     
+    @PREDICTION_SECONDS.time(modelo='placeholder')
     def predict_with_model(self, sensor_data):
         """
         Faz previsão com modelo ML (placeholder)
@@ -429,9 +1728,25 @@ class AutoIngestion:
         try:
             # 1. Lê dados dos sensores
             sensor_data = self.read_sensor_data()
+            if sensor_data is None:
+                logging.info("⏹️ Fonte de dados encerrada")
+                self.is_running = False
+                return
+            
+            if self.spool is not None:
+                # Com spool: leitura, previsão e ação em uma transação,
+                # desviadas para o disco se o banco falhar
+                prediction = self.predict_with_model(sensor_data)
+                destino = self._write_batch([self._build_batch_item(sensor_data, prediction)])
+                logging.debug("✅ Ciclo de ingestão completo (%s)", destino,
+                              extra={'event': 'ciclo'})
+                return
             
             # 2. Insere no banco
             reading_id = self.db.insert_sensor_reading(sensor_data)
+            if reading_id is None:
+                # Fora da janela de atraso (já registrado no log)
+                return
             
             # 3. Faz previsão
             prediction = self.predict_with_model(sensor_data)
@@ -440,20 +1755,228 @@ class AutoIngestion:
             self.db.insert_prediction(reading_id, prediction)
             
             # 5. Registra ação de irrigação se necessário
-            if sensor_data['irrigacao_ativa']:
-                motivo = "Umidade baixa" if sensor_data['umidade_solo'] < 40 else "Manutenção"
+            action = self._irrigation_action_for(sensor_data, prediction)
+            if action:
                 self.db.insert_irrigation_action(
                     reading_id, 
-                    'LIGAR', 
-                    motivo,
-                    volume=prediction['volume_irrigacao'],
-                    duracao=30
+                    action['acao'], 
+                    action['motivo'],
+                    volume=action['volume'],
+                    duracao=action['duracao']
                 )
             
-            logging.info(f"✅ Ciclo de ingestão completo: ID {reading_id}")
+            logging.debug("✅ Ciclo de ingestão completo: ID %s", reading_id,
+                          extra={'event': 'ciclo'})
+            
+        except Exception as e:
+            PIPELINE_ERRORS.inc(estagio='ciclo')
+            logging.error("❌ Erro no ciclo de ingestão: %s", e,
+                          extra={'event': 'erro_ingestao'})
+    
+    def _irrigation_action_for(self, sensor_data, prediction):
+        """Retorna a ação de irrigação da leitura ou None se inativa"""
+        if not sensor_data['irrigacao_ativa']:
+            return None
+        
+        motivo = "Umidade baixa" if sensor_data['umidade_solo'] < 40 else "Manutenção"
+        return {
+            'acao': 'LIGAR',
+            'motivo': motivo,
+            'volume': prediction['volume_irrigacao'],
+            'duracao': 30
+        }
+    
+    def _build_batch_item(self, sensor_data, prediction):
+        """Monta o item aceito por FarmTechDatabase.insert_readings_batch"""
+        item = dict(sensor_data)
+        item['prediction'] = prediction
+        
+        action = self._irrigation_action_for(sensor_data, prediction)
+        if action:
+            item['irrigation_action'] = action
+        
+        return item
+    
+    def start_pipeline(self, batch_size=500, flush_interval=1.0, queue_size=5000,
+                       interval_seconds=0.0, max_readings=None, block=True):
+        """
+        Inicia a ingestão em pipeline (produtor → previsão → gravação em lote)
+        
+        Os três estágios rodam em threads ligadas por filas limitadas. Quando
+        a gravação fica para trás as filas enchem e o produtor bloqueia
+        (backpressure). Ao parar, cada estágio esvazia sua fila antes de
+        encerrar, então nenhuma leitura produzida é perdida.
+        
+        Args:
+            batch_size (int): Leituras por transação no gravador
+            flush_interval (float): Tempo máximo (s) antes de gravar um lote parcial
+            queue_size (int): Capacidade de cada fila entre estágios
+            interval_seconds (float): Pausa entre leituras (0 = sem pausa)
+            max_readings (int): Encerra após produzir N leituras (None = sem limite)
+            block (bool): Aguarda o fim do pipeline (Ctrl+C para parar)
+        """
+        self.is_running = True
+        self.pipeline_stats = {'produzidas': 0, 'gravadas': 0, 'lotes': 0, 'erros': 0,
+                               'spool': 0}
+        self._readings_queue = queue.Queue(maxsize=queue_size)
+        self._write_queue = queue.Queue(maxsize=queue_size)
+        QUEUE_DEPTH.set_function(self._readings_queue.qsize, fila='previsao')
+        QUEUE_DEPTH.set_function(self._write_queue.qsize, fila='gravacao')
+        
+        self._pipeline_threads = [
+            threading.Thread(target=self._produce_stage,
+                             args=(interval_seconds, max_readings),
+                             name='farmtech-producer', daemon=True),
+            threading.Thread(target=self._predict_stage,
+                             name='farmtech-predictor', daemon=True),
+            threading.Thread(target=self._write_stage,
+                             args=(batch_size, flush_interval),
+                             name='farmtech-writer', daemon=True)
+        ]
+        for thread in self._pipeline_threads:
+            thread.start()
+        
+        logging.info(f"🔄 Pipeline de ingestão iniciado (lote: {batch_size}, "
+                    f"flush: {flush_interval}s, fila: {queue_size})")
+        
+        if block:
+            self.wait_pipeline()
+    
+    def wait_pipeline(self, timeout=None):
+        """
+        Aguarda o pipeline esvaziar e encerrar
+        
+        Returns:
+            bool: True se todos os estágios terminaram
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        try:
+            for thread in self._pipeline_threads:
+                while thread.is_alive():
+                    if deadline is not None and time.monotonic() >= deadline:
+                        return False
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            logging.info("\n⚠️  Ingestão interrompida pelo usuário")
+            self.stop()
+            for thread in self._pipeline_threads:
+                thread.join()
+        
+        logging.info(f"✅ Pipeline encerrado: {self.pipeline_stats['gravadas']} leituras "
+                    f"em {self.pipeline_stats['lotes']} lotes "
+                    f"({self.pipeline_stats['erros']} erros"
+                    + (f", {self.spool.pending} no spool" if self.spool else "") + ")")
+        return True
+    
+    def _produce_stage(self, interval_seconds, max_readings):
+        """Estágio 1: lê sensores e alimenta a fila de previsão"""
+        produced = 0
+        try:
+            while self.is_running and (max_readings is None or produced < max_readings):
+                sensor_data = self.read_sensor_data()
+                if sensor_data is None:
+                    break
+                
+                # put bloqueante: aplica backpressure quando a fila está cheia
+                self._readings_queue.put(sensor_data)
+                produced += 1
+                
+                if interval_seconds:
+                    time.sleep(interval_seconds)
+        except Exception as e:
+            PIPELINE_ERRORS.inc(estagio='produtor')
+            logging.error(f"❌ Erro no produtor: {e}")
+        finally:
+            self.pipeline_stats['produzidas'] = produced
+            self._readings_queue.put(_PIPELINE_END)
+    
+    def _predict_stage(self):
+        """Estágio 2: aplica o modelo e alimenta a fila de gravação"""
+        while True:
+            sensor_data = self._readings_queue.get()
+            if sensor_data is _PIPELINE_END:
+                self._write_queue.put(_PIPELINE_END)
+                return
+            
+            try:
+                prediction = self.predict_with_model(sensor_data)
+                self._write_queue.put(self._build_batch_item(sensor_data, prediction))
+            except Exception as e:
+                self.pipeline_stats['erros'] += 1
+                PIPELINE_ERRORS.inc(estagio='previsao')
+                logging.error("❌ Erro na previsão: %s", e, extra={'event': 'erro_ingestao'})
+    
+    def _write_stage(self, batch_size, flush_interval):
+        """Estágio 3: agrupa itens e grava um lote por transação"""
+        batch = []
+        deadline = time.monotonic() + flush_interval
+        
+        while True:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                item = self._write_queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            
+            if item is _PIPELINE_END:
+                self._flush_batch(batch)
+                if self.spool is not None:
+                    self.spool.flush()
+                return
+            
+            if item is not None:
+                batch.append(item)
             
+            if len(batch) >= batch_size or time.monotonic() >= deadline:
+                self._flush_batch(batch)
+                batch = []
+                deadline = time.monotonic() + flush_interval
+    
+    def _flush_batch(self, batch):
+        """Grava um lote do pipeline no banco"""
+        if not batch:
+            return
+        
+        try:
+            destino = self._write_batch(batch)
+            self.pipeline_stats[destino] += len(batch)
+            if destino == 'gravadas':
+                self.pipeline_stats['lotes'] += 1
         except Exception as e:
-            logging.error(f"❌ Erro no ciclo de ingestão: {e}")
+            self.pipeline_stats['erros'] += len(batch)
+            PIPELINE_ERRORS.inc(len(batch), estagio='gravacao')
+            logging.error("❌ Erro ao gravar lote de %d leituras: %s", len(batch), e,
+                          extra={'event': 'erro_ingestao'})
+    
+    def _write_batch(self, batch):
+        """
+        Grava itens no banco ou, com spool, no disco se o banco falhar
+        
+        Pendências do spool são reenviadas antes, mantendo a ordem das
+        leituras; enquanto houver pendências os novos itens vão para o spool.
+        
+        Returns:
+            str: 'gravadas' ou 'spool'
+        
+        Raises:
+            Exception: Erro do banco quando não há spool
+        """
+        if self.spool is None:
+            self.db.insert_readings_batch(batch)
+            return 'gravadas'
+        
+        if self.spool.try_replay(self.db):
+            try:
+                self.db.insert_readings_batch(batch)
+                return 'gravadas'
+            except Exception as e:
+                logging.warning("⚠️ Banco indisponível (%s): %d leituras no spool",
+                                e, len(batch), extra={'event': 'banco_indisponivel'})
+        
+        self.spool.append_many(batch)
+        READINGS_SPOOLED.inc(len(batch))
+        return 'spool'
     
     def start_auto_update(self, interval_seconds=5):
         """
@@ -480,12 +2003,58 @@ class AutoIngestion:
     def stop(self):
         """Para a ingestão automática"""
         self.is_running = False
+        if self.source is not None:
+            self.source.close()
         logging.info("🛑 Ingestão automática parada")
 
 
+def print_query_audit(db):
+    """
+    Imprime a auditoria de planos das consultas registradas
+    
+    Returns:
+        bool: True se nenhuma consulta faz varredura completa indevida
+    """
+    report = db.audit_query_plans()
+    
+    print("\n🔍 Auditoria de planos de consulta (EXPLAIN QUERY PLAN):")
+    for entry in report:
+        status = "❌" if entry['problems'] else ("⚠️ " if entry['warnings'] else "✅")
+        print(f"\n{status} {entry['name']}")
+        for detail in entry['plan']:
+            print(f"   {detail}")
+    
+    failed = [entry['name'] for entry in report if entry['problems']]
+    if failed:
+        print(f"\n❌ Varreduras completas em: {', '.join(failed)}")
+    else:
+        print("\n✅ Nenhuma varredura completa indevida")
+    
+    return not failed
+
+
 if __name__ == "__main__":
+    # --log-mode async [--log-level DEBUG]: log em thread própria (database/logs.py)
+    if '--log-mode' in sys.argv or '--log-level' in sys.argv:
+        log_mode = sys.argv[sys.argv.index('--log-mode') + 1] if '--log-mode' in sys.argv else 'sync'
+        log_level = sys.argv[sys.argv.index('--log-level') + 1] if '--log-level' in sys.argv else 'INFO'
+        configure_logging(LOG_FILE, level=log_level.upper(), mode=log_mode)
+    
     # Inicializa banco de dados
-    db = FarmTechDatabase('database/farmtech.db')
+    # --backend NOME: backend de STORAGE_BACKENDS (postgres usa $FARMTECH_PG_DSN)
+    backend = sys.argv[sys.argv.index('--backend') + 1] if '--backend' in sys.argv else 'sqlite'
+    if backend == 'sqlite':
+        db = FarmTechDatabase('database/farmtech.db')
+    elif backend == 'postgres':
+        db = open_database(backend)
+    else:
+        db = open_database(backend, db_path='database/farmtech.db')
+    
+    # --audit: audita os planos das consultas do dashboard e encerra
+    if '--audit' in sys.argv:
+        ok = print_query_audit(db)
+        db.close()
+        sys.exit(0 if ok else 1)
     
     # Exibe estatísticas iniciais
     stats = db.get_statistics()
@@ -495,14 +2064,83 @@ if __name__ == "__main__":
     print(f"   Total de ações: {stats['total_acoes']}")
     
     # Inicializa ingestão automática
+    # --pipeline: produtor/previsão/gravação em threads com gravação em lote
+    # --source serial --port COM3 [COM4 ...] [--cultura milho]: leituras do(s) ESP32
+    # --source csv --files a.csv b.parquet [--speed 3600]: reprodução de arquivos
+    # --spool [DIR]: leituras vão para o disco enquanto o banco estiver fora
+    # --late-window HORAS: atraso máximo aceito por dispositivo (0 = sem limite)
+    # --metrics-port PORTA: expõe /metrics (database/metrics.py)
+    use_pipeline = '--pipeline' in sys.argv
+    
+    def _option(name, default=None):
+        return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else default
+    
+    def _option_list(name):
+        values = []
+        if name in sys.argv:
+            for arg in sys.argv[sys.argv.index(name) + 1:]:
+                if arg.startswith('--'):
+                    break
+                values.append(arg)
+        return values
+    
+    data_source = _option('--source', 'simulate')
+    source_options = {}
+    if data_source == 'serial':
+        ports = _option_list('--port') or ['COM3']
+        source_options = {'cultura': _option('--cultura', 'banana')}
+        if len(ports) > 1:
+            # Vários ESP32: uma thread por porta, gravação em lote compartilhada
+            source_options['ports'] = ports
+            use_pipeline = True
+        else:
+            source_options['port'] = ports[0]
+    elif data_source == 'csv':
+        speed = _option('--speed')
+        source_options = {'paths': _option_list('--files'), 'cultura': _option('--cultura'),
+                          'speed': float(speed) if speed else None}
+        # Reprodução de arquivo é feita para volume: sempre em lote
+        use_pipeline = True
+    
     print("\n🚀 Iniciando sistema de ingestão automática...")
-    print("   Modo: Simulação de dados")
-    print("   Intervalo: 5 segundos")
+    if data_source == 'serial':
+        print(f"   Modo: Serial ({', '.join(source_options.get('ports', [source_options.get('port')]))})")
+    elif data_source == 'csv':
+        print(f"   Modo: Reprodução de {len(source_options['paths'])} arquivo(s) "
+              f"(velocidade: {source_options['speed'] or 'máxima'})")
+    else:
+        print("   Modo: Simulação de dados")
+    if use_pipeline:
+        print("   Pipeline: lotes de 500 leituras (flush a cada 1s)")
+    else:
+        print("   Intervalo: 5 segundos")
     
-    ingestion = AutoIngestion(db, data_source='simulate')
+    spool = None
+    if '--spool' in sys.argv:
+        from database.spool import IngestionSpool
+        
+        spool_dir = (_option_list('--spool') or [BASE_DIR / 'database' / 'farmtech_spool'])[0]
+        spool = IngestionSpool(spool_dir)
+        print(f"   Spool: {spool_dir} ({spool.pending} leituras pendentes)")
+    
+    if '--late-window' in sys.argv:
+        hours = float(_option('--late-window'))
+        db.late_data_window = timedelta(hours=hours) if hours else None
+    
+    if '--metrics-port' in sys.argv:
+        from database.metrics import start_metrics_server
+        
+        start_metrics_server(int(_option('--metrics-port')))
+    
+    ingestion = AutoIngestion(db, data_source=data_source, spool=spool, **source_options)
     
     try:
-        ingestion.start_auto_update(interval_seconds=5)
+        if use_pipeline:
+            ingestion.start_pipeline(batch_size=500, flush_interval=1.0)
+        else:
+            ingestion.start_auto_update(interval_seconds=5)
     finally:
+        if spool is not None:
+            spool.close()
         db.close()
         print("\n✅ Sistema encerrado com sucesso")
\ No newline at end of file
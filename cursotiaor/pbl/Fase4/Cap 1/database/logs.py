@@ -0,0 +1,239 @@
+"""
+FarmTech Solutions - Configuração de Logging
+============================================
+Logging do sistema de ingestão com dois modos:
+
+- sync: FileHandler + StreamHandler na thread que registra (padrão)
+- async: QueueHandler na thread que registra e QueueListener em uma
+  thread própria, que formata e grava no arquivo e no console
+
+Registros com extra={'event': nome} passam por LOG_EVENTS: amostragem
+(1 a cada N) para eventos por leitura e limite de registros por segundo
+para erros em rajada. O volume de ingestão aparece no resumo periódico
+de ThroughputLog em vez de uma linha por leitura.
+
+Uso:
+    FARMTECH_LOG_MODE=async FARMTECH_LOG_LEVEL=DEBUG python database/database_manager.py
+    python database/database_manager.py --log-mode async --log-level DEBUG
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Regras por evento (extra={'event': ...}):
+# sample = guarda 1 a cada N registros, rate = máximo de registros por segundo
+LOG_EVENTS = {
+    # Por leitura (DEBUG)
+    'leitura': {'sample': 100},
+    'previsao': {'sample': 100},
+    'acao': {'sample': 100},
+    'ciclo': {'sample': 100},
+    # Por lote (DEBUG)
+    'lote': {'sample': 10},
+    # Erros e avisos que se repetem a cada lote enquanto a causa persiste
+    'erro_ingestao': {'rate': 1.0},
+    'banco_indisponivel': {'rate': 0.2},
+    'recusadas': {'rate': 0.2},
+}
+
+# Intervalo (s) do resumo de vazão e rótulos das contagens
+LOG_SUMMARY_INTERVAL = 10.0
+THROUGHPUT_LABELS = {'previsoes': 'previsões', 'acoes': 'ações',
+                     'ja_gravadas': 'já gravadas'}
+
+# Handlers e listener instalados por configure_logging
+_installed = {'handlers': [], 'listener': None}
+
+
+class SamplingFilter(logging.Filter):
+    """Amostragem e limite de taxa por evento (ver LOG_EVENTS)"""
+
+    def __init__(self, events=None):
+        """
+        Args:
+            events (dict): Regras por evento (padrão: LOG_EVENTS)
+        """
+        super().__init__()
+        self.events = LOG_EVENTS if events is None else events
+        self.dropped = Counter()
+        self._seen = Counter()
+        self._suppressed = Counter()
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        event = getattr(record, 'event', None)
+        rule = self.events.get(event)
+        if rule is None:
+            return True
+
+        with self._lock:
+            self._seen[event] += 1
+            sample = rule.get('sample', 1)
+            if sample > 1 and self._seen[event] % sample != 1:
+                self.dropped[event] += 1
+                return False
+
+            rate = rule.get('rate')
+            if rate:
+                # Balde de fichas: rajada de até max(1, rate) registros
+                now = time.monotonic()
+                burst = max(1.0, rate)
+                tokens, last = self._tokens.get(event, (burst, now))
+                tokens = min(burst, tokens + (now - last) * rate)
+                if tokens < 1:
+                    self._tokens[event] = (tokens, now)
+                    self.dropped[event] += 1
+                    self._suppressed[event] += 1
+                    return False
+                self._tokens[event] = (tokens - 1, now)
+
+            suppressed = self._suppressed.pop(event, 0)
+
+        if suppressed and isinstance(record.args, tuple):
+            record.msg = f"{record.msg} (+%d suprimidos)"
+            record.args = (*record.args, suppressed)
+        return True
+
+
+class _LazyQueueHandler(QueueHandler):
+    """QueueHandler que deixa a formatação para a thread do listener"""
+
+    def prepare(self, record):
+        # Traceback precisa ser formatado enquanto a exceção existe; o resto
+        # (msg % args, asctime) fica para o listener. Os args dos registros
+        # do projeto são valores imutáveis (IDs, contagens, textos).
+        if record.exc_info or record.stack_info:
+            return super().prepare(record)
+        return record
+
+
+def _stop_listener():
+    listener = _installed['listener']
+    if listener is not None:
+        _installed['listener'] = None
+        listener.stop()
+
+
+atexit.register(_stop_listener)
+
+
+def configure_logging(log_file=None, level=logging.INFO, mode='sync', events=None,
+                      force=False):
+    """
+    Configura o logger raiz do sistema de ingestão
+
+    Como logging.basicConfig, não altera um logger raiz já configurado
+    por outra aplicação (a menos que force=True); uma configuração feita
+    por esta função é sempre substituída.
+
+    Args:
+        log_file: Arquivo de log (None = só console)
+        level: Nível (logging.INFO ou 'DEBUG', 'INFO', ...)
+        mode (str): 'sync' ou 'async' (QueueHandler + QueueListener)
+        events (dict): Regras de amostragem (padrão: LOG_EVENTS)
+        force (bool): Substitui handlers instalados por outra aplicação
+
+    Returns:
+        QueueListener: Listener do modo async (None no modo sync)
+    """
+    if mode not in ('sync', 'async'):
+        raise ValueError(f"Modo de log desconhecido: {mode}")
+
+    root = logging.getLogger()
+    foreign = [handler for handler in root.handlers
+               if handler not in _installed['handlers']]
+    if foreign and not force:
+        return None
+
+    _stop_listener()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if log_file is not None:
+        handlers.insert(0, logging.FileHandler(log_file, encoding='utf-8'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    sampling = SamplingFilter(events)
+    listener = None
+    if mode == 'async':
+        # Fila sem limite: quem registra nunca bloqueia nem perde registros
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        _installed['listener'] = listener
+        handlers = [_LazyQueueHandler(log_queue)]
+
+    for handler in handlers:
+        # No handler (e não no logger): vale também para loggers filhos
+        handler.addFilter(sampling)
+        root.addHandler(handler)
+    root.setLevel(level)
+
+    _installed['handlers'] = handlers
+    return listener
+
+
+class ThroughputLog:
+    """Resumo periódico de vazão no lugar de uma linha por leitura"""
+
+    def __init__(self, name, unit='leituras', interval=LOG_SUMMARY_INTERVAL):
+        """
+        Args:
+            name (str): Rótulo do resumo (ex.: 'Ingestão')
+            unit (str): Contagem usada na taxa por segundo
+            interval (float): Intervalo (s) entre resumos
+        """
+        self.name = name
+        self.unit = unit
+        self.interval = interval
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+
+    def add(self, **counts):
+        """Soma contagens (ex.: leituras=500) e registra o resumo se o intervalo passou"""
+        with self._lock:
+            self._counts.update(counts)
+            if time.monotonic() - self._started < self.interval:
+                return
+            summary = self._take()
+        self._log(summary)
+
+    def flush(self):
+        """Registra as contagens acumuladas (ex.: ao fechar o banco)"""
+        with self._lock:
+            summary = self._take()
+        self._log(summary)
+
+    def _take(self):
+        """Retira as contagens do intervalo (lock já adquirido)"""
+        now = time.monotonic()
+        counts, elapsed = self._counts, now - self._started
+        self._counts = Counter()
+        self._started = now
+        return counts, elapsed
+
+    def _log(self, summary):
+        counts, elapsed = summary
+        counts = {name: value for name, value in counts.items() if value}
+        if not counts:
+            return
+
+        total = counts.pop(self.unit, 0)
+        rate = total / elapsed if elapsed > 0 else 0.0
+        details = ''.join(f" | {value} {THROUGHPUT_LABELS.get(name, name)}"
+                          for name, value in counts.items())
+        logging.info("📈 %s: %d %s em %.1fs (%.0f/s)%s",
+                     self.name, total, self.unit, elapsed, rate, details)
@@ -0,0 +1,308 @@
+"""
+FarmTech Solutions - Métricas de Operação
+=========================================
+Registro de métricas em memória no formato de texto do Prometheus
+(contadores, gauges e histogramas com rótulos) e um servidor HTTP
+local que expõe /metrics para coleta.
+
+Métricas do sistema (todas no registro METRICS):
+
+    farmtech_readings_ingested_total{status}     leituras recebidas pelo banco
+    farmtech_readings_spooled_total              leituras desviadas para o spool
+    farmtech_db_write_seconds{operacao}          transações de gravação
+    farmtech_batch_size                          leituras por lote gravado
+    farmtech_prediction_seconds{modelo}          latência de previsão
+    farmtech_prediction_requests_total{status}   requisições ao servidor de previsão
+    farmtech_prediction_batch_size               leituras por micro-lote do servidor
+    farmtech_prediction_cache_total{resultado}   consultas ao cache de previsões
+    farmtech_prediction_cache_entries{modelos}   entradas no cache de cada predictor
+    farmtech_query_seconds{consulta}             consultas de DASHBOARD_QUERIES
+    farmtech_queue_depth{fila}                   filas do pipeline de ingestão
+    farmtech_spool_pending                       leituras pendentes no spool
+    farmtech_pipeline_errors_total{estagio}      erros no pipeline
+
+Uso:
+    python database/database_manager.py --pipeline --metrics-port 9108
+    curl http://127.0.0.1:9108/metrics
+"""
+
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Limites (s) dos histogramas de latência
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Limites dos histogramas de tamanho de lote
+BATCH_SIZE_BUCKETS = (1, 10, 50, 100, 250, 500, 1000, 2500, 5000)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+               for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"'
+                          for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class _Metric:
+    """Base das métricas: nome, ajuda, rótulos e valores por combinação de rótulos"""
+
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            # Sem rótulos a série existe desde o início (zerada)
+            self._values[()] = self._initial()
+
+    def _initial(self):
+        return 0
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: rótulos esperados {self.labelnames}, "
+                             f"recebidos {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self):
+        """Gera (sufixo, pares de rótulos, valor) para a exposição"""
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, pairs, value in self._samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(pairs)} {_format_value(value)}")
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """Contador que só cresce"""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield '', list(zip(self.labelnames, key)), value
+
+
+class Gauge(_Metric):
+    """Valor que sobe e desce; pode ser lido de uma função na hora da coleta"""
+
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function, **labels):
+        """Lê o valor de function() a cada coleta (ex.: queue.qsize)"""
+        self.set(function, **labels)
+
+    def remove(self, **labels):
+        with self._lock:
+            self._values.pop(self._key(labels), None)
+
+    def value(self, **labels):
+        value = self._values.get(self._key(labels), 0)
+        return value() if callable(value) else value
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items(), key=lambda item: item[0])
+        for key, value in items:
+            yield '', list(zip(self.labelnames, key)), value() if callable(value) else value
+
+
+class Histogram(_Metric):
+    """Distribuição em faixas acumuladas, com soma e contagem"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help_text, labelnames)
+
+    def _initial(self):
+        # [contagens por faixa (+Inf no fim), soma, total]
+        return [[0] * (len(self.buckets) + 1), 0.0, 0]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = self._initial()
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observa a duração (s) do bloco"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, (list(state[0]), state[1], state[2]))
+                           for key, state in self._values.items())
+        for key, (counts, total, count) in items:
+            pairs = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float('inf')), counts):
+                cumulative += bucket_count
+                yield '_bucket', pairs + [('le', _format_value(bound))], cumulative
+            yield '_sum', pairs, total
+            yield '_count', pairs, count
+
+
+class MetricsRegistry:
+    """Conjunto de métricas exposto em /metrics"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Métrica {name} já registrada como {metric.kind}")
+            return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render(self):
+        """Texto de exposição do Prometheus (versão 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+# Registro do processo e métricas do sistema
+METRICS = MetricsRegistry()
+
+READINGS_INGESTED = METRICS.counter(
+    'farmtech_readings_ingested_total',
+    'Leituras recebidas pelo banco (nova, atualizada, ja_gravada, repetida, fora_da_janela)',
+    ['status'])
+READINGS_SPOOLED = METRICS.counter(
+    'farmtech_readings_spooled_total', 'Leituras desviadas para o spool local')
+DB_WRITE_SECONDS = METRICS.histogram(
+    'farmtech_db_write_seconds', 'Duração das transações de gravação (s)', ['operacao'])
+BATCH_SIZE = METRICS.histogram(
+    'farmtech_batch_size', 'Leituras por lote gravado', buckets=BATCH_SIZE_BUCKETS)
+PREDICTION_SECONDS = METRICS.histogram(
+    'farmtech_prediction_seconds', 'Latência de previsão por modelo (s)', ['modelo'])
+PREDICTION_REQUESTS = METRICS.counter(
+    'farmtech_prediction_requests_total',
+    'Requisições ao servidor de previsão (ok, invalida, erro, timeout)', ['status'])
+PREDICTION_BATCH_SIZE = METRICS.histogram(
+    'farmtech_prediction_batch_size', 'Leituras por micro-lote do servidor de previsão',
+    buckets=BATCH_SIZE_BUCKETS)
+PREDICTION_CACHE = METRICS.counter(
+    'farmtech_prediction_cache_total',
+    'Consultas ao cache de previsões (acerto, falha; vencida = entrada expirada)',
+    ['resultado'])
+PREDICTION_CACHE_SIZE = METRICS.gauge(
+    'farmtech_prediction_cache_entries',
+    'Entradas no cache de previsões (diretório de modelos do predictor)', ['modelos'])
+QUERY_SECONDS = METRICS.histogram(
+    'farmtech_query_seconds', 'Duração das consultas do dashboard (s)', ['consulta'])
+QUEUE_DEPTH = METRICS.gauge(
+    'farmtech_queue_depth', 'Itens nas filas do pipeline de ingestão', ['fila'])
+SPOOL_PENDING = METRICS.gauge(
+    'farmtech_spool_pending', 'Leituras pendentes no spool local')
+PIPELINE_ERRORS = METRICS.counter(
+    'farmtech_pipeline_errors_total', 'Erros no pipeline de ingestão', ['estagio'])
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics → texto de exposição"""
+
+    registry = METRICS
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Coletas a cada poucos segundos não vão para o log
+        pass
+
+
+def start_metrics_server(port=9108, host='127.0.0.1', registry=METRICS):
+    """
+    Expõe o registro em http://host:port/metrics em uma thread própria
+
+    Args:
+        port (int): Porta HTTP (0 = escolhida pelo sistema)
+        host (str): Interface (padrão: só local)
+        registry (MetricsRegistry): Registro exposto
+
+    Returns:
+        ThreadingHTTPServer: Servidor (server.shutdown() encerra)
+    """
+    handler = type('MetricsHandler', (_MetricsHandler,), {'registry': registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='farmtech-metrics',
+                              daemon=True)
+    thread.start()
+    logging.info(f"📈 Métricas em http://{host}:{server.server_address[1]}/metrics")
+    return server
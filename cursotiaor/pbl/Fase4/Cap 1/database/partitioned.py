@@ -0,0 +1,829 @@
+"""
+FarmTech Solutions - Armazenamento Particionado por Mês
+=======================================================
+Backend com a mesma API de FarmTechDatabase que grava sensor_readings
+em um arquivo SQLite por mês, anexado sob demanda:
+
+    database/farmtech.db                           previsões, ações, rollups, catálogo
+    database/farmtech_partitions/readings_2025-11.db
+    database/farmtech_partitions/readings_2025-12.db
+
+- Os IDs das leituras continuam globais (previsões/ações apontam para eles)
+- Consultas por intervalo abrem só as partições que cobrem o intervalo
+- Conexões de leitura veem uma view temporária sensor_readings com os
+  últimos meses, então as consultas de DASHBOARD_QUERIES funcionam sem
+  mudança; run_query anexa os meses do intervalo da consulta ('since') ou
+  todos (full_scan_ok), até MAX_ATTACHED partições, as mais recentes
+- Meses fechados viram somente leitura (um único arquivo, sem WAL), prontos
+  para copiar, arquivar ou descartar inteiros
+"""
+
+import logging
+import os
+import shutil
+import sqlite3
+import stat
+import sys
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from database.database_manager import (
+    DASHBOARD_QUERIES, DB_PATH, READING_COLUMNS, ROLLUP_BUCKET_WHERE, ROLLUP_GRANULARITIES,
+    SQL_CREATE_READINGS, SQL_READING_CONFLICT, FarmTechDatabase, _add_reading_key,
+    _rollup_table, _rollup_upsert_sql, resolve_storage_profile
+)
+from database.metrics import QUERY_SECONDS, READINGS_INGESTED
+
+# SQLite aceita 10 bancos anexados por conexão (SQLITE_MAX_ATTACHED)
+MAX_ATTACHED = 8
+
+# Catálogo de partições, guardado no banco principal
+SQL_CREATE_CATALOG = '''
+    CREATE TABLE IF NOT EXISTS reading_partitions (
+        month CHAR(7) PRIMARY KEY,
+        path TEXT NOT NULL,
+        min_id INTEGER,
+        max_id INTEGER,
+        min_timestamp DATETIME,
+        max_timestamp DATETIME,
+        rows INTEGER NOT NULL DEFAULT 0,
+        read_only INTEGER NOT NULL DEFAULT 0
+    )
+'''
+
+SQL_INSERT_PARTITION_READING = '''
+    INSERT INTO {schema}.sensor_readings
+    (id, timestamp, temperatura, umidade_solo, ph_solo, nitrogenio,
+     fosforo, potassio, irrigacao_ativa, cultura, device_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+''' + SQL_READING_CONFLICT
+
+SQL_UPDATE_CATALOG = '''
+    UPDATE reading_partitions SET
+        min_id = MIN(COALESCE(min_id, ?1), ?1),
+        max_id = MAX(COALESCE(max_id, ?2), ?2),
+        min_timestamp = MIN(COALESCE(min_timestamp, ?3), ?3),
+        max_timestamp = MAX(COALESCE(max_timestamp, ?4), ?4),
+        rows = rows + ?5
+    WHERE month = ?6
+'''
+
+
+def _month_offset(month, offset):
+    """Soma offset meses a um mês 'AAAA-MM'"""
+    year, month_number = map(int, month.split('-'))
+    index = year * 12 + (month_number - 1) + offset
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+class PartitionedFarmTechDatabase(FarmTechDatabase):
+    """FarmTechDatabase com sensor_readings particionada por mês"""
+
+    def __init__(self, db_path=None, storage_profile='default',
+                 partition_dir=None, view_months=6):
+        """
+        Inicializa o banco particionado
+
+        Args:
+            db_path: Caminho do banco principal
+            storage_profile: Nome em STORAGE_PROFILES ou dict de pragmas
+                             (precisa de read_pool_size > 0)
+            partition_dir: Diretório das partições (padrão: <banco>_partitions)
+            view_months (int): Meses visíveis na view sensor_readings das
+                               conexões de leitura
+        """
+        if db_path is None:
+            db_path = DB_PATH
+        if str(db_path) == ':memory:' or str(db_path).startswith('file::memory:'):
+            raise ValueError("Armazenamento particionado requer banco em arquivo")
+        if int(resolve_storage_profile(storage_profile)['read_pool_size']) <= 0:
+            raise ValueError("Armazenamento particionado requer read_pool_size > 0")
+
+        db_path = Path(db_path)
+        if partition_dir is None:
+            partition_dir = db_path.with_name(f"{db_path.stem}_partitions")
+
+        self.partition_dir = Path(partition_dir)
+        self.view_months = min(view_months, MAX_ATTACHED)
+        self._writer_attached = OrderedDict()
+        self._keyed_partitions = set()
+        self._view_signatures = {}
+        self._rollup_sql = {}
+        super().__init__(db_path, storage_profile)
+
+    def create_tables(self):
+        """Cria as tabelas do banco principal e o catálogo de partições"""
+        self.partition_dir.mkdir(parents=True, exist_ok=True)
+        self.conn.execute(SQL_CREATE_CATALOG)
+        self.conn.commit()
+        super().create_tables()
+
+    @staticmethod
+    def _schema(month):
+        """Nome do banco anexado de um mês"""
+        return f"p_{month.replace('-', '_')}"
+
+    def _partition_path(self, month):
+        """Arquivo da partição de um mês"""
+        return self.partition_dir / f"readings_{month}.db"
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def insert_sensor_reading(self, data):
+        """Insere uma leitura na partição do mês (ver insert_readings_batch)"""
+        # Como no SQLite, só a leitura: previsão e ação têm métodos próprios
+        reading = {key: value for key, value in data.items()
+                   if key not in ('prediction', 'irrigation_action')}
+        return self.insert_readings_batch([reading])[0]
+
+    def insert_readings_batch(self, readings):
+        """
+        Insere um lote de leituras nas partições dos seus meses
+
+        Leituras sem 'timestamp' recebem o horário atual (UTC, como o
+        CURRENT_TIMESTAMP do SQLite). Previsões, ações e rollups ficam no
+        banco principal e são gravados na mesma transação. Leituras de
+        meses selados (somente leitura) são recusadas como fora da janela;
+        as demais do lote são gravadas.
+
+        Returns:
+            list: IDs das leituras inseridas, na mesma ordem da entrada
+                  (None para recusadas)
+        """
+        readings = [self._stamped(data) for data in readings]
+        if not readings:
+            return []
+
+        with self._write_lock:
+            sealed = self._sealed_months({data['timestamp'][:7] for data in readings})
+            accepted = [data for data in readings if data['timestamp'][:7] not in sealed]
+            ids = []
+            if accepted:
+                self._prepare_partitions(sorted({data['timestamp'][:7] for data in accepted}))
+                ids = super().insert_readings_batch(accepted)
+
+        if not sealed:
+            return ids
+        self._reject_sealed(len(readings) - len(accepted), sealed)
+        ids = iter(ids)
+        return [None if data['timestamp'][:7] in sealed else next(ids) for data in readings]
+
+    def _sealed_months(self, months):
+        """Meses do conjunto cujas partições estão seladas"""
+        months = list(months)
+        rows = self.conn.execute(
+            f"SELECT month FROM reading_partitions WHERE read_only = 1 "
+            f"AND month IN ({', '.join('?' * len(months))})",
+            months
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def _reject_sealed(self, count, months):
+        """Conta as leituras recusadas por cair em partições seladas"""
+        READINGS_INGESTED.inc(count, status='fora_da_janela')
+        self.ingest_counters['fora_da_janela'] += count
+        self.throughput.add(recusadas=count)
+        logging.warning("⚠️ %d leituras recusadas: partição somente leitura (%s)",
+                        count, ', '.join(sorted(months)), extra={'event': 'recusadas'})
+
+    def _stamped(self, data):
+        """Cópia da leitura com timestamp 'AAAA-MM-DD HH:MM:SS' definido"""
+        timestamp = self._reading_row(data)[0]
+        if timestamp is None:
+            # Horário da gravação não é medição: fica fora da chave natural
+            timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+            return {**data, 'timestamp': timestamp, 'device_id': None}
+        return {**data, 'timestamp': timestamp}
+
+    def _prepare_partitions(self, months):
+        """Cria e anexa à conexão de escrita as partições dos meses (fora de transação)"""
+        read_only = self._sealed_months(months)
+        if read_only:
+            raise ValueError(f"Partição somente leitura: {min(read_only)}")
+
+        for month in months:
+            self._create_partition(month)
+        self._attach_writer(months)
+
+        # Partições criadas antes da chave natural ganham a coluna device_id
+        for month in months:
+            if month not in self._keyed_partitions:
+                if _add_reading_key(self.conn, self._schema(month)):
+                    # Views de leitura foram criadas sem a coluna
+                    self._view_signatures.clear()
+                self.conn.commit()
+                self._keyed_partitions.add(month)
+
+    def _create_partition(self, month):
+        """Cria o arquivo da partição e registra no catálogo, se ainda não existir"""
+        path = self._partition_path(month)
+        registered = self.conn.execute(
+            "SELECT 1 FROM reading_partitions WHERE month = ?", (month,)
+        ).fetchone()
+        if registered:
+            return
+
+        conn = sqlite3.connect(path)
+        try:
+            self._apply_pragmas(conn, writer=True)
+            for sql in SQL_CREATE_READINGS:
+                conn.execute(sql)
+            _add_reading_key(conn)
+            conn.commit()
+        finally:
+            conn.close()
+
+        self.conn.execute(
+            "INSERT INTO reading_partitions (month, path) VALUES (?, ?)",
+            (month, str(path))
+        )
+        self.conn.commit()
+        logging.info(f"🗂️ Partição criada: {path}")
+
+    def _attach_writer(self, months):
+        """Anexa partições à conexão de escrita, liberando as menos usadas"""
+        if self.conn.in_transaction:
+            self.conn.commit()
+
+        for month in months:
+            if month in self._writer_attached:
+                self._writer_attached.move_to_end(month)
+                continue
+
+            while len(self._writer_attached) >= MAX_ATTACHED:
+                oldest = next(m for m in self._writer_attached if m not in months)
+                self._detach_writer(oldest)
+
+            path = self.conn.execute(
+                "SELECT path FROM reading_partitions WHERE month = ?", (month,)
+            ).fetchone()[0]
+            schema = self._schema(month)
+            self.conn.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+            self.conn.execute(
+                f"PRAGMA {schema}.synchronous = {self.storage_profile['synchronous']}"
+            )
+            self._writer_attached[month] = schema
+
+    def _detach_writer(self, month):
+        """Desanexa uma partição da conexão de escrita"""
+        schema = self._writer_attached.pop(month, None)
+        if schema:
+            if self.conn.in_transaction:
+                self.conn.commit()
+            self.conn.execute(f"DETACH DATABASE {schema}")
+
+    def _insert_reading_rows(self, cursor, readings):
+        """
+        Grava as leituras nas partições anexadas (transação aberta)
+
+        Returns:
+            list: IDs atribuídos, na ordem da entrada
+        """
+        first_id = self._next_reading_id(cursor)
+        reading_ids = list(range(first_id, first_id + len(readings)))
+
+        by_month = {}
+        for reading_id, data in zip(reading_ids, readings):
+            by_month.setdefault(data['timestamp'][:7], []).append(
+                (reading_id, *self._reading_row(data))
+            )
+
+        for month, rows in by_month.items():
+            cursor.executemany(
+                SQL_INSERT_PARTITION_READING.format(schema=self._schema(month)),
+                rows
+            )
+            timestamps = [row[1] for row in rows]
+            cursor.execute(SQL_UPDATE_CATALOG, (
+                rows[0][0], rows[-1][0], min(timestamps), max(timestamps),
+                len(rows), month
+            ))
+
+        return reading_ids
+
+    def _reading_key_sources(self, keys):
+        """Chaves naturais agrupadas pela partição do mês do timestamp"""
+        sources = {}
+        for key in keys:
+            month = key[1][:7]
+            if month in self._writer_attached:
+                sources.setdefault(f"{self._schema(month)}.sensor_readings", set()).add(key)
+        return sources
+
+    def _upsert_reading_rows(self, cursor, updates):
+        """Regrava leituras na partição do mês com INSERT ... ON CONFLICT"""
+        by_month = {}
+        for reading_id, data in updates:
+            by_month.setdefault(data['timestamp'][:7], []).append(
+                (reading_id, *self._reading_row(data))
+            )
+        for month, rows in by_month.items():
+            cursor.executemany(
+                SQL_INSERT_PARTITION_READING.format(schema=self._schema(month)), rows
+            )
+
+    def _bucket_sources(self, start):
+        """Banco principal e a partição anexada do mês do bucket"""
+        sources = ['sensor_readings']
+        if start[:7] in self._writer_attached:
+            sources.append(f"{self._schema(start[:7])}.sensor_readings")
+        return sources
+
+    def _aggregate_bucket(self, cursor, granularity, start, end, cultura):
+        """Agrega um bucket a partir do banco principal e da partição do mês"""
+        for source in self._bucket_sources(start):
+            cursor.execute(
+                _rollup_upsert_sql(granularity, source, where=ROLLUP_BUCKET_WHERE),
+                (cultura, start, end)
+            )
+
+    def _next_reading_id(self, cursor):
+        """Próximo ID global: maior entre o banco principal e as partições"""
+        legacy_next = FarmTechDatabase._next_reading_id(cursor)
+        cursor.execute("SELECT MAX(max_id) FROM reading_partitions")
+        return max(legacy_next, (cursor.fetchone()[0] or 0) + 1)
+
+    def _update_rollups(self, cursor, first_id, last_id):
+        """Agrega aos rollups as leituras do intervalo em cada partição anexada"""
+        cursor.execute(
+            "SELECT month FROM reading_partitions WHERE min_id <= ? AND max_id >= ?",
+            (last_id, first_id)
+        )
+        sources = ['sensor_readings'] + [
+            f"{self._schema(month)}.sensor_readings"
+            for (month,) in cursor.fetchall()
+            if month in self._writer_attached
+        ]
+
+        for source in sources:
+            self._upsert_rollups_from(cursor, source, first_id, last_id)
+
+    def _upsert_rollups_from(self, cursor, source, first_id, last_id):
+        """Agrega aos rollups as leituras do intervalo de uma única tabela"""
+        for granularity in ROLLUP_GRANULARITIES:
+            key = (granularity, source)
+            if key not in self._rollup_sql:
+                self._rollup_sql[key] = _rollup_upsert_sql(granularity, source)
+            cursor.execute(self._rollup_sql[key], (first_id, last_id))
+
+    def rebuild_rollups(self):
+        """
+        Recalcula os rollups a partir do banco principal e de todas as partições
+
+        Cada partição é agregada em sua própria transação, para não
+        precisar anexar todas ao mesmo tempo.
+        """
+        with self._write_lock:
+            with self.write_transaction() as cursor:
+                for granularity in ROLLUP_GRANULARITIES:
+                    cursor.execute(f"DELETE FROM {_rollup_table(granularity)}")
+                cursor.execute("SELECT MIN(id), MAX(id) FROM main.sensor_readings")
+                first_id, last_id = cursor.fetchone()
+                if first_id is not None:
+                    self._upsert_rollups_from(cursor, 'sensor_readings', first_id, last_id)
+
+            partitions = self.conn.execute(
+                "SELECT month, min_id, max_id FROM reading_partitions "
+                "WHERE rows > 0 ORDER BY month"
+            ).fetchall()
+            for month, first_id, last_id in partitions:
+                self._attach_writer([month])
+                with self.write_transaction() as cursor:
+                    self._upsert_rollups_from(
+                        cursor, f"{self._schema(month)}.sensor_readings",
+                        first_id, last_id
+                    )
+
+        logging.info("📊 Rollups recalculados a partir das partições")
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def read_connection(self, months=None):
+        """
+        Empresta uma conexão somente leitura do pool
+
+        A conexão enxerga sensor_readings como uma view temporária sobre o
+        banco principal e os últimos view_months meses, então as consultas
+        existentes (dashboard, consulta_db) funcionam sem alteração.
+
+        Args:
+            months (list): Meses da view no lugar dos últimos view_months
+                           (no máximo MAX_ATTACHED)
+        """
+        with super().read_connection() as conn:
+            self._bind_view(conn, months)
+            yield conn
+
+    def run_query(self, name, params=()):
+        """
+        Executa uma consulta de DASHBOARD_QUERIES com as partições que ela lê
+
+        Consultas com intervalo ('since') veem os meses a partir do início
+        do intervalo; as de histórico completo (full_scan_ok), todos os
+        meses. As demais (LIMIT sobre as mais recentes) usam a view padrão.
+        """
+        query = DASHBOARD_QUERIES[name]
+        if 'since' in query:
+            months = self._query_months(params[query['since']])
+        elif query.get('full_scan_ok'):
+            months = self._query_months(None)
+        else:
+            return super().run_query(name, params)
+
+        with QUERY_SECONDS.time(consulta=name), self.read_connection(months) as conn:
+            return pd.read_sql_query(query['sql'], conn, params=params)
+
+    def _query_months(self, start):
+        """
+        Meses com leituras a partir de start (None = todos), mais recentes primeiro
+
+        Acima de MAX_ATTACHED (limite de ATTACH do SQLite) só as mais
+        recentes entram, com aviso no log.
+        """
+        with super().read_connection() as conn:
+            months = [row[0] for row in conn.execute(
+                "SELECT month FROM reading_partitions "
+                "WHERE rows > 0 AND max_timestamp >= ? ORDER BY month DESC",
+                ('' if start is None else str(start),)
+            )]
+        if len(months) > MAX_ATTACHED:
+            logging.warning(f"⚠️ Consulta cobre {len(months)} partições; só as "
+                            f"{MAX_ATTACHED} mais recentes são lidas "
+                            f"(desde {months[MAX_ATTACHED - 1]})")
+            months = months[:MAX_ATTACHED]
+        return months
+
+    def _bind_view(self, conn, months=None):
+        """(Re)cria a view sensor_readings quando o catálogo ou os meses mudam"""
+        if months is None:
+            rows = conn.execute(
+                "SELECT month, path FROM reading_partitions "
+                "ORDER BY month DESC LIMIT ?",
+                (self.view_months,)
+            ).fetchall()
+        else:
+            placeholders = ','.join('?' * len(months))
+            rows = conn.execute(
+                f"SELECT month, path FROM reading_partitions "
+                f"WHERE month IN ({placeholders}) ORDER BY month DESC",
+                list(months)
+            ).fetchall()
+        signature = tuple(tuple(row) for row in rows)
+        if self._view_signatures.get(id(conn)) == signature:
+            return
+
+        self._unbind_view(conn)
+
+        selects = []
+        sources = [('main', None)] + [(self._schema(month), path) for month, path in rows]
+        for schema, path in sources:
+            if path is not None:
+                conn.execute(
+                    f"ATTACH DATABASE ? AS {schema}",
+                    (Path(path).resolve().as_uri() + '?mode=ro',)
+                )
+            # Partições seladas antes da chave natural não têm device_id
+            columns = {row[1] for row in
+                       conn.execute(f"PRAGMA {schema}.table_info(sensor_readings)")}
+            select_columns = ['id'] + [
+                column if column in columns else f"NULL AS {column}"
+                for column in READING_COLUMNS
+            ]
+            selects.append(f"SELECT {', '.join(select_columns)} FROM {schema}.sensor_readings")
+
+        conn.execute(
+            "CREATE TEMP VIEW sensor_readings AS " + " UNION ALL ".join(selects)
+        )
+        self._view_signatures[id(conn)] = signature
+
+    def _unbind_view(self, conn):
+        """Remove a view e desanexa as partições de uma conexão de leitura"""
+        conn.execute("DROP VIEW IF EXISTS temp.sensor_readings")
+        for row in conn.execute("PRAGMA database_list").fetchall():
+            if row[1].startswith('p_'):
+                conn.execute(f"DETACH DATABASE {row[1]}")
+        self._view_signatures.pop(id(conn), None)
+
+    @contextmanager
+    def _open_reader(self, path):
+        """Abre uma conexão somente leitura direta a um arquivo (sem view)"""
+        conn = sqlite3.connect(
+            Path(path).resolve().as_uri() + '?mode=ro',
+            uri=True, check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        try:
+            self._apply_pragmas(conn, writer=False)
+            yield conn
+        finally:
+            conn.close()
+
+    def _partition_paths(self, start=None, end=None, newest_first=False):
+        """Arquivos das partições com leituras no intervalo [start, end)"""
+        start = '' if start is None else str(start)
+        end = '\uffff' if end is None else str(end)
+        order = 'DESC' if newest_first else 'ASC'
+
+        with super().read_connection() as conn:
+            rows = conn.execute(
+                f"SELECT path FROM reading_partitions "
+                f"WHERE rows > 0 AND max_timestamp >= ? AND min_timestamp < ? "
+                f"ORDER BY month {order}",
+                (start, end)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_recent_readings(self, limit=100, cultura=None):
+        """
+        Retorna leituras recentes, abrindo partições do mês mais novo para trás
+        até completar o limite
+        """
+        if cultura:
+            query = DASHBOARD_QUERIES['recent_readings_cultura']['sql']
+            prefix = [cultura]
+        else:
+            query = DASHBOARD_QUERIES['recent_readings']['sql']
+            prefix = []
+
+        # Leituras anteriores ao particionamento ficam no banco principal
+        sources = self._partition_paths(newest_first=True) + [self.db_path]
+
+        frames = []
+        remaining = limit
+        for path in sources:
+            with self._open_reader(path) as conn:
+                df = pd.read_sql_query(query, conn, params=prefix + [remaining])
+            frames.append(df)
+            remaining -= len(df)
+            if remaining <= 0:
+                break
+
+        return pd.concat(frames, ignore_index=True)
+
+    def iter_readings(self, start=None, end=None, cultura=None,
+                      chunk_rows=10000, as_numpy=False):
+        """
+        Percorre leituras em ordem (timestamp, id) abrindo só as partições
+        do intervalo, uma de cada vez (mesma API de FarmTechDatabase)
+        """
+        sources = [self.db_path] + self._partition_paths(start, end)
+        start = '' if start is None else str(start)
+        end = '\uffff' if end is None else str(end)
+
+        for path in sources:
+            with self._open_reader(path) as conn:
+                yield from self._iter_reading_chunks(
+                    lambda: nullcontext(conn), start, end, cultura,
+                    chunk_rows, as_numpy
+                )
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida das partições
+    # ------------------------------------------------------------------
+
+    def partition_status(self):
+        """Retorna o catálogo de partições com o tamanho de cada arquivo"""
+        with super().read_connection() as conn:
+            df = pd.read_sql_query(
+                "SELECT * FROM reading_partitions ORDER BY month", conn
+            )
+        df['bytes'] = [
+            os.path.getsize(path) if os.path.exists(path) else None
+            for path in df['path']
+        ]
+        return df
+
+    def seal_partitions(self, keep_months=1, now=None):
+        """
+        Torna somente leitura as partições anteriores aos últimos keep_months
+
+        Args:
+            keep_months (int): Meses recentes que continuam graváveis
+            now (datetime): Referência de tempo em UTC (padrão: agora)
+
+        Returns:
+            list: Meses selados nesta chamada
+        """
+        if now is None:
+            now = datetime.now(timezone.utc)
+        cutoff = _month_offset(now.strftime('%Y-%m'), -(keep_months - 1))
+
+        months = [row[0] for row in self.conn.execute(
+            "SELECT month FROM reading_partitions "
+            "WHERE read_only = 0 AND month < ? ORDER BY month",
+            (cutoff,)
+        ).fetchall()]
+        return [month for month in months if self.seal_partition(month)]
+
+    def seal_partition(self, month):
+        """
+        Fecha uma partição: checkpoint do WAL, journal DELETE, VACUUM e
+        arquivo somente leitura
+
+        Returns:
+            bool: True se a partição foi selada
+        """
+        with self._write_lock:
+            path = self._catalog_path(month)
+            self._detach_everywhere(month)
+
+            conn = sqlite3.connect(path)
+            try:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                journal_mode = conn.execute("PRAGMA journal_mode = DELETE").fetchone()[0]
+                if journal_mode.lower() != 'delete':
+                    logging.warning(f"⚠️ Partição {month} em uso; selagem adiada")
+                    return False
+                conn.execute("VACUUM")
+            finally:
+                conn.close()
+
+            os.chmod(path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            self.conn.execute(
+                "UPDATE reading_partitions SET read_only = 1 WHERE month = ?", (month,)
+            )
+            self.conn.commit()
+
+        logging.info(f"🔒 Partição {month} selada: {path}")
+        return True
+
+    def archive_partition(self, month, archive_dir):
+        """
+        Move uma partição selada para outro diretório (ex.: disco de arquivo)
+
+        A partição continua consultável no novo caminho.
+
+        Returns:
+            Path: Novo caminho do arquivo
+        """
+        with self._write_lock:
+            self._require_sealed(month)
+            path = Path(self._catalog_path(month))
+            self._detach_everywhere(month)
+
+            archive_dir = Path(archive_dir)
+            archive_dir.mkdir(parents=True, exist_ok=True)
+            new_path = archive_dir / path.name
+            shutil.move(str(path), new_path)
+
+            self.conn.execute(
+                "UPDATE reading_partitions SET path = ? WHERE month = ?",
+                (str(new_path), month)
+            )
+            self.conn.commit()
+
+        logging.info(f"📦 Partição {month} arquivada em {new_path}")
+        return new_path
+
+    def drop_partition(self, month):
+        """
+        Descarta uma partição inteira com suas previsões e ações
+
+        Os rollups são mantidos (já contêm o dado agregado), como na
+        retenção de database/retention.py, mas sem apagar linha a linha.
+
+        Returns:
+            int: Leituras descartadas
+        """
+        with self._write_lock:
+            path = self._catalog_path(month)
+            self._detach_everywhere(month)
+            self._attach_writer([month])
+            schema = self._schema(month)
+
+            with self.write_transaction() as cursor:
+                for table in ('predictions', 'irrigation_actions'):
+                    cursor.execute(
+                        f"DELETE FROM {table} WHERE reading_id IN "
+                        f"(SELECT id FROM {schema}.sensor_readings)"
+                    )
+                cursor.execute(
+                    "SELECT rows FROM reading_partitions WHERE month = ?", (month,)
+                )
+                rows = cursor.fetchone()[0]
+                cursor.execute("DELETE FROM reading_partitions WHERE month = ?", (month,))
+
+            self._detach_writer(month)
+            os.chmod(path, stat.S_IRUSR | stat.S_IWUSR)
+            os.remove(path)
+
+        logging.info(f"🗑️ Partição {month} descartada: {rows} leituras")
+        return rows
+
+    def migrate_legacy(self, chunk_rows=10000):
+        """
+        Move as leituras do banco principal (anteriores ao particionamento)
+        para as partições mensais, mantendo os IDs
+
+        Returns:
+            int: Leituras migradas
+        """
+        total = 0
+        while True:
+            with self._write_lock:
+                rows = self.conn.execute(
+                    "SELECT * FROM main.sensor_readings ORDER BY id LIMIT ?",
+                    (chunk_rows,)
+                ).fetchall()
+                if not rows:
+                    break
+
+                months = sorted({str(row['timestamp'])[:7] for row in rows})
+                self._prepare_partitions(months)
+
+                with self.write_transaction() as cursor:
+                    by_month = {}
+                    for row in rows:
+                        by_month.setdefault(str(row['timestamp'])[:7], []).append(tuple(row))
+                    for month, month_rows in by_month.items():
+                        cursor.executemany(
+                            SQL_INSERT_PARTITION_READING.format(schema=self._schema(month)),
+                            month_rows
+                        )
+                        timestamps = [row[1] for row in month_rows]
+                        cursor.execute(SQL_UPDATE_CATALOG, (
+                            month_rows[0][0], month_rows[-1][0],
+                            min(timestamps), max(timestamps), len(month_rows), month
+                        ))
+                    cursor.execute(
+                        "DELETE FROM main.sensor_readings WHERE id <= ?", (rows[-1]['id'],)
+                    )
+            total += len(rows)
+
+        logging.info(f"🗂️ {total} leituras migradas para partições mensais")
+        return total
+
+    def _catalog_path(self, month):
+        """Caminho registrado de uma partição"""
+        row = self.conn.execute(
+            "SELECT path FROM reading_partitions WHERE month = ?", (month,)
+        ).fetchone()
+        if row is None:
+            raise ValueError(f"Partição inexistente: {month}")
+        return row[0]
+
+    def _require_sealed(self, month):
+        """Garante que a partição já foi selada"""
+        row = self.conn.execute(
+            "SELECT read_only FROM reading_partitions WHERE month = ?", (month,)
+        ).fetchone()
+        if row is None or not row[0]:
+            raise ValueError(f"Partição {month} precisa ser selada antes")
+
+    def _detach_everywhere(self, month):
+        """
+        Desanexa uma partição da conexão de escrita e de todo o pool de
+        leitura (espera conexões emprestadas voltarem)
+        """
+        self._detach_writer(month)
+
+        schema = self._schema(month)
+        pool_size = int(self.storage_profile['read_pool_size'])
+        borrowed = [self._read_pool.get() for _ in range(pool_size)]
+        try:
+            for conn in borrowed:
+                attached = {row[1] for row in conn.execute("PRAGMA database_list")}
+                if schema in attached:
+                    self._unbind_view(conn)
+        finally:
+            for conn in borrowed:
+                self._read_pool.put(conn)
+
+
+if __name__ == "__main__":
+    # Uso:
+    #   python database/partitioned.py status
+    #   python database/partitioned.py migrate
+    #   python database/partitioned.py seal [meses_graváveis]
+    #   python database/partitioned.py archive AAAA-MM DIRETÓRIO
+    #   python database/partitioned.py drop AAAA-MM
+    command = sys.argv[1] if len(sys.argv) > 1 else 'status'
+
+    db = PartitionedFarmTechDatabase('database/farmtech.db')
+
+    try:
+        if command == 'migrate':
+            print(f"🗂️ {db.migrate_legacy()} leituras migradas")
+        elif command == 'seal':
+            keep_months = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+            print(f"🔒 Partições seladas: {db.seal_partitions(keep_months)}")
+        elif command == 'archive':
+            print(f"📦 Arquivada em {db.archive_partition(sys.argv[2], sys.argv[3])}")
+        elif command == 'drop':
+            print(f"🗑️ {db.drop_partition(sys.argv[2])} leituras descartadas")
+
+        print("\n🗂️ Partições:")
+        print(db.partition_status().to_string(index=False))
+    finally:
+        db.close()
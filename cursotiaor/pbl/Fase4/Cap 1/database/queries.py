@@ -0,0 +1,176 @@
+"""
+FarmTech Solutions - Consultas do Dashboard
+===========================================
+SQL do dashboard e de consulta_db.py, sem dependências: importar este
+módulo não abre banco nem configura logging (database_manager.py
+configura o log da ingestão ao ser importado).
+"""
+
+# Consultas do dashboard e de consulta_db.py, auditadas com EXPLAIN QUERY PLAN
+# (python database/database_manager.py --audit)
+# - sql: comando com parâmetros posicionais
+# - params: valores de exemplo usados na auditoria
+# - full_scan_ok: a consulta lê todo o histórico de propósito
+# - since: posição do parâmetro com o início do intervalo (o backend
+#   particionado anexa só as partições a partir dele)
+DASHBOARD_QUERIES = {
+    'recent_readings': {
+        'sql': '''
+            SELECT * FROM sensor_readings
+            ORDER BY timestamp DESC LIMIT ?
+        ''',
+        'params': (100,)
+    },
+    'recent_readings_cultura': {
+        'sql': '''
+            SELECT * FROM sensor_readings
+            WHERE cultura = ?
+            ORDER BY timestamp DESC LIMIT ?
+        ''',
+        'params': ('banana', 100)
+    },
+    'iter_readings': {
+        'sql': '''
+            SELECT * FROM sensor_readings
+            WHERE timestamp >= ? AND timestamp < ?
+              AND (timestamp, id) > (?, ?)
+            ORDER BY timestamp, id
+            LIMIT ?
+        ''',
+        'params': ('2025-06-01 00:00:00', '2026-01-01 00:00:00',
+                   '2025-06-01 00:00:00', 0, 10000)
+    },
+    'iter_readings_cultura': {
+        'sql': '''
+            SELECT * FROM sensor_readings
+            WHERE cultura = ? AND timestamp >= ? AND timestamp < ?
+              AND (timestamp, id) > (?, ?)
+            ORDER BY timestamp, id
+            LIMIT ?
+        ''',
+        'params': ('banana', '2025-06-01 00:00:00', '2026-01-01 00:00:00',
+                   '2025-06-01 00:00:00', 0, 10000)
+    },
+    'latest_timestamp': {
+        'sql': "SELECT MAX(timestamp) FROM sensor_readings",
+        'params': ()
+    },
+    'time_series': {
+        'sql': '''
+            SELECT 
+                s.id,
+                s.timestamp,
+                s.temperatura,
+                s.umidade_solo,
+                s.ph_solo,
+                s.nitrogenio as nitrogenio_ok,
+                s.fosforo as fosforo_ok,
+                s.potassio as potassio_ok,
+                s.irrigacao_ativa,
+                s.cultura,
+                i.duracao_minutos,
+                i.volume_aplicado as volume_litros
+            FROM sensor_readings s
+            LEFT JOIN irrigation_actions i ON s.id = i.reading_id
+            WHERE s.timestamp >= ?
+            ORDER BY s.timestamp
+        ''',
+        'params': ('2025-01-01 00:00:00',),
+        'since': 0
+    },
+    'time_series_cultura': {
+        'sql': '''
+            SELECT 
+                s.id,
+                s.timestamp,
+                s.temperatura,
+                s.umidade_solo,
+                s.ph_solo,
+                s.nitrogenio as nitrogenio_ok,
+                s.fosforo as fosforo_ok,
+                s.potassio as potassio_ok,
+                s.irrigacao_ativa,
+                s.cultura,
+                i.duracao_minutos,
+                i.volume_aplicado as volume_litros
+            FROM sensor_readings s
+            LEFT JOIN irrigation_actions i ON s.id = i.reading_id
+            WHERE s.cultura = ? AND s.timestamp >= ?
+            ORDER BY s.timestamp
+        ''',
+        'params': ('banana', '2025-01-01 00:00:00'),
+        'since': 1
+    },
+    'analysis_data': {
+        'sql': '''
+            SELECT 
+                s.id,
+                s.timestamp,
+                s.temperatura,
+                s.umidade_solo,
+                s.ph_solo,
+                s.nitrogenio as nitrogenio_ok,
+                s.fosforo as fosforo_ok,
+                s.potassio as potassio_ok,
+                s.irrigacao_ativa,
+                s.cultura,
+                i.duracao_minutos,
+                i.volume_aplicado as volume_litros,
+                i.motivo as motivo_irrigacao
+            FROM sensor_readings s
+            LEFT JOIN irrigation_actions i ON s.id = i.reading_id
+            ORDER BY s.timestamp DESC
+        ''',
+        'params': (),
+        'full_scan_ok': True
+    },
+    'predictions_history': {
+        'sql': '''
+            SELECT p.*, s.temperatura, s.umidade_solo, s.ph_solo
+            FROM predictions p
+            JOIN sensor_readings s ON p.reading_id = s.id
+            ORDER BY p.timestamp DESC
+            LIMIT ?
+        ''',
+        'params': (50,)
+    },
+    'recent_actions': {
+        'sql': '''
+            SELECT 
+                i.id,
+                i.timestamp,
+                i.acao,
+                i.motivo,
+                i.volume_aplicado,
+                i.duracao_minutos,
+                s.temperatura,
+                s.umidade_solo,
+                s.cultura
+            FROM irrigation_actions i
+            JOIN sensor_readings s ON i.reading_id = s.id
+            ORDER BY i.timestamp DESC
+            LIMIT ?
+        ''',
+        'params': (10,)
+    },
+    'recent_predictions': {
+        'sql': '''
+            SELECT 
+                p.id,
+                p.timestamp,
+                p.volume_irrigacao,
+                p.dosagem_n,
+                p.dosagem_p,
+                p.dosagem_k,
+                p.rendimento_estimado,
+                p.confianca,
+                p.modelo_versao,
+                s.cultura
+            FROM predictions p
+            JOIN sensor_readings s ON p.reading_id = s.id
+            ORDER BY p.timestamp DESC
+            LIMIT ?
+        ''',
+        'params': (5,)
+    }
+}
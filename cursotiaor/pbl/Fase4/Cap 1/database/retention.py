@@ -0,0 +1,389 @@
+"""
+FarmTech Solutions - Retenção e Downsampling
+============================================
+Remove dados antigos em pequenos lotes segundo políticas por tabela
+e devolve o espaço ao sistema com incremental vacuum.
+
+Os rollups (minuto/hora/dia) já são o dado reduzido: são atualizados na
+ingestão, então apagar leituras brutas antigas não perde os agregados.
+
+No backend particionado (database/partitioned.py) as leituras brutas
+vencidas saem por partição mensal inteira: descartada ou, com
+archive_dir, selada e movida para o diretório de arquivo.
+"""
+
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from database.database_manager import FarmTechDatabase
+from database.partitioned import PartitionedFarmTechDatabase
+
+# Política padrão: dias de retenção por tabela (None = manter para sempre)
+DEFAULT_RETENTION_POLICY = {
+    'sensor_readings': 7,
+    'sensor_rollup_minute': 90,
+    'sensor_rollup_hour': None,
+    'sensor_rollup_day': None,
+    'ingest_keys': 30
+}
+
+# Coluna de tempo usada para decidir a idade de cada tabela
+TIME_COLUMNS = {
+    'sensor_readings': 'timestamp',
+    'sensor_rollup_minute': 'bucket',
+    'sensor_rollup_hour': 'bucket',
+    'sensor_rollup_day': 'bucket',
+    'ingest_keys': 'ingested_at'
+}
+
+# Ordem de descarte quando o arquivo passa do limite de tamanho
+SIZE_TRIM_ORDER = ['sensor_readings', 'sensor_rollup_minute']
+
+# Política da última passada de retenção, lida pelo dashboard
+SQL_CREATE_POLICY_TABLE = '''
+    CREATE TABLE IF NOT EXISTS retention_policy (
+        tabela TEXT PRIMARY KEY,
+        dias INTEGER,
+        aplicada_em TEXT NOT NULL
+    )
+'''
+
+
+def load_retention_policy(db: FarmTechDatabase):
+    """
+    Política de retenção em vigor no banco
+
+    É a gravada pela última passada de RetentionManager.run; bancos em
+    que a retenção nunca rodou devolvem a política padrão.
+
+    Returns:
+        dict: Dias de retenção por tabela (None = manter para sempre)
+    """
+    policy = dict(DEFAULT_RETENTION_POLICY)
+    with db.read_connection() as conn:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'retention_policy'"
+        ).fetchone()
+        if exists:
+            policy.update(conn.execute("SELECT tabela, dias FROM retention_policy").fetchall())
+    return policy
+
+
+class RetentionManager:
+    """Aplica políticas de retenção ao banco FarmTech"""
+
+    def __init__(self, db: FarmTechDatabase, policy=None, chunk_rows=500,
+                 pause_seconds=0.01, vacuum_pages=256, max_db_bytes=None,
+                 archive_dir=None):
+        """
+        Inicializa o gerenciador de retenção
+
+        Args:
+            db: Instância do FarmTechDatabase
+            policy (dict): Dias de retenção por tabela (sobrescreve o padrão)
+            chunk_rows (int): Linhas removidas por transação
+            pause_seconds (float): Pausa entre lotes para liberar o gravador
+            vacuum_pages (int): Páginas devolvidas por passo de incremental vacuum
+            max_db_bytes (int): Tamanho máximo em uso do banco (None = sem limite)
+            archive_dir: Backend particionado: move as partições vencidas para
+                         este diretório em vez de descartá-las
+        """
+        self.db = db
+        self.policy = dict(DEFAULT_RETENTION_POLICY)
+        if policy:
+            self.policy.update(policy)
+
+        unknown = set(self.policy) - set(TIME_COLUMNS)
+        if unknown:
+            raise ValueError(f"Tabelas sem política de retenção suportada: {sorted(unknown)}")
+
+        self.chunk_rows = chunk_rows
+        self.pause_seconds = pause_seconds
+        self.vacuum_pages = vacuum_pages
+        self.max_db_bytes = max_db_bytes
+        self.archive_dir = None if archive_dir is None else Path(archive_dir)
+        self.partitioned = isinstance(db, PartitionedFarmTechDatabase)
+
+    def run(self, now=None):
+        """
+        Executa uma passada completa de retenção
+
+        Args:
+            now (datetime): Referência de tempo em UTC (padrão: agora)
+
+        Returns:
+            dict: Linhas removidas por tabela e bytes em uso antes/depois
+        """
+        if now is None:
+            now = datetime.now(timezone.utc)
+
+        report = {'removidas': {}, 'bytes_antes': self.used_bytes()}
+        self._save_policy(now)
+
+        for table, days in self.policy.items():
+            if days is None:
+                continue
+            cutoff = (now - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+            report['removidas'][table] = self.purge_before(table, cutoff)
+
+        if self.max_db_bytes is not None:
+            for table, removed in self.trim_to_size().items():
+                report['removidas'][table] = report['removidas'].get(table, 0) + removed
+
+        self.reclaim_space()
+        report['bytes_depois'] = self.used_bytes()
+
+        logging.info(f"🧹 Retenção concluída: {report['removidas']} | "
+                    f"{report['bytes_antes'] / 1024:.0f} KB → "
+                    f"{report['bytes_depois'] / 1024:.0f} KB")
+        return report
+
+    def _save_policy(self, now):
+        """Grava a política desta passada em retention_policy"""
+        applied_at = now.strftime('%Y-%m-%d %H:%M:%S')
+        with self.db.write_transaction() as cursor:
+            cursor.execute(SQL_CREATE_POLICY_TABLE)
+            cursor.execute("DELETE FROM retention_policy")
+            cursor.executemany(
+                "INSERT INTO retention_policy (tabela, dias, aplicada_em) VALUES (?, ?, ?)",
+                [(table, days, applied_at) for table, days in self.policy.items()]
+            )
+
+    def purge_before(self, table, cutoff):
+        """
+        Remove linhas de uma tabela mais antigas que o corte, lote a lote
+
+        Returns:
+            int: Total de linhas removidas
+        """
+        time_column = TIME_COLUMNS[table]
+        total = 0
+        if table == 'sensor_readings' and self.partitioned:
+            total += self._expire_partitions(cutoff)
+
+        while True:
+            removed = self._delete_chunk(
+                table,
+                f"{time_column} < ?",
+                (cutoff,)
+            )
+            total += removed
+            if removed < self.chunk_rows:
+                return total
+            self._pause()
+
+    def trim_to_size(self):
+        """
+        Descarta os dados mais antigos até o banco caber em max_db_bytes
+
+        used_bytes já desconta as páginas livres, então o espaço só é
+        devolvido ao sistema uma vez, no fim.
+
+        Returns:
+            dict: Linhas removidas por tabela
+        """
+        removed = {}
+
+        for table in SIZE_TRIM_ORDER:
+            time_column = TIME_COLUMNS[table]
+            if table == 'sensor_readings' and self.partitioned:
+                # Partições inteiras, da mais antiga, menos o mês corrente
+                for month in self._partition_months()[:-1]:
+                    if self.used_bytes() <= self.max_db_bytes:
+                        break
+                    count = self._release_partition(month)
+                    removed[table] = removed.get(table, 0) + count
+            while self.used_bytes() > self.max_db_bytes:
+                count = self._delete_chunk(table, None, (), order_by=time_column)
+                if count == 0:
+                    break
+                removed[table] = removed.get(table, 0) + count
+                self._pause()
+
+        if removed:
+            self.reclaim_space()
+        return removed
+
+    def _delete_chunk(self, table, condition, params, order_by=None):
+        """Remove até chunk_rows linhas em uma transação curta"""
+        where = f"WHERE {condition}" if condition else ""
+        order = f"ORDER BY {order_by}" if order_by else ""
+
+        with self.db.write_transaction() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {table} {where} {order} LIMIT ?",
+                (*params, self.chunk_rows)
+            )
+            row_ids = [row[0] for row in cursor.fetchall()]
+            if not row_ids:
+                return 0
+
+            placeholders = ','.join('?' * len(row_ids))
+            if table == 'sensor_readings':
+                # Previsões e ações dependem da leitura (FOREIGN KEY)
+                cursor.execute(
+                    f"DELETE FROM predictions WHERE reading_id IN ({placeholders})",
+                    row_ids
+                )
+                cursor.execute(
+                    f"DELETE FROM irrigation_actions WHERE reading_id IN ({placeholders})",
+                    row_ids
+                )
+            cursor.execute(
+                f"DELETE FROM {table} WHERE rowid IN ({placeholders})",
+                row_ids
+            )
+
+        return len(row_ids)
+
+    def _partition_months(self, cutoff=None):
+        """
+        Meses das partições ainda no disco principal, do mais antigo
+
+        Args:
+            cutoff (str): Só partições com todas as leituras antes do corte
+        """
+        query = "SELECT month, path, max_timestamp FROM reading_partitions ORDER BY month"
+        with self.db._write_lock:
+            partitions = self.db.conn.execute(query).fetchall()
+
+        months = []
+        for month, path, max_timestamp in partitions:
+            if self.archive_dir is not None and Path(path).parent == self.archive_dir:
+                continue
+            if cutoff is not None:
+                # Partição vazia: vencida quando o mês inteiro é anterior ao corte
+                newest = max_timestamp or f"{month}-31 23:59:59"
+                if str(newest) >= cutoff:
+                    continue
+            months.append(month)
+        return months
+
+    def _expire_partitions(self, cutoff):
+        """
+        Descarta (ou arquiva) as partições com todas as leituras antes do corte
+
+        Returns:
+            int: Leituras removidas do disco principal
+        """
+        return sum(self._release_partition(month)
+                   for month in self._partition_months(cutoff))
+
+    def _release_partition(self, month):
+        """Descarta uma partição ou, com archive_dir, sela e arquiva"""
+        if self.archive_dir is None:
+            return self.db.drop_partition(month)
+
+        with self.db._write_lock:
+            rows, read_only = self.db.conn.execute(
+                "SELECT rows, read_only FROM reading_partitions WHERE month = ?", (month,)
+            ).fetchone()
+        if not read_only and not self.db.seal_partition(month):
+            return 0
+        self.db.archive_partition(month, self.archive_dir)
+        return rows
+
+    def reclaim_space(self):
+        """
+        Devolve páginas livres ao sistema em passos de vacuum_pages
+
+        Só reduz o arquivo com auto_vacuum=INCREMENTAL; bancos antigos
+        precisam de enable_incremental_vacuum() uma vez.
+        """
+        previous_free = None
+
+        while self.auto_vacuum_mode() == 2:
+            free_pages = self._pragma('freelist_count')
+            if free_pages == 0 or free_pages == previous_free:
+                break
+            previous_free = free_pages
+            self.db.execute_maintenance(
+                f"PRAGMA incremental_vacuum({self.vacuum_pages})", script=True
+            )
+            self._pause()
+
+        # Sem efeito fora do modo WAL
+        self.db.execute_maintenance("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def enable_incremental_vacuum(self):
+        """
+        Converte um banco existente para auto_vacuum=INCREMENTAL
+
+        Requer um VACUUM completo (bloqueia o gravador enquanto reescreve
+        o arquivo), então deve rodar uma única vez em janela de manutenção.
+        """
+        if self.auto_vacuum_mode() == 2:
+            return False
+
+        self.db.execute_maintenance("PRAGMA auto_vacuum = INCREMENTAL")
+        self.db.execute_maintenance("VACUUM")
+
+        logging.info("🧹 Banco convertido para auto_vacuum=INCREMENTAL")
+        return True
+
+    def auto_vacuum_mode(self):
+        """Retorna o modo de auto_vacuum (0=NONE, 1=FULL, 2=INCREMENTAL)"""
+        return self._pragma('auto_vacuum')
+
+    def used_bytes(self):
+        """
+        Bytes ocupados por páginas em uso (exclui páginas livres)
+
+        No backend particionado inclui os arquivos das partições ainda no
+        disco principal.
+        """
+        with self.db._write_lock:
+            page_count = self._pragma('page_count')
+            free_pages = self._pragma('freelist_count')
+            page_size = self._pragma('page_size')
+            used = (page_count - free_pages) * page_size
+            if self.partitioned:
+                paths = dict(self.db.conn.execute(
+                    "SELECT month, path FROM reading_partitions"
+                ).fetchall())
+                used += sum(os.path.getsize(paths[month]) for month in self._partition_months()
+                            if os.path.exists(paths[month]))
+        return used
+
+    def _pragma(self, name):
+        """
+        Valor de um PRAGMA na conexão de escrita
+
+        Com o lock do gravador: a conexão é compartilhada com a ingestão.
+        """
+        with self.db._write_lock:
+            return self.db.conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+    def _pause(self):
+        """Libera o gravador entre lotes"""
+        if self.pause_seconds:
+            time.sleep(self.pause_seconds)
+
+
+if __name__ == "__main__":
+    # Uso: python database/retention.py [--max-mb N] [--enable-incremental-vacuum]
+    max_db_bytes = None
+    if '--max-mb' in sys.argv:
+        max_db_bytes = int(float(sys.argv[sys.argv.index('--max-mb') + 1]) * 1024 * 1024)
+
+    db = FarmTechDatabase('database/farmtech.db')
+    retention = RetentionManager(db, max_db_bytes=max_db_bytes)
+
+    try:
+        if '--enable-incremental-vacuum' in sys.argv:
+            retention.enable_incremental_vacuum()
+
+        report = retention.run()
+        print("\n🧹 Retenção aplicada:")
+        for table, removed in report['removidas'].items():
+            print(f"   {table}: {removed} linhas removidas")
+        print(f"   Tamanho em uso: {report['bytes_antes'] / 1024:.0f} KB → "
+              f"{report['bytes_depois'] / 1024:.0f} KB")
+    finally:
+        db.close()
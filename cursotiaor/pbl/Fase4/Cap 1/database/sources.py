@@ -0,0 +1,393 @@
+"""
+FarmTech Solutions - Fontes de Ingestão
+=======================================
+Fontes de leituras para AutoIngestion, além da simulação:
+
+- SerialSource: lê o Serial Monitor do ESP32 em streaming e monta uma
+  leitura a cada bloco completo (SensorFrameParser de collect_serial_data)
+- MultiSerialSource: vários ESP32 no mesmo gateway, uma thread de leitura
+  por porta, leituras marcadas com device_id em uma fila única
+- ReplaySource: reproduz arquivos CSV/Parquet (ex.: sensor_data_banana.csv)
+  pelo caminho completo de ingestão, mantendo o horário original de cada
+  leitura, em tempo real ou acelerado (speed)
+- SyntheticSource: leituras sintéticas de vários dispositivos a uma taxa
+  controlada, para testes de carga (database/benchmark.py)
+
+Toda fonte expõe read() -> dict (ou None quando acabou) e close().
+"""
+
+import heapq
+import logging
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from database.metrics import QUEUE_DEPTH
+
+# Campos que formam uma leitura completa
+READING_FIELDS = ['temperatura', 'umidade_solo', 'ph_solo', 'nitrogenio',
+                  'fosforo', 'potassio', 'irrigacao_ativa']
+
+# Colunas 0/1 (CSV traz inteiros; Parquet exportado traz booleanos)
+FLAG_FIELDS = ['nitrogenio', 'fosforo', 'potassio', 'irrigacao_ativa']
+
+# Marca de fim na fila de MultiSerialSource
+_SOURCE_CLOSED = object()
+
+
+class SerialSource:
+    """Leituras do ESP32 via porta serial"""
+
+    def __init__(self, port, baudrate=115200, cultura='banana', timeout=1.0,
+                 device_id=None):
+        """
+        Inicializa a fonte serial (a porta abre na primeira leitura)
+
+        Args:
+            port: Porta serial (COM3 no Windows, /dev/ttyUSB0 no Linux)
+            baudrate: Taxa de transmissão (115200 para ESP32)
+            cultura (str): Cultura monitorada (se a telemetria não informar)
+            timeout (float): Espera máxima (s) por linha antes de checar close()
+            device_id (str): Identificação do ESP32 (padrão: nome da porta)
+        """
+        # pyserial só é necessário para esta fonte
+        from collect_serial_data import SerialDataCollector
+
+        self.collector = SerialDataCollector(port=port, baudrate=baudrate)
+        self.cultura = cultura
+        self.timeout = timeout
+        self.device_id = device_id or Path(port).name
+        self._closed = False
+
+    def _open(self):
+        """Abre a porta serial"""
+        if not self.collector.connect():
+            raise ConnectionError(f"Não foi possível abrir a porta {self.collector.port}")
+        self.collector.serial_conn.timeout = self.timeout
+
+    def read(self):
+        """
+        Bloqueia até o ESP32 enviar uma leitura completa
+
+        Returns:
+            dict: Leitura (ou None após close())
+        """
+        if self.collector.serial_conn is None:
+            self._open()
+
+        while not self._closed:
+            try:
+                reading = self.collector.read_reading()
+            except Exception:
+                # close() em outra thread fecha a porta durante a leitura
+                if self._closed:
+                    return None
+                raise
+            if reading is None:
+                continue
+
+            # Horário de recepção em UTC (o do coletor é local): chave
+            # natural (device_id, timestamp) mesmo se a gravação atrasar
+            reading['timestamp'] = datetime.now(timezone.utc)
+            reading['device_id'] = self.device_id
+            reading.setdefault('cultura', self.cultura)
+            return reading
+
+        return None
+
+    def close(self):
+        """Encerra a leitura e fecha a porta"""
+        self._closed = True
+        self.collector.disconnect()
+
+
+class MultiSerialSource:
+    """Leituras de vários ESP32, uma thread de leitura por porta"""
+
+    def __init__(self, ports, baudrate=115200, cultura='banana', timeout=1.0,
+                 queue_size=5000, reconnect_delay=5.0):
+        """
+        Inicializa a fonte (as portas abrem em start() ou na primeira leitura)
+
+        Args:
+            ports: Lista de portas (device_id = nome da porta) ou
+                   dict {device_id: porta}
+            baudrate: Taxa de transmissão (115200 para ESP32)
+            cultura (str): Cultura padrão (se a telemetria não informar)
+            timeout (float): Espera máxima (s) por linha antes de checar close()
+            queue_size (int): Capacidade da fila compartilhada
+            reconnect_delay (float): Pausa (s) antes de reabrir uma porta que falhou
+        """
+        if not isinstance(ports, dict):
+            ports = {Path(port).name: port for port in ports}
+
+        self.devices = dict(ports)
+        self.baudrate = baudrate
+        self.cultura = cultura
+        self.timeout = timeout
+        self.reconnect_delay = reconnect_delay
+        self.device_counts = {device_id: 0 for device_id in self.devices}
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._sources = {}
+        self._threads = []
+        self._closed = threading.Event()
+
+    def start(self):
+        """Inicia uma thread de leitura por porta"""
+        if self._threads:
+            return
+
+        QUEUE_DEPTH.set_function(self._queue.qsize, fila='portas')
+        for device_id, port in self.devices.items():
+            thread = threading.Thread(target=self._read_port, args=(device_id, port),
+                                      name=f'farmtech-serial-{device_id}', daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+        logging.info(f"📡 Lendo {len(self.devices)} porta(s): "
+                     f"{', '.join(f'{d}={p}' for d, p in self.devices.items())}")
+
+    def _read_port(self, device_id, port):
+        """Thread de uma porta: lê, marca o device_id e enfileira"""
+        while not self._closed.is_set():
+            source = SerialSource(port, baudrate=self.baudrate, cultura=self.cultura,
+                                  timeout=self.timeout, device_id=device_id)
+            self._sources[device_id] = source
+            try:
+                while not self._closed.is_set():
+                    reading = source.read()
+                    if reading is None:
+                        break
+                    # put bloqueante: backpressure quando o gravador atrasa
+                    self._queue.put(reading)
+                    self.device_counts[device_id] += 1
+            except Exception as e:
+                logging.error(f"❌ Porta {port} ({device_id}): {e}")
+            finally:
+                source.close()
+
+            # Porta caiu ou não abriu: tenta de novo até close()
+            self._closed.wait(self.reconnect_delay)
+
+    def read(self):
+        """
+        Retorna a próxima leitura de qualquer porta
+
+        Returns:
+            dict: Leitura com 'device_id' (ou None após close())
+        """
+        self.start()
+        if self._closed.is_set():
+            return None
+        reading = self._queue.get()
+        return None if reading is _SOURCE_CLOSED else reading
+
+    def close(self):
+        """Encerra as threads e fecha as portas"""
+        self._closed.set()
+        for source in list(self._sources.values()):
+            source.close()
+        # Acorda um read() bloqueado na fila
+        try:
+            self._queue.put_nowait(_SOURCE_CLOSED)
+        except queue.Full:
+            pass
+        for thread in self._threads:
+            thread.join(self.timeout + 1)
+
+
+class ReplaySource:
+    """Reprodução de arquivos CSV/Parquet de leituras"""
+
+    def __init__(self, paths, speed=None, cultura=None, chunk_rows=5000):
+        """
+        Inicializa a reprodução
+
+        Vários arquivos (ex.: banana e milho) são intercalados pelo
+        timestamp; cada arquivo deve estar em ordem cronológica. O
+        device_id vem da coluna 'device_id' ou do nome do arquivo, então
+        reproduzir o mesmo arquivo de novo não duplica leituras.
+
+        Args:
+            paths: Arquivo(s) .csv, .parquet ou diretório Parquet particionado
+            speed (float): Multiplicador de velocidade (1 = tempo real,
+                           3600 = uma hora por segundo, None = sem pausa)
+            cultura (str): Cultura para arquivos sem a coluna 'cultura'
+            chunk_rows (int): Linhas lidas do disco por vez
+        """
+        if isinstance(paths, (str, Path)):
+            paths = [paths]
+
+        self.paths = [Path(path) for path in paths]
+        self.speed = speed
+        self.cultura = cultura
+        self.chunk_rows = chunk_rows
+        self.replayed = 0
+        self._origin = None
+        self._stream = heapq.merge(
+            *(self._iter_file(path, index) for index, path in enumerate(self.paths))
+        )
+
+    def _iter_chunks(self, path):
+        """Lê um arquivo em blocos de DataFrame"""
+        if path.is_dir() or path.suffix == '.parquet':
+            import pyarrow.dataset as ds
+
+            dataset = ds.dataset(path, format='parquet', partitioning='hive')
+            for batch in dataset.to_batches(batch_size=self.chunk_rows):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(path, chunksize=self.chunk_rows)
+
+    def _iter_file(self, path, index):
+        """Gera (segundos, índice do arquivo, linha, leitura) em ordem do arquivo"""
+        row_number = 0
+        for chunk in self._iter_chunks(path):
+            timestamps = pd.to_datetime(chunk['timestamp'], format='ISO8601')
+            chunk['timestamp'] = (timestamps.dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+                                  .str.removesuffix('.000000'))
+            for field in FLAG_FIELDS:
+                chunk[field] = chunk[field].astype(int)
+            if 'cultura' not in chunk.columns:
+                if self.cultura is None:
+                    raise ValueError(f"{path} não tem coluna 'cultura'; informe cultura=")
+                chunk['cultura'] = self.cultura
+            if 'device_id' not in chunk.columns:
+                chunk['device_id'] = path.stem
+            else:
+                chunk['device_id'] = chunk['device_id'].fillna(path.stem)
+
+            seconds = (timestamps - pd.Timestamp(0)).dt.total_seconds()
+            records = chunk[['timestamp', *READING_FIELDS, 'cultura', 'device_id']].to_dict('records')
+            for second, reading in zip(seconds, records):
+                yield second, index, row_number, reading
+                row_number += 1
+
+    def read(self):
+        """
+        Retorna a próxima leitura, esperando o intervalo original / speed
+
+        Returns:
+            dict: Leitura com o 'timestamp' original (ou None no fim)
+        """
+        item = next(self._stream, None)
+        if item is None:
+            return None
+
+        second, _, _, reading = item
+        if self.speed:
+            if self._origin is None:
+                self._origin = (second, time.monotonic())
+            else:
+                delay = (self._origin[1] + (second - self._origin[0]) / self.speed
+                         - time.monotonic())
+                if delay > 0:
+                    time.sleep(delay)
+
+        self.replayed += 1
+        return reading
+
+    def close(self):
+        """Encerra a reprodução"""
+        self._stream = iter(())
+        logging.info(f"⏹️ Reprodução encerrada após {self.replayed} leituras")
+
+
+class SyntheticSource:
+    """Leituras sintéticas a uma taxa controlada"""
+
+    def __init__(self, rate=None, devices=4, max_readings=None, device_prefix='sim',
+                 start=None, seed=None):
+        """
+        Inicializa a fonte
+
+        As leituras seguem a simulação de AutoIngestion e alternam entre os
+        dispositivos; cada dispositivo mede uma vez por segundo a partir de
+        start, então as chaves (device_id, timestamp) nunca se repetem.
+
+        Args:
+            rate (float): Leituras por segundo (None = sem pausa)
+            devices (int): Número de dispositivos simulados
+            max_readings (int): Encerra após N leituras (None = sem limite)
+            device_prefix (str): Prefixo dos device_id (ex.: 'sim' → sim-1, sim-2)
+            start (datetime): Horário da primeira medição (padrão: agora, UTC)
+            seed (int): Semente para repetir a mesma sequência de valores
+        """
+        if start is None:
+            start = datetime.now(timezone.utc).replace(microsecond=0)
+
+        self.rate = rate
+        self.max_readings = max_readings
+        self.devices = [f"{device_prefix}-{index}" for index in range(1, devices + 1)]
+        self.start = start
+        self.produced = 0
+        self._random = random.Random(seed)
+        self._origin = None
+        self._closed = False
+
+    def read(self):
+        """
+        Retorna a próxima leitura no horário previsto pela taxa
+
+        Returns:
+            dict: Leitura com 'device_id' e 'timestamp' (ou None no fim)
+        """
+        if self._closed or (self.max_readings is not None
+                            and self.produced >= self.max_readings):
+            return None
+
+        if self.rate:
+            # Horário previsto fixo: atrasos não se acumulam entre leituras
+            if self._origin is None:
+                self._origin = time.monotonic()
+            delay = self._origin + self.produced / self.rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        rnd = self._random
+        round_number, device = divmod(self.produced, len(self.devices))
+        self.produced += 1
+        return {
+            'timestamp': self.start + timedelta(seconds=round_number),
+            'device_id': self.devices[device],
+            'temperatura': round(20 + rnd.uniform(0, 15), 1),
+            'umidade_solo': round(30 + rnd.uniform(0, 60), 1),
+            'ph_solo': round(5.5 + rnd.uniform(0, 2), 2),
+            'nitrogenio': rnd.choice([0, 1]),
+            'fosforo': rnd.choice([0, 1]),
+            'potassio': rnd.choice([0, 1]),
+            'irrigacao_ativa': rnd.choice([0, 1]),
+            'cultura': rnd.choice(['banana', 'milho'])
+        }
+
+    def close(self):
+        """Encerra a geração"""
+        self._closed = True
+
+
+def build_source(data_source, **options):
+    """
+    Cria a fonte de ingestão pelo nome
+
+    Args:
+        data_source (str): 'serial', 'csv' (CSV/Parquet) ou 'synthetic'
+        **options: Argumentos de SerialSource (port=...), MultiSerialSource
+                   (ports=[...]), ReplaySource ou SyntheticSource
+
+    Returns:
+        SerialSource, MultiSerialSource, ReplaySource ou SyntheticSource
+    """
+    if data_source == 'serial':
+        if 'ports' in options:
+            return MultiSerialSource(**options)
+        return SerialSource(**options)
+    if data_source == 'csv':
+        return ReplaySource(**options)
+    if data_source == 'synthetic':
+        return SyntheticSource(**options)
+    raise ValueError(f"Fonte de dados desconhecida: {data_source}")
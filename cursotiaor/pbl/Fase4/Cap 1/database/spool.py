@@ -0,0 +1,356 @@
+"""
+FarmTech Solutions - Spool Local de Ingestão
+============================================
+Log append-only em disco que recebe as leituras quando o banco está
+indisponível (travado, em migração ou fora do ar) e as reenvia em lote
+quando ele volta:
+
+    database/farmtech_spool/segment-0000000000000001.log
+    database/farmtech_spool/segment-0000000000004097.log   ← segmento ativo
+
+- Cada registro é uma linha "<crc32> <json>"; uma linha cortada por queda
+  de energia no fim do segmento é descartada na abertura
+- fsync em grupo: a cada fsync_every registros ou fsync_interval segundos
+- Cada leitura recebe a chave (dispositivo, sequência) em 'ingest_key';
+  o banco guarda as chaves gravadas (tabela ingest_keys), então reenviar
+  um segmento já gravado não duplica linhas
+- O nome do segmento é a sequência do seu primeiro registro; o segmento
+  ativo nunca é apagado, então a sequência continua após reiniciar
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+SEGMENT_PREFIX = 'segment-'
+SEGMENT_SUFFIX = '.log'
+
+
+def _json_default(value):
+    """Converte tipos do numpy/pandas para JSON"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def encode_record(key, item):
+    """
+    Serializa um registro do spool
+
+    Args:
+        key (tuple): (dispositivo, sequência)
+        item (dict): Leitura (pode trazer 'prediction' e 'irrigation_action')
+
+    Returns:
+        bytes: Linha "<crc32 hex> <json>\\n"
+    """
+    payload = json.dumps({**item, 'ingest_key': list(key)}, separators=(',', ':'),
+                         default=_json_default).encode()
+    return b'%08x %s\n' % (zlib.crc32(payload), payload)
+
+
+def decode_record(line):
+    """
+    Lê um registro do spool
+
+    Returns:
+        dict: Leitura com 'ingest_key' ou None se a linha estiver corrompida
+    """
+    if not line.endswith(b'\n'):
+        return None
+    crc, _, payload = line[:-1].partition(b' ')
+    try:
+        if int(crc, 16) != zlib.crc32(payload):
+            return None
+        item = json.loads(payload)
+    except ValueError:
+        return None
+    item['ingest_key'] = tuple(item['ingest_key'])
+    return item
+
+
+class IngestionSpool:
+    """Buffer local de leituras para quando o banco está indisponível"""
+
+    def __init__(self, spool_dir, gateway_id=None, segment_bytes=8 * 1024 * 1024,
+                 fsync_every=500, fsync_interval=1.0, replay_batch=1000,
+                 retry_interval=5.0):
+        """
+        Abre (ou cria) o spool e recupera os segmentos pendentes
+
+        Args:
+            spool_dir: Diretório dos segmentos
+            gateway_id (str): Prefixo das chaves (padrão: nome da máquina),
+                              evita colisão entre gateways no mesmo banco
+            segment_bytes (int): Tamanho a partir do qual abre novo segmento
+            fsync_every (int): Registros entre fsyncs
+            fsync_interval (float): Tempo máximo (s) sem fsync
+            replay_batch (int): Leituras por transação no reenvio
+            retry_interval (float): Pausa (s) entre tentativas de reenvio
+        """
+        self.spool_dir = Path(spool_dir)
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.gateway_id = gateway_id or socket.gethostname()
+        self.segment_bytes = segment_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.replay_batch = replay_batch
+        self.retry_interval = retry_interval
+
+        self.spooled = 0
+        self.replayed = 0
+        self._lock = threading.Lock()
+        self._replay_lock = threading.Lock()
+        self._segments = []  # [caminho, registros] em ordem; o último é o ativo
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._next_retry = 0.0
+        self._next_seq = 1
+        self._recover()
+
+    # ------------------------------------------------------------------
+    # Abertura
+    # ------------------------------------------------------------------
+
+    def _segment_path(self, first_seq):
+        return self.spool_dir / f"{SEGMENT_PREFIX}{first_seq:016d}{SEGMENT_SUFFIX}"
+
+    def _recover(self):
+        """Conta os registros pendentes e reabre o último segmento"""
+        paths = sorted(self.spool_dir.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"))
+        for path in paths:
+            first_seq = int(path.stem[len(SEGMENT_PREFIX):])
+            self._next_seq = max(self._next_seq, first_seq)
+
+            count, good_bytes, last_seq = 0, 0, None
+            for item, end in self._iter_segment(path):
+                count += 1
+                good_bytes = end
+                last_seq = item['ingest_key'][1]
+            if last_seq is not None:
+                self._next_seq = max(self._next_seq, last_seq + 1)
+
+            if good_bytes < path.stat().st_size:
+                # Linha incompleta (queda durante a escrita): descarta
+                logging.warning(f"⚠️ Spool: {path.name} truncado em {good_bytes} bytes")
+                with open(path, 'r+b') as file:
+                    file.truncate(good_bytes)
+            self._segments.append([path, count])
+
+        pending = self.pending
+        if pending:
+            logging.info(f"💾 Spool com {pending} leituras pendentes em "
+                         f"{len(self._segments)} segmento(s)")
+
+        if self._segments:
+            self._file = open(self._segments[-1][0], 'ab')
+        else:
+            self._open_segment()
+
+    @staticmethod
+    def _iter_segment(path):
+        """Gera (registro, posição final) até o primeiro registro inválido"""
+        offset = 0
+        with open(path, 'rb') as file:
+            for line in file:
+                item = decode_record(line)
+                if item is None:
+                    return
+                offset += len(line)
+                yield item, offset
+
+    def _open_segment(self):
+        """Abre um novo segmento ativo começando na próxima sequência"""
+        path = self._segment_path(self._next_seq)
+        self._file = open(path, 'ab')
+        self._segments.append([path, 0])
+        self._sync_dir()
+
+    def _sync_dir(self):
+        """Garante no disco a criação/remoção de segmentos (POSIX)"""
+        if not hasattr(os, 'O_DIRECTORY'):
+            return
+        fd = os.open(self.spool_dir, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    @property
+    def pending(self):
+        """Leituras no spool ainda não reenviadas ao banco"""
+        return sum(count for _, count in self._segments)
+
+    def _key_for(self, item):
+        """Chave (dispositivo, sequência) de uma nova leitura"""
+        device = self.gateway_id
+        if item.get('device_id'):
+            device = f"{self.gateway_id}/{item['device_id']}"
+        key = (device, self._next_seq)
+        self._next_seq += 1
+        return key
+
+    def append(self, item):
+        """Grava uma leitura no spool (ver append_many)"""
+        self.append_many([item])
+
+    def append_many(self, items):
+        """
+        Grava leituras no spool
+
+        Leituras sem 'timestamp' recebem o horário atual (UTC), para o
+        reenvio manter o horário da medição e não o da gravação.
+
+        Args:
+            items (list): Itens aceitos por FarmTechDatabase.insert_readings_batch
+        """
+        now = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+        with self._lock:
+            records = []
+            for item in items:
+                if item.get('timestamp') is None:
+                    item = {**item, 'timestamp': now}
+                key = item.get('ingest_key') or self._key_for(item)
+                records.append(encode_record(key, item))
+
+            self._file.write(b''.join(records))
+            self._segments[-1][1] += len(records)
+            self._unsynced += len(records)
+            self.spooled += len(records)
+
+            if (self._unsynced >= self.fsync_every
+                    or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+            if self._file.tell() >= self.segment_bytes:
+                self._roll()
+
+    def _sync(self):
+        """Envia ao disco os registros em buffer (lock já adquirido)"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _roll(self):
+        """Fecha o segmento ativo e abre o próximo (lock já adquirido)"""
+        self._sync()
+        self._file.close()
+        self._open_segment()
+
+    def flush(self):
+        """Força o fsync dos registros em buffer"""
+        with self._lock:
+            if self._unsynced:
+                self._sync()
+
+    # ------------------------------------------------------------------
+    # Reenvio
+    # ------------------------------------------------------------------
+
+    def replay(self, db):
+        """
+        Reenvia ao banco todas as leituras pendentes, em ordem
+
+        Cada segmento é apagado só depois de gravado por inteiro; se o
+        processo cair no meio, o próximo reenvio repete o segmento e o
+        banco ignora as chaves já gravadas.
+
+        Args:
+            db: FarmTechDatabase (ou subclasse)
+
+        Returns:
+            int: Leituras reenviadas
+
+        Raises:
+            Exception: Erro do banco (as leituras continuam no spool)
+        """
+        with self._replay_lock:
+            total = self._replay_sealed(db)
+
+            with self._lock:
+                active_path, active_count = self._segments[-1]
+                if active_count:
+                    self._file.flush()
+            if active_count:
+                if not total:
+                    # Confere o banco com o primeiro lote antes de fechar o
+                    # segmento ativo (evita um segmento novo por tentativa)
+                    self._insert_segment(db, active_path, limit=self.replay_batch)
+                with self._lock:
+                    self._roll()
+                total += self._replay_sealed(db)
+
+        if total:
+            logging.info(f"♻️ Spool: {total} leituras reenviadas ao banco")
+        return total
+
+    def _replay_sealed(self, db):
+        """Reenvia e apaga os segmentos fechados, do mais antigo ao mais novo"""
+        with self._lock:
+            sealed = self._segments[:-1]
+
+        total = 0
+        for segment in sealed:
+            path, count = segment
+            self._insert_segment(db, path)
+
+            with self._lock:
+                self._segments.remove(segment)
+            path.unlink()
+            self._sync_dir()
+            total += count
+            self.replayed += count
+        return total
+
+    def _insert_segment(self, db, path, limit=None):
+        """Grava no banco os registros de um segmento em lotes de replay_batch"""
+        batch = []
+        for index, (item, _) in enumerate(self._iter_segment(path)):
+            if limit is not None and index >= limit:
+                break
+            batch.append(item)
+            if len(batch) >= self.replay_batch:
+                db.insert_readings_batch(batch)
+                batch = []
+        if batch:
+            db.insert_readings_batch(batch)
+
+    def try_replay(self, db):
+        """
+        Reenvia as pendências se houver e se já passou retry_interval
+
+        Returns:
+            bool: True se o spool está vazio (o banco pode receber direto)
+        """
+        if not self.pending:
+            return True
+        if time.monotonic() < self._next_retry:
+            return False
+
+        try:
+            self.replay(db)
+        except Exception as e:
+            self._next_retry = time.monotonic() + self.retry_interval
+            logging.warning(f"⚠️ Spool: banco ainda indisponível ({e}); "
+                            f"{self.pending} leituras pendentes")
+            return False
+        return not self.pending
+
+    def close(self):
+        """Grava o buffer em disco e fecha o segmento ativo"""
+        with self._lock:
+            if self._file and not self._file.closed:
+                self._sync()
+                self._file.close()
@@ -12,6 +12,13 @@ COMANDOS SUPORTADOS pelo ESP32:
 - RAIN_ALERT:1/0: Alerta de chuva (1=chuva, 0=sem chuva)
 - SUSPEND_IRRIGATION: Suspende irrigação por clima
 
+CORRELAÇÃO: respostas casam com o comando pendente mais antigo pelo
+prefixo esperado; as demais linhas vão para o fluxo de telemetria. Com
+tagged=True cada comando sai com uma tag (" #<n>") que o ESP32 devolve no
+fim da resposta, e as respostas podem chegar fora de ordem. O firmware do
+repositório (src/main.cpp, FarmTech.ino) ainda não devolve a tag, então o
+padrão é tagged=False.
+
 ═══════════════════════════════════════════════════════════════════════════
 """
 
@@ -19,15 +26,233 @@ import serial
 import serial.tools.list_ports
 import time
 import json
+import itertools
+import queue
+import threading
+from concurrent.futures import Future
 from datetime import datetime
 from weather_api import WeatherAPI
 
+
+class SerialCommandMux:
+    """
+    Multiplexador de comandos sobre uma porta serial
+    
+    Uma thread escreve os comandos da fila e outra lê a porta com
+    read_until bloqueante, entregando cada resposta ao comando de mesma
+    tag. Linhas que não são resposta vão para a fila de telemetria.
+    Comandos pendentes expiram depois de pending_ttl segundos (ou do
+    timeout de submit) para não casarem com respostas de comandos novos.
+    """
+    
+    # Prefixos de resposta por comando (para firmware que não devolve a tag)
+    REPLY_PREFIXES = {
+        'PING': ('PONG',),
+        'GET_STATUS': ('STATUS:',),
+        'GET_WEATHER': ('WEATHER:',),
+        'SET_WEATHER': ('WEATHER_OK', 'OK'),
+        'RAIN_ALERT': ('RAIN_OK', 'OK'),
+        'SUSPEND_IRRIGATION': ('OK',),
+    }
+    ERROR_PREFIXES = ('ERR',)
+    PENDING_TTL = 30.0
+    
+    def __init__(self, serial_port, tagged: bool = False, telemetry_size: int = 1000,
+                 pending_ttl: float = PENDING_TTL):
+        """
+        Args:
+            serial_port: Porta aberta (serial.Serial ou compatível)
+            tagged: Se acrescenta a tag de correlação aos comandos (o
+                    firmware deve devolvê-la)
+            telemetry_size: Capacidade da fila de telemetria (descarta as
+                            linhas mais antigas quando enche)
+            pending_ttl: Validade (s) de um comando sem resposta
+        """
+        self.serial_port = serial_port
+        self.tagged = tagged
+        self.pending_ttl = pending_ttl
+        self.telemetry = queue.Queue(maxsize=telemetry_size)
+        self.telemetry_dropped = 0
+        self._tags = itertools.count(1)
+        self._pending = {}  # tag → (comando, Future, expira em), em ordem de envio
+        self._pending_lock = threading.Lock()
+        self._buffer = bytearray()
+        self._commands = queue.Queue()
+        self._running = False
+        self._threads = []
+    
+    def start(self):
+        """Inicia as threads de leitura e escrita"""
+        if self._running:
+            return
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._read_loop, name='esp32-reader', daemon=True),
+            threading.Thread(target=self._write_loop, name='esp32-writer', daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+    
+    def submit(self, command: str, timeout: float = None) -> Future:
+        """
+        Enfileira um comando sem esperar a resposta
+        
+        Args:
+            command: Comando a enviar
+            timeout: Validade (s) do comando pendente (padrão: pending_ttl)
+        
+        Returns:
+            Future com a resposta (sem a tag); future.tag identifica o comando
+        """
+        future = Future()
+        future.tag = next(self._tags)
+        name = command.split(':', 1)[0].strip().upper()
+        expires = time.monotonic() + (self.pending_ttl if timeout is None else timeout)
+        
+        with self._pending_lock:
+            self._pending[future.tag] = (name, future, expires)
+        self._commands.put((future.tag, command))
+        return future
+    
+    def post(self, command: str):
+        """Envia um comando sem resposta esperada (nada fica pendente)"""
+        self._commands.put((None, command))
+    
+    def discard(self, future: Future):
+        """Desiste de um comando: sua resposta, se chegar, vira telemetria"""
+        with self._pending_lock:
+            self._pending.pop(future.tag, None)
+    
+    def send(self, command: str, timeout: float = 5.0) -> str:
+        """
+        Envia um comando e aguarda a resposta
+        
+        Returns:
+            Resposta do ESP32 ou string vazia (timeout/erro)
+        """
+        future = self.submit(command, timeout)
+        try:
+            return future.result(timeout)
+        except Exception:
+            self.discard(future)
+            return ""
+    
+    def _write_loop(self):
+        """Escreve os comandos na ordem em que foram enfileirados"""
+        while True:
+            item = self._commands.get()
+            if item is None:
+                return
+            
+            tag, command = item
+            message = f"{command} #{tag}\n" if self.tagged and tag else f"{command}\n"
+            try:
+                self.serial_port.write(message.encode())
+            except Exception as e:
+                with self._pending_lock:
+                    pending = self._pending.pop(tag, None)
+                if pending:
+                    pending[1].set_exception(e)
+    
+    def _read_loop(self):
+        """Lê linhas da porta e despacha respostas e telemetria"""
+        while self._running:
+            try:
+                # read_until devolve o que chegou até o timeout da porta,
+                # mesmo sem o '\n': só linhas completas são despachadas
+                self._buffer += self.serial_port.read_until(b'\n')
+            except Exception as e:
+                if self._running:
+                    print(f"❌ Erro na leitura serial: {e}")
+                break
+            
+            *lines, rest = self._buffer.split(b'\n')
+            self._buffer = bytearray(rest)
+            for raw in lines:
+                line = raw.decode('utf-8', errors='ignore').strip()
+                if line:
+                    self._dispatch(line)
+        
+        self._fail_pending(ConnectionError("Porta serial fechada"))
+    
+    def _dispatch(self, line: str):
+        """Entrega a linha ao comando correspondente ou à telemetria"""
+        reply, _, tag = line.rpartition(' #')
+        
+        with self._pending_lock:
+            expired = self._expire_pending()
+            if reply and tag.isdigit() and int(tag) in self._pending:
+                _, future, _ = self._pending.pop(int(tag))
+            else:
+                reply = line
+                future = self._match_untagged(line)
+        
+        for stale in expired:
+            if not stale.done():
+                stale.set_exception(TimeoutError("Comando sem resposta"))
+        
+        if future is None:
+            self._publish_telemetry(line)
+        elif not future.done():
+            future.set_result(reply)
+    
+    def _match_untagged(self, line: str):
+        """Comando pendente mais antigo cujo prefixo de resposta casa com a linha"""
+        for tag, (name, future, _) in self._pending.items():
+            prefixes = self.REPLY_PREFIXES.get(name, ('OK',)) + self.ERROR_PREFIXES
+            if line.startswith(prefixes):
+                del self._pending[tag]
+                return future
+        return None
+    
+    def _expire_pending(self):
+        """Remove (com o lock) os comandos vencidos; devolve seus Futures"""
+        now = time.monotonic()
+        expired = [tag for tag, (_, future, expires) in self._pending.items()
+                   if expires <= now or future.done()]
+        return [self._pending.pop(tag)[1] for tag in expired]
+    
+    def _publish_telemetry(self, line: str):
+        """Publica uma linha de telemetria, descartando a mais antiga se cheio"""
+        while True:
+            try:
+                self.telemetry.put_nowait(line)
+                return
+            except queue.Full:
+                try:
+                    self.telemetry.get_nowait()
+                    self.telemetry_dropped += 1
+                except queue.Empty:
+                    pass
+    
+    def _fail_pending(self, error: Exception):
+        with self._pending_lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for _, future, _ in pending:
+            if not future.done():
+                future.set_exception(error)
+    
+    def close(self):
+        """Para as threads (feche a porta depois para liberar a leitura)"""
+        self._running = False
+        self._commands.put(None)
+        self._fail_pending(ConnectionError("Multiplexador encerrado"))
+
+
 class SerialCommunicator:
     """Classe para comunicação serial com ESP32"""
     
-    def __init__(self, baudrate: int = 115200):
+    def __init__(self, baudrate: int = 115200, tagged: bool = False):
+        """
+        Args:
+            baudrate: Taxa de transmissão (115200 para ESP32)
+            tagged: Envia tags de correlação (só com firmware que as devolve)
+        """
         self.serial_port = None
         self.baudrate = baudrate
+        self.tagged = tagged
+        self.mux = None
         self.weather_api = WeatherAPI()
         
     def list_available_ports(self):
@@ -70,6 +295,9 @@ class SerialCommunicator:
             self.serial_port = serial.Serial(port, self.baudrate, timeout=1)
             time.sleep(2)  # Aguarda ESP32 reinicializar
             
+            self.mux = SerialCommandMux(self.serial_port, tagged=self.tagged)
+            self.mux.start()
+            
             # Testa conexão
             self.send_command("PING")
             print(f"✅ Conectado com sucesso em {port}")
@@ -81,51 +309,69 @@ class SerialCommunicator:
     
     def disconnect(self):
         """Desconecta da porta serial"""
+        if self.mux:
+            self.mux.close()
         if self.serial_port and self.serial_port.is_open:
             self.serial_port.close()
             print("🔌 Desconectado da porta serial")
     
-    def send_command(self, command: str, wait_response: bool = True) -> str:
+    def send_command(self, command: str, wait_response: bool = True, timeout: float = 5.0) -> str:
         """
         Envia comando para ESP32
         
         Args:
             command: Comando a ser enviado
             wait_response: Se deve aguardar resposta
+            timeout: Espera máxima pela resposta (s)
             
         Returns:
             Resposta do ESP32 ou string vazia
         """
-        if not self.serial_port or not self.serial_port.is_open:
+        if not self.mux or not self.serial_port.is_open:
             print("❌ Porta serial não conectada!")
             return ""
         
-        try:
-            # Envia comando
-            message = f"{command}\n"
-            self.serial_port.write(message.encode())
-            self.serial_port.flush()
-            
-            print(f"📤 Enviado: {command}")
-            
-            if wait_response:
-                # Aguarda resposta (timeout 5s)
-                start_time = time.time()
-                while time.time() - start_time < 5:
-                    if self.serial_port.in_waiting > 0:
-                        response = self.serial_port.readline().decode().strip()
-                        if response:
-                            print(f"📥 Resposta: {response}")
-                            return response
-                    time.sleep(0.1)
-                
-                print("⏰ Timeout aguardando resposta")
-            
+        print(f"📤 Enviado: {command}")
+        
+        if not wait_response:
+            self.mux.post(command)
             return ""
+        
+        response = self.mux.send(command, timeout)
+        if response:
+            print(f"📥 Resposta: {response}")
+        else:
+            print("⏰ Timeout aguardando resposta")
+        return response
+    
+    def send_commands(self, commands: list, timeout: float = 5.0) -> list:
+        """
+        Envia vários comandos de uma vez (todos em andamento juntos)
+        
+        Args:
+            commands: Comandos a enviar, ex.: ["SET_WEATHER:...", "RAIN_ALERT:1", "GET_STATUS"]
+            timeout: Espera máxima pelas respostas (s)
             
-        except Exception as e:
-            print(f"❌ Erro ao enviar comando: {e}")
-            return ""
+        Returns:
+            Respostas na ordem dos comandos ("" para as que não chegaram)
+        """
+        if not self.mux or not self.serial_port.is_open:
+            print("❌ Porta serial não conectada!")
+            return [""] * len(commands)
+        
+        futures = [self.mux.submit(command, timeout) for command in commands]
+        deadline = time.monotonic() + timeout
+        
+        responses = []
+        for command, future in zip(commands, futures):
+            try:
+                responses.append(future.result(max(0.0, deadline - time.monotonic())))
+            except Exception:
+                self.mux.discard(future)
+                responses.append("")
+            print(f"📤 {command} → 📥 {responses[-1] or '⏰ sem resposta'}")
+        
+        return responses
     
     def send_weather_data(self, manual_data: dict = None) -> bool:
         """
@@ -286,11 +532,11 @@ class SerialCommunicator:
                     print("👂 Escutando ESP32... (Ctrl+C para parar)")
                     try:
                         while True:
-                            if self.serial_port.in_waiting > 0:
-                                message = self.serial_port.readline().decode().strip()
-                                if message:
-                                    print(f"📨 ESP32: {message}")
-                            time.sleep(0.1)
+                            try:
+                                message = self.mux.telemetry.get(timeout=0.5)
+                            except queue.Empty:
+                                continue
+                            print(f"📨 ESP32: {message}")
                     except KeyboardInterrupt:
                         print("\n🛑 Parando escuta...")
                 
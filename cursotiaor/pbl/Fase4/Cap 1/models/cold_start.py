@@ -0,0 +1,96 @@
+"""
+FarmTech Solutions - Medição de Partida do Predictor
+====================================================
+Mede, em processos novos, o tempo até a primeira previsão:
+
+    import       from models.predict import FarmTechPredictor
+    load         FarmTechPredictor(...).load_models()
+    primeira     primeira chamada de predict_all (inclui a leitura do modelo
+                 quando o carregamento é preguiçoso)
+    total        do início do processo ao fim da primeira previsão
+
+Cenários 'cli_*' partem de um interpretador vazio (python models/predict.py);
+'worker_*' já têm o pandas importado, como um worker do Streamlit.
+
+Uso:
+    python models/cold_start.py [--runs 5] [--models-dir models]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Cenário -> (código executado antes do import, backend, lazy)
+COLD_START_SCENARIOS = {
+    'cli_sklearn_eager': ('', 'sklearn', False),
+    'cli_compiled_eager': ('', 'auto', False),
+    'cli_compiled_lazy': ('', 'auto', True),
+    'worker_sklearn_eager': ('import pandas', 'sklearn', False),
+    'worker_compiled_lazy': ('import pandas', 'auto', True),
+}
+
+SNIPPET = """
+import contextlib, io, json, sys, time, warnings
+warnings.simplefilter('ignore')
+sys.path.insert(0, {root!r})
+{preload}
+started = time.perf_counter()
+from models.predict import FarmTechPredictor
+imported = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    predictor = FarmTechPredictor({models_dir!r}, backend={backend!r})
+    predictor.load_models(lazy={lazy})
+    loaded = time.perf_counter()
+    predictor.predict_all(28, 35, 6.5, True, False, False)
+predicted = time.perf_counter()
+print(json.dumps({{'import': imported - started, 'load': loaded - imported,
+                  'primeira': predicted - loaded}}))
+"""
+
+
+def measure(scenario, models_dir, runs=5):
+    """
+    Mediana de cada fase em runs processos novos
+
+    Returns:
+        dict: Segundos por fase (import, load, primeira, total)
+    """
+    preload, backend, lazy = COLD_START_SCENARIOS[scenario]
+    code = SNIPPET.format(root=str(ROOT), preload=preload, models_dir=str(models_dir),
+                          backend=backend, lazy=lazy)
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                                text=True, check=True).stdout
+        phases = json.loads(output.strip().splitlines()[-1])
+        phases['total'] = time.perf_counter() - started
+        samples.append(phases)
+    return {phase: statistics.median(sample[phase] for sample in samples)
+            for phase in ('import', 'load', 'primeira', 'total')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Partida do predictor FarmTech')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--models-dir', default=str(ROOT / 'models'))
+    parser.add_argument('--scenarios', nargs='+', choices=list(COLD_START_SCENARIOS),
+                        default=list(COLD_START_SCENARIOS))
+    args = parser.parse_args()
+
+    print(f"{'cenário':<22}{'import':>9}{'load':>9}{'primeira':>10}{'total':>9}")
+    for scenario in args.scenarios:
+        result = measure(scenario, args.models_dir, args.runs)
+        print(f"{scenario:<22}" + ''.join(
+            f"{result[phase] * 1000:>{width}.0f}ms" for phase, width in
+            (('import', 7), ('load', 7), ('primeira', 8), ('total', 7))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+FarmTech Solutions - Inferência Compilada de Árvores
+====================================================
+Converte RandomForest / ExtraTrees / GradientBoosting / DecisionTree
+(regressão) do sklearn em arrays NumPy contíguos com os nós de todas as
+árvores, e avalia esses arrays sem o sklearn:
+
+    feature[n], threshold[n]   divisão do nó n (x[feature] <= threshold → esquerda)
+    children[n] = left, right  filhos (folhas apontam para si mesmas)
+    value[n]                   valor da folha
+    roots[t]                   nó raiz da árvore t
+
+    previsão = base + scale × Σ value[folha da árvore t]
+
+(scale = 1/árvores na floresta, learning_rate no gradient boosting)
+
+O arquivo <alvo>_compiled.pkl é um dict de arrays salvo com joblib sem
+compressão, com o SHA-256 do <alvo>_model.pkl de origem (o predictor só
+usa a versão compilada do mesmo modelo). Com joblib.load(mmap_mode='r')
+os arrays ficam mapeados do arquivo, sem cópia: processos que usam o
+mesmo modelo compartilham as páginas pelo page cache. Gerado por
+train_models.py ou, para modelos já treinados:
+
+    python models/compiled_trees.py [diretório dos modelos]
+"""
+
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+# Versão do formato do arquivo compilado (2: filhos em um único array (n, 2))
+COMPILED_FORMAT = 2
+
+# Linhas avaliadas por vez em predict
+COMPILED_CHUNK_ROWS = 50_000
+
+# Até este número de linhas todas as árvores avançam juntas, um nível por
+# vez (poucas operações: leitura avulsa); acima, uma árvore por vez
+COMPILED_TREE_ROWS = 2_000
+
+
+def file_digest(path):
+    """SHA-256 (hex) do arquivo do modelo de origem"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _ensemble_trees(model):
+    """
+    Árvores, escala e valor base de um modelo de árvores do sklearn
+
+    Returns:
+        tuple: (árvores, scale, base) ou None se o modelo não é suportado
+    """
+    if hasattr(model, 'tree_'):
+        return [model], 1.0, 0.0
+
+    estimators = getattr(model, 'estimators_', None)
+    if isinstance(estimators, np.ndarray) and hasattr(model, 'learning_rate'):
+        # GradientBoostingRegressor: estimators_ (n_estimators, 1)
+        init = getattr(model, 'init_', None)
+        if init == 'zero':
+            base = 0.0
+        elif hasattr(init, 'constant_'):
+            base = float(np.ravel(init.constant_)[0])
+        else:
+            return None
+        return list(estimators[:, 0]), float(model.learning_rate), base
+
+    if isinstance(estimators, list) and estimators and all(
+            hasattr(tree, 'tree_') for tree in estimators):
+        # RandomForest / ExtraTrees: média das árvores
+        return estimators, 1.0 / len(estimators), 0.0
+
+    return None
+
+
+def export_ensemble(model):
+    """
+    Achata um modelo de árvores em arrays de nós
+
+    Args:
+        model: Regressor do sklearn treinado (uma saída)
+
+    Returns:
+        dict: Arrays e metadados (ver save_compiled) ou None se o modelo
+              não é um conjunto de árvores suportado
+    """
+    ensemble = _ensemble_trees(model)
+    if ensemble is None or getattr(model, 'n_outputs_', 1) != 1:
+        return None
+    trees, scale, base = ensemble
+
+    roots, features, thresholds, lefts, rights, values = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in trees:
+        tree = estimator.tree_
+        nodes = np.arange(tree.node_count)
+        leaf = tree.children_left == -1
+
+        roots.append(offset)
+        features.append(np.where(leaf, 0, tree.feature))
+        thresholds.append(np.where(leaf, 0.0, tree.threshold))
+        # Folhas apontam para si mesmas: percorrer max_depth níveis basta
+        lefts.append(np.where(leaf, nodes, tree.children_left) + offset)
+        rights.append(np.where(leaf, nodes, tree.children_right) + offset)
+        values.append(tree.value[:, 0, 0])
+
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    feature_names = getattr(model, 'feature_names_in_', None)
+    return {
+        'format': COMPILED_FORMAT,
+        'estimator': type(model).__name__,
+        'feature_names': None if feature_names is None else list(feature_names),
+        'n_features': int(model.n_features_in_),
+        'max_depth': int(max_depth),
+        'scale': scale,
+        'base': base,
+        'roots': np.asarray(roots, dtype=np.int32),
+        'feature': np.concatenate(features).astype(np.int32),
+        'threshold': np.concatenate(thresholds).astype(np.float64),
+        # Esquerda e direita lado a lado: children.ravel()[2n + 1] = direita de n
+        'children': np.column_stack([np.concatenate(lefts),
+                                     np.concatenate(rights)]).astype(np.int32),
+        'value': np.concatenate(values).astype(np.float64),
+    }
+
+
+def save_compiled(model, path, source=None):
+    """
+    Salva a versão compilada de um modelo de árvores
+
+    Args:
+        model: Regressor do sklearn treinado
+        path: Arquivo de saída (ex.: models/rendimento_estimado_compiled.pkl)
+        source: Arquivo .pkl do modelo (registra o SHA-256 de origem)
+
+    Returns:
+        bool: False se o modelo não é um conjunto de árvores (ex.: LinearRegression)
+    """
+    arrays = export_ensemble(model)
+    if arrays is None:
+        return False
+    arrays['source_sha256'] = None if source is None else file_digest(source)
+    # Sem compressão: os arrays podem ser lidos com mmap_mode='r'. Grava em
+    # outro arquivo e troca: processos com o anterior mapeado não o veem truncado
+    temp_path = f"{path}.tmp"
+    joblib.dump(arrays, temp_path)
+    os.replace(temp_path, path)
+    return True
+
+
+class CompiledEnsemble:
+    """Avaliador de árvores compiladas com a interface de predict do sklearn"""
+
+    def __init__(self, arrays):
+        """
+        Args:
+            arrays (dict): Resultado de export_ensemble (ou do arquivo salvo)
+
+        Raises:
+            ValueError: Arquivo de outra versão do formato (recompile)
+        """
+        if arrays.get('format') != COMPILED_FORMAT:
+            raise ValueError(f"Formato compilado não suportado: {arrays.get('format')}")
+
+        self.estimator_name = arrays['estimator']
+        self.source_digest = arrays.get('source_sha256')
+        self.n_features_in_ = arrays['n_features']
+        if arrays['feature_names'] is not None:
+            self.feature_names_in_ = np.asarray(arrays['feature_names'], dtype=object)
+        self.max_depth = arrays['max_depth']
+        self.scale = arrays['scale']
+        self.base = arrays['base']
+        self.roots = arrays['roots']
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.value = arrays['value']
+        # Visões do array salvo (sem cópia, inclusive mapeado do arquivo)
+        self.left = arrays['children'][:, 0]
+        self.right = arrays['children'][:, 1]
+        self.children = arrays['children'].reshape(-1)
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        """
+        Carrega um arquivo gerado por save_compiled
+
+        Args:
+            path: Arquivo <alvo>_compiled.pkl
+            mmap_mode: None (arrays em memória) ou 'r' (mapeados do arquivo)
+        """
+        return cls(joblib.load(path, mmap_mode=mmap_mode))
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def predict(self, X):
+        """
+        Prevê uma ou várias linhas
+
+        Args:
+            X: Array (n, n_features), DataFrame ou uma linha (n_features,)
+
+        Returns:
+            Array numpy (n,) com as previsões
+        """
+        # Como o sklearn: features em float32 comparadas a limiares float64
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X tem {X.shape[1]} features, o modelo espera "
+                             f"{self.n_features_in_}")
+
+        predictions = np.empty(len(X))
+        for start in range(0, len(X), COMPILED_CHUNK_ROWS):
+            chunk = X[start:start + COMPILED_CHUNK_ROWS]
+            predictions[start:start + len(chunk)] = self._predict_chunk(chunk)
+        return predictions
+
+    def _predict_chunk(self, X):
+        if len(X) < COMPILED_TREE_ROWS:
+            return self._predict_levels(X)
+        return self._predict_trees(X)
+
+    def _predict_levels(self, X):
+        """Percorre todas as árvores para todas as linhas, um nível por vez"""
+        flat = X.ravel()
+        # Um nó por (linha, árvore); row_start = início da linha em flat
+        row_start = np.repeat(np.arange(len(X), dtype=np.int32) * X.shape[1], self.n_trees)
+        nodes = np.tile(self.roots, len(X))
+        for _ in range(self.max_depth):
+            go_right = (np.take(flat, row_start + np.take(self.feature, nodes))
+                        > np.take(self.threshold, nodes))
+            nodes = np.take(self.children, 2 * nodes + go_right)
+        leaves = np.take(self.value, nodes).reshape(len(X), self.n_trees)
+        return self.base + self.scale * leaves.sum(axis=1)
+
+    def _predict_trees(self, X):
+        """Percorre uma árvore por vez para todas as linhas (lotes grandes)"""
+        n_rows = len(X)
+        # Colunas contíguas: valor da feature f na linha i em columns[f * n_rows + i]
+        columns = np.ascontiguousarray(X.T).ravel()
+        rows = np.arange(n_rows)
+        total = np.zeros(n_rows)
+        for root in self.roots:
+            nodes = np.full(n_rows, root, dtype=np.intp)
+            for _ in range(self.max_depth):
+                go_right = (np.take(columns, np.take(self.feature, nodes) * n_rows + rows)
+                            > np.take(self.threshold, nodes))
+                nodes = np.take(self.children, 2 * nodes + go_right)
+            total += np.take(self.value, nodes)
+        return self.base + self.scale * total
+
+
+def compile_models(models_dir='models'):
+    """
+    Gera <alvo>_compiled.pkl para cada <alvo>_model.pkl de árvores
+
+    Returns:
+        list: Arquivos gerados
+    """
+    generated = []
+    for model_file in sorted(Path(models_dir).glob('*_model.pkl')):
+        target_name = model_file.stem.replace('_model', '')
+        compiled_file = model_file.with_name(f"{target_name}_compiled.pkl")
+        if save_compiled(joblib.load(model_file), compiled_file, source=model_file):
+            print(f"✅ Modelo compilado: {compiled_file}")
+            generated.append(compiled_file)
+        else:
+            print(f"⏭️ {target_name}: não é um conjunto de árvores, mantido no sklearn")
+    return generated
+
+
+if __name__ == "__main__":
+    compile_models(sys.argv[1] if len(sys.argv) > 1 else 'models')
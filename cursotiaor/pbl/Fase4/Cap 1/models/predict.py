@@ -2,64 +2,252 @@
 FarmTech Solutions - Sistema de Previsão ML
 ==========================================
 Carrega modelos treinados e faz previsões
+
+- predict_all: uma leitura (valores avulsos)
+- predict_batch: muitas leituras (DataFrame ou array) de uma vez, com
+  codificação vetorizada e uma chamada de model.predict por bloco
+
+Modelos de árvores são avaliados pela versão compilada
+(<alvo>_compiled.pkl, ver compiled_trees.py) quando ela existe e foi
+gerada a partir do mesmo <alvo>_model.pkl; os demais usam o sklearn.
+
+predict_all e predict_batch recarregam os modelos quando os arquivos
+mudam em disco. Com cache=PredictionCache() (ver prediction_cache.py),
+predict_all responde leituras repetidas sem avaliar os modelos; a recarga
+esvazia o cache.
+
+Partida rápida: load_models só localiza os arquivos; cada modelo (e suas
+métricas) é lido no primeiro uso, a versão compilada mapeada do arquivo
+(mmap, compartilhada entre processos pelo page cache). O pandas só é
+importado por predict_batch e pelo backend sklearn.
 """
 
 import joblib
 import json
+import sys
+import threading
+import time
+import weakref
 import numpy as np
+from collections.abc import Mapping
+from functools import partial
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from database.metrics import PREDICTION_CACHE_SIZE, PREDICTION_SECONDS
+from models.compiled_trees import CompiledEnsemble, file_digest
+
+# Features na ordem de prepare_input (cada modelo usa as do seu treino)
+FEATURE_COLUMNS = ['temperatura', 'umidade_solo', 'ph_solo',
+                   'nitrogenio_ok', 'fosforo_ok', 'potassio_ok',
+                   'cultura_banana', 'cultura_milho']
+
+# Dosagens NPK de referência (g/m²) - baseadas em EMBRAPA
+NPK_TARGETS = {
+    'banana': {'nitrogenio': 15, 'fosforo': 10, 'potassio': 20},
+    'milho': {'nitrogenio': 12, 'fosforo': 8, 'potassio': 10}
+}
+
+# Linhas por chamada de model.predict em predict_batch
+PREDICT_CHUNK_ROWS = 100_000
+
+# Backends de previsão: auto = compilado quando disponível, senão sklearn
+PREDICTOR_BACKENDS = ('auto', 'compiled', 'sklearn')
+
+# Arquivos dos modelos verificados a cada MODEL_FILES_CHECK_INTERVAL s
+MODEL_FILE_PATTERNS = ('*_model.pkl', '*_compiled.pkl', '*_metrics.json')
+MODEL_FILES_CHECK_INTERVAL = 1.0
+
+# Modo de leitura dos arquivos compilados ('r' = mapeados, None = copiados)
+COMPILED_MMAP_MODE = 'r'
+
+# Modelo -> (coluna do resultado, limita em zero)
+BATCH_OUTPUTS = {
+    'volume_irrigacao': ('volume_litros', True),
+    'rendimento_estimado': ('rendimento_kg_ha', False)
+}
+
+
+def _load_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+class LazyMapping(Mapping):
+    """Dict somente leitura cujos valores são carregados no primeiro acesso"""
+    
+    def __init__(self):
+        self._loaders = {}
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def register(self, key, loader):
+        """Registra loader() como a fonte do valor de key"""
+        self._loaders[key] = loader
+    
+    def __getitem__(self, key):
+        if key in self._values:
+            return self._values[key]
+        loader = self._loaders[key]
+        with self._lock:
+            if key not in self._values:
+                self._values[key] = loader()
+        return self._values[key]
+    
+    def __contains__(self, key):
+        # Sem carregar o valor (Mapping.__contains__ chamaria __getitem__)
+        return key in self._loaders
+    
+    def __iter__(self):
+        return iter(self._loaders)
+    
+    def __len__(self):
+        return len(self._loaders)
+
+
 class FarmTechPredictor:
     """
     Classe para fazer previsões usando modelos treinados
     """
     
-    def __init__(self, models_dir='models'):
+    def __init__(self, models_dir='models', backend='auto', cache=None):
         """
         Inicializa o predictor
         
         Args:
             models_dir: Diretório com modelos treinados
+            backend: 'auto', 'compiled' (avisa quando não há versão
+                     compilada) ou 'sklearn' (ver PREDICTOR_BACKENDS)
+            cache: PredictionCache para predict_all (None = sem cache)
         """
+        if backend not in PREDICTOR_BACKENDS:
+            raise ValueError(f"Backend desconhecido: {backend}")
         self.models_dir = Path(models_dir)
-        self.models = {}
-        self.metrics = {}
-        self.feature_importance = {}
+        self.backend = backend
+        self.cache = cache
+        if cache is not None:
+            self._register_cache_gauge()
+        self._model_files = {}
+        self._files_checked = time.monotonic()
+        self.models = LazyMapping()
+        self.metrics = LazyMapping()
+        self.feature_importance = LazyMapping()
+        
+    def _register_cache_gauge(self):
+        """
+        Série de farmtech_prediction_cache_entries deste predictor
+        
+        Rotulada pelo diretório dos modelos; a referência fraca não mantém
+        o cache vivo no registro (cache descartado = 0 entradas).
+        """
+        cache_ref = weakref.ref(self.cache)
+        
+        def entries():
+            cache = cache_ref()
+            return 0 if cache is None else len(cache)
         
-    def load_models(self):
-        """Carrega todos os modelos disponíveis"""
+        PREDICTION_CACHE_SIZE.set_function(entries, modelos=str(self.models_dir))
+    
+    def load_models(self, lazy=True):
+        """
+        Carrega todos os modelos disponíveis
+        
+        Args:
+            lazy: True = cada modelo, métricas e feature importance são lidos
+                  no primeiro uso; False = tudo agora (erros aparecem aqui)
+        """
         print(f"📁 Carregando modelos de {self.models_dir}...")
         
         # Procurar por arquivos .pkl
-        model_files = list(self.models_dir.glob('*_model.pkl'))
+        model_files = sorted(self.models_dir.glob('*_model.pkl'))
         
         if not model_files:
             print("⚠️ Nenhum modelo encontrado. Execute o treinamento primeiro:")
             print("   python models/train_models.py")
             return False
         
+        # Novos mapas trocados de uma vez: quem está prevendo durante uma
+        # recarga continua com os modelos anteriores
+        models, metrics, feature_importance = LazyMapping(), LazyMapping(), LazyMapping()
         for model_file in model_files:
             target_name = model_file.stem.replace('_model', '')
             
-            # Carregar modelo
-            self.models[target_name] = joblib.load(model_file)
-            print(f"✅ Modelo carregado: {target_name}")
+            # Modelo (versão compilada ou sklearn)
+            models.register(target_name, partial(self._load_model, target_name, model_file))
             
-            # Carregar métricas
+            # Métricas
             metrics_file = model_file.parent / f"{target_name}_metrics.json"
             if metrics_file.exists():
-                with open(metrics_file) as f:
-                    self.metrics[target_name] = json.load(f)
+                metrics.register(target_name, partial(_load_json, metrics_file))
             
-            # Carregar feature importance
+            # Feature importance
             importance_file = model_file.parent / f"{target_name}_feature_importance.json"
             if importance_file.exists():
-                with open(importance_file) as f:
-                    self.feature_importance[target_name] = json.load(f)
+                feature_importance.register(target_name, partial(_load_json, importance_file))
+        
+        self.models = models
+        self.metrics = metrics
+        self.feature_importance = feature_importance
+        for target_name in models:
+            if lazy:
+                print(f"✅ Modelo encontrado: {target_name} (carregado no primeiro uso)")
+            else:
+                for mapping in (metrics, feature_importance):
+                    if target_name in mapping:
+                        mapping[target_name]
+                print(f"✅ Modelo carregado: {target_name} ({self._backend_of(target_name)})")
+        
+        self._model_files = self._model_files_signature()
+        if self.cache:
+            # Previsões dos modelos anteriores
+            self.cache.clear()
         
         print(f"🎉 {len(self.models)} modelos carregados com sucesso!")
         return True
     
+    def _model_files_signature(self):
+        """(mtime, tamanho) de cada arquivo de modelo do diretório"""
+        signature = {}
+        for pattern in MODEL_FILE_PATTERNS:
+            for path in self.models_dir.glob(pattern):
+                stat = path.stat()
+                signature[path.name] = (stat.st_mtime_ns, stat.st_size)
+        return signature
+    
+    def _reload_if_changed(self):
+        """Recarrega os modelos se os arquivos mudaram (no máximo uma verificação por intervalo)"""
+        if not self._model_files:
+            # load_models ainda não encontrou modelos
+            return
+        now = time.monotonic()
+        if now - self._files_checked < MODEL_FILES_CHECK_INTERVAL:
+            return
+        self._files_checked = now
+        if self._model_files_signature() != self._model_files:
+            print("🔄 Arquivos de modelo alterados; recarregando")
+            self.load_models()
+    
+    def _load_model(self, target_name, model_file):
+        """Carrega <alvo>_compiled.pkl se corresponde ao modelo, senão o .pkl do sklearn"""
+        compiled_file = model_file.with_name(f"{target_name}_compiled.pkl")
+        if self.backend != 'sklearn':
+            if compiled_file.exists():
+                try:
+                    compiled = CompiledEnsemble.load(compiled_file, mmap_mode=COMPILED_MMAP_MODE)
+                except ValueError as e:
+                    print(f"⚠️ {compiled_file.name}: {e}; usando sklearn")
+                else:
+                    if compiled.source_digest == file_digest(model_file):
+                        return compiled
+                    print(f"⚠️ {compiled_file.name} foi gerado de outro modelo; usando sklearn")
+            elif self.backend == 'compiled':
+                print(f"⚠️ {target_name} sem versão compilada; usando sklearn")
+        return joblib.load(model_file)
+    
+    def _backend_of(self, target_name):
+        return 'compiled' if isinstance(self.models[target_name], CompiledEnsemble) else 'sklearn'
+    
     def prepare_input(self, temperatura, umidade_solo, ph_solo,
                      nitrogenio_ok, fosforo_ok, potassio_ok,
                      cultura='banana'):
@@ -122,7 +310,10 @@ class FarmTechPredictor:
         )
         
         # Fazer previsão
-        volume = self.models['volume_irrigacao'].predict(X)[0]
+        with PREDICTION_SECONDS.time(modelo='volume_irrigacao'):
+            volume = self.models['volume_irrigacao'].predict(
+                self._model_input('volume_irrigacao', X)
+            )[0]
         
         # Garantir que volume não seja negativo
         volume = max(0, volume)
@@ -156,7 +347,10 @@ class FarmTechPredictor:
         )
         
         # Fazer previsão
-        rendimento = self.models['rendimento_estimado'].predict(X)[0]
+        with PREDICTION_SECONDS.time(modelo='rendimento_estimado'):
+            rendimento = self.models['rendimento_estimado'].predict(
+                self._model_input('rendimento_estimado', X)
+            )[0]
         
         result = {
             'rendimento_kg_ha': round(rendimento, 2),
@@ -175,19 +369,33 @@ class FarmTechPredictor:
         Returns:
             dict com todas as previsões
         """
-        results = {
-            'inputs': {
-                'temperatura': temperatura,
-                'umidade_solo': umidade_solo,
-                'ph_solo': ph_solo,
-                'nitrogenio_ok': nitrogenio_ok,
-                'fosforo_ok': fosforo_ok,
-                'potassio_ok': potassio_ok,
-                'cultura': cultura
-            },
-            'predictions': {}
+        inputs = {
+            'temperatura': temperatura,
+            'umidade_solo': umidade_solo,
+            'ph_solo': ph_solo,
+            'nitrogenio_ok': nitrogenio_ok,
+            'fosforo_ok': fosforo_ok,
+            'potassio_ok': potassio_ok,
+            'cultura': cultura
         }
         
+        self._reload_if_changed()
+        
+        # Leitura repetida (quantizada): previsões do cache, sem os modelos
+        if self.cache is not None:
+            key, (temperatura, umidade_solo, ph_solo) = self.cache.quantize(
+                temperatura, umidade_solo, ph_solo,
+                nitrogenio_ok, fosforo_ok, potassio_ok, cultura
+            )
+            cached = self.cache.get(key)
+            if cached is not None:
+                return {
+                    'inputs': inputs,
+                    'predictions': {name: dict(value) for name, value in cached.items()}
+                }
+        
+        results = {'inputs': inputs, 'predictions': {}}
+        
         # Volume de irrigação
         vol_pred = self.predict_volume_irrigacao(
             temperatura, umidade_solo, ph_solo,
@@ -211,8 +419,130 @@ class FarmTechPredictor:
             nitrogenio_ok, fosforo_ok, potassio_ok, cultura
         )
         
+        if self.cache is not None:
+            self.cache.put(key, {name: dict(value)
+                                 for name, value in results['predictions'].items()})
+        
         return results
     
+    def encode_features(self, data, cultura='banana'):
+        """
+        Codifica muitas leituras de uma vez (versão vetorizada de prepare_input)
+        
+        Args:
+            data: DataFrame (ou lista de dicts) com temperatura, umidade_solo,
+                  ph_solo, nitrogenio[_ok], fosforo[_ok], potassio[_ok] e
+                  cultura; ou array (n, 8) já nas colunas de FEATURE_COLUMNS
+            cultura: Cultura das linhas quando não há coluna 'cultura'
+        
+        Returns:
+            Array numpy (n, 8) na ordem de FEATURE_COLUMNS
+        """
+        import pandas as pd
+        
+        if isinstance(data, np.ndarray):
+            X = np.asarray(data, dtype=float)
+            if X.ndim != 2 or X.shape[1] != len(FEATURE_COLUMNS):
+                raise ValueError(f"Array deve ter forma (n, {len(FEATURE_COLUMNS)}): "
+                                 f"{FEATURE_COLUMNS}")
+            return X
+        
+        df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        X = np.empty((len(df), len(FEATURE_COLUMNS)))
+        X[:, 0:3] = df[['temperatura', 'umidade_solo', 'ph_solo']].to_numpy(dtype=float)
+        
+        # Sensores trazem nitrogenio/fosforo/potassio; o treino, *_ok
+        for column, nutrient in enumerate(['nitrogenio', 'fosforo', 'potassio'], start=3):
+            name = f'{nutrient}_ok' if f'{nutrient}_ok' in df.columns else nutrient
+            X[:, column] = df[name].to_numpy().astype(bool)
+        
+        if 'cultura' in df.columns:
+            culturas = df['cultura'].to_numpy()
+            X[:, 6] = culturas == 'banana'
+            X[:, 7] = culturas == 'milho'
+        else:
+            X[:, 6] = cultura == 'banana'
+            X[:, 7] = cultura == 'milho'
+        
+        return X
+    
+    def predict_batch(self, data, cultura='banana', chunk_rows=PREDICT_CHUNK_ROWS):
+        """
+        Faz todas as previsões para muitas leituras de uma vez
+        
+        As features são codificadas em uma única passada, cada modelo é
+        chamado uma vez por bloco de chunk_rows linhas e as dosagens NPK
+        são calculadas com operações de array.
+        
+        Args:
+            data: DataFrame, lista de dicts ou array (ver encode_features)
+            cultura: Cultura das linhas quando não há coluna 'cultura'
+            chunk_rows: Linhas por chamada de model.predict (limita a memória)
+        
+        Returns:
+            DataFrame com volume_litros e rendimento_kg_ha (modelos
+            carregados) e as dosagens NPK, uma linha por leitura (mesmo
+            índice de um DataFrame de entrada); confiança de cada modelo
+            em result.attrs['confidence']
+        """
+        self._reload_if_changed()
+        X = self.encode_features(data, cultura)
+        columns = {}
+        
+        for target_name, (output, clip) in BATCH_OUTPUTS.items():
+            if target_name not in self.models:
+                continue
+            
+            values = np.empty(len(X))
+            for start in range(0, len(X), chunk_rows):
+                chunk = X[start:start + chunk_rows]
+                with PREDICTION_SECONDS.time(modelo=f'{target_name}_lote'):
+                    values[start:start + len(chunk)] = self.models[target_name].predict(
+                        self._model_input(target_name, chunk)
+                    )
+            if clip:
+                np.maximum(values, 0, out=values)
+            columns[output] = np.round(values, 2)
+        
+        # Dosagens: alvo da cultura onde o nutriente não está adequado
+        banana = X[:, 6] == 1
+        total = np.zeros(len(X), dtype=int)
+        for column, nutrient in enumerate(['nitrogenio', 'fosforo', 'potassio'], start=3):
+            target = np.where(banana, NPK_TARGETS['banana'][nutrient],
+                              NPK_TARGETS['milho'][nutrient])
+            dosagem = np.where(X[:, column] != 0, 0, target)
+            columns[f'{nutrient}_g_m2'] = dosagem
+            total += dosagem
+        columns['total_g_m2'] = total
+        
+        import pandas as pd
+        
+        index = data.index if isinstance(data, pd.DataFrame) else None
+        result = pd.DataFrame(columns, index=index)
+        result.attrs['confidence'] = {
+            target_name: self._calculate_confidence(None, target_name)
+            for target_name in self.models
+        }
+        return result
+    
+    def _model_input(self, target_name, X):
+        """
+        Seleciona em X (colunas de FEATURE_COLUMNS) as features do treino do modelo
+        
+        O treino usa só as colunas presentes nos dados (ex.: sem *_ok),
+        então o modelo pode esperar menos features que prepare_input gera.
+        """
+        model = self.models[target_name]
+        names = getattr(model, 'feature_names_in_', None)
+        if names is None:
+            return X
+        index = [FEATURE_COLUMNS.index(name) for name in names]
+        if isinstance(model, CompiledEnsemble):
+            # Sem DataFrame: o avaliador compilado recebe o array direto
+            return X[:, index]
+        import pandas as pd
+        return pd.DataFrame(X[:, index], columns=names)
+    
     def _calculate_confidence(self, prediction, model_name):
         """Calcula nível de confiança da previsão"""
         if model_name not in self.metrics:
@@ -228,20 +558,13 @@ class FarmTechPredictor:
     
     def _calculate_npk_dosages(self, n_ok, p_ok, k_ok, cultura):
         """Calcula dosagens NPK recomendadas"""
-        # Valores de referência (g/m²) - baseados em EMBRAPA
-        if cultura == 'banana':
-            n_target = 15
-            p_target = 10
-            k_target = 20
-        else:  # milho
-            n_target = 12
-            p_target = 8
-            k_target = 10
+        # Valores de referência (g/m²); qualquer outra cultura usa os do milho
+        targets = NPK_TARGETS['banana' if cultura == 'banana' else 'milho']
         
         dosagens = {
-            'nitrogenio_g_m2': 0 if n_ok else n_target,
-            'fosforo_g_m2': 0 if p_ok else p_target,
-            'potassio_g_m2': 0 if k_ok else k_target,
+            'nitrogenio_g_m2': 0 if n_ok else targets['nitrogenio'],
+            'fosforo_g_m2': 0 if p_ok else targets['fosforo'],
+            'potassio_g_m2': 0 if k_ok else targets['potassio'],
             'total_g_m2': 0
         }
         
@@ -259,10 +582,13 @@ class FarmTechPredictor:
             'models_loaded': list(self.models.keys()),
             'model_details': {}
         }
+        if self.cache is not None:
+            info['cache'] = self.cache.stats()
         
         for model_name, model in self.models.items():
             details = {
-                'type': type(model).__name__,
+                'type': getattr(model, 'estimator_name', type(model).__name__),
+                'backend': self._backend_of(model_name),
                 'metrics': self.metrics.get(model_name, {})
             }
             
@@ -295,7 +621,7 @@ def demo():
     info = predictor.get_model_info()
     for model_name, details in info['model_details'].items():
         print(f"\n🤖 {model_name}:")
-        print(f"   Tipo: {details['type']}")
+        print(f"   Tipo: {details['type']} ({details['backend']})")
         if 'test' in details['metrics']:
             print(f"   R²: {details['metrics']['test']['r2']:.4f}")
             print(f"   MAE: {details['metrics']['test']['mae']:.4f}")
@@ -0,0 +1,115 @@
+"""
+FarmTech Solutions - Cache de Previsões
+=======================================
+Cache LRU (com validade opcional) na frente dos modelos de
+FarmTechPredictor.predict_all. As leituras se repetem muito: NPK são três
+booleanos, a cultura tem dois valores e temperatura, umidade e pH são
+registrados com uma casa decimal. A chave é a leitura quantizada por
+CACHE_STEPS; os modelos avaliam o valor quantizado, então a resposta de
+uma chave não depende de qual leitura a preencheu.
+
+O predictor esvazia o cache quando recarrega modelos alterados em disco
+(*_model.pkl, *_compiled.pkl, *_metrics.json).
+
+Uso:
+    predictor = FarmTechPredictor('models', cache=PredictionCache())
+    predictor.load_models()
+    predictor.predict_all(...)
+    predictor.cache.stats()   # {'hits': ..., 'hit_rate': ..., ...}
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from database.metrics import PREDICTION_CACHE
+
+# Passo de quantização das leituras contínuas (precisão registrada pelos sensores)
+CACHE_STEPS = {'temperatura': 0.1, 'umidade_solo': 0.1, 'ph_solo': 0.1}
+
+# Entradas mantidas (as menos usadas saem primeiro) e validade (s, None = sem prazo)
+CACHE_MAX_ENTRIES = 50_000
+CACHE_TTL = None
+
+
+class PredictionCache:
+    """Cache LRU/TTL de previsões por leitura quantizada"""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, steps=None):
+        """
+        Args:
+            max_entries (int): Entradas mantidas
+            ttl (float): Validade (s) de cada entrada (None = até a invalidação)
+            steps (dict): Passo por leitura contínua (padrão: CACHE_STEPS)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.steps = {**CACHE_STEPS, **(steps or {})}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def quantize(self, temperatura, umidade_solo, ph_solo,
+                 nitrogenio_ok, fosforo_ok, potassio_ok, cultura='banana'):
+        """
+        Chave da leitura e valores contínuos quantizados
+
+        Returns:
+            tuple: (chave, (temperatura, umidade_solo, ph_solo) quantizados)
+        """
+        steps = (self.steps['temperatura'], self.steps['umidade_solo'], self.steps['ph_solo'])
+        indexes = tuple(round(value / step) for value, step in
+                        zip((temperatura, umidade_solo, ph_solo), steps))
+        key = (*indexes, bool(nitrogenio_ok), bool(fosforo_ok), bool(potassio_ok), cultura)
+        return key, tuple(index * step for index, step in zip(indexes, steps))
+
+    def get(self, key):
+        """Previsões da chave (None se ausente ou vencida)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or time.monotonic() < expires:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    PREDICTION_CACHE.inc(resultado='acerto')
+                    return value
+                del self._entries[key]
+                PREDICTION_CACHE.inc(resultado='vencida')
+            self.misses += 1
+        PREDICTION_CACHE.inc(resultado='falha')
+        return None
+
+    def put(self, key, value):
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Invalida todas as entradas (ex.: modelos recarregados)"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'invalidations': self.invalidations,
+        }
@@ -0,0 +1,374 @@
+"""
+FarmTech Solutions - Servidor de Previsão
+=========================================
+Serviço HTTP local que mantém os modelos carregados e atende ingestão,
+dashboard e CLI. Requisições concorrentes de uma leitura são agrupadas
+em micro-lotes: o primeiro pedido espera no máximo max_wait por outros
+(até max_batch leituras) e o lote inteiro passa por uma única chamada
+de FarmTechPredictor.predict_batch.
+
+    POST /predict   {"temperatura": 28, "umidade_solo": 35, "ph_solo": 6.5,
+                     "nitrogenio_ok": true, "fosforo_ok": false,
+                     "potassio_ok": false, "cultura": "banana"}
+                    → {"rendimento_kg_ha": ..., "total_g_m2": ..., "confidence": {...}}
+                    Lista de leituras → {"predictions": [...], "confidence": {...}}
+    GET  /health    modelos carregados e contagem de lotes
+    GET  /metrics   métricas (database/metrics.py)
+
+Uso:
+    python models/prediction_server.py --port 9109 --max-wait-ms 5
+
+    client = PredictionClient(port=9109)
+    client.predict(temperatura=28, umidade_solo=35, ph_solo=6.5,
+                   nitrogenio_ok=True, fosforo_ok=False, potassio_ok=False)
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from database.logs import configure_logging
+from database.metrics import (CONTENT_TYPE, METRICS, PREDICTION_BATCH_SIZE,
+                              PREDICTION_REQUESTS)
+from models.predict import FarmTechPredictor, PREDICTOR_BACKENDS
+
+# Porta padrão do servidor de previsão (a 9108 é a das métricas da ingestão)
+PREDICTION_PORT = 9109
+
+# Espera máxima (s) por outras requisições e tamanho máximo do micro-lote
+PREDICTION_MAX_WAIT = 0.005
+PREDICTION_MAX_BATCH = 256
+
+# Tempo máximo (s) de uma requisição na fila antes de responder 503
+PREDICTION_TIMEOUT = 5.0
+
+
+class _Request:
+    """Leituras de uma requisição HTTP e o Future da resposta"""
+
+    __slots__ = ('rows', 'future')
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.future = Future()
+
+
+class MicroBatcher:
+    """Agrupa requisições concorrentes em chamadas de predict_batch"""
+
+    def __init__(self, predictor, max_wait=PREDICTION_MAX_WAIT,
+                 max_batch=PREDICTION_MAX_BATCH):
+        """
+        Args:
+            predictor (FarmTechPredictor): Predictor com modelos carregados
+            max_wait (float): Espera máxima (s) do primeiro pedido do lote
+            max_batch (int): Leituras por lote (um pedido maior vai sozinho)
+        """
+        self.predictor = predictor
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.batches = 0
+        self.readings = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name='farmtech-microbatch',
+                                        daemon=True)
+        self._thread.start()
+
+    def encode(self, reading):
+        """
+        Valida e codifica uma leitura (dict com os argumentos de predict_all)
+
+        Raises:
+            TypeError/ValueError: Campos ausentes, desconhecidos ou não numéricos
+        """
+        return self.predictor.prepare_input(**reading).astype(float)[0]
+
+    def submit(self, readings):
+        """
+        Enfileira leituras já validadas
+
+        Args:
+            readings (list): Linhas de encode()
+
+        Returns:
+            Future: Lista de dicts (uma linha de predict_batch por leitura)
+
+        Raises:
+            ValueError: Nenhuma leitura
+        """
+        if not readings:
+            raise ValueError("nenhuma leitura para prever")
+        request = _Request(readings)
+        self._queue.put(request)
+        return request.future
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _run(self):
+        # Um lote com erro falha só as próprias requisições (ver _predict):
+        # esta thread não pode parar, senão todas as seguintes esperam até o timeout
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+
+            batch, rows = [request], len(request.rows)
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while rows < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    # Depois do prazo ainda entra o que já está na fila
+                    if remaining > 0:
+                        request = self._queue.get(timeout=remaining)
+                    else:
+                        request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+                rows += len(request.rows)
+
+            self._predict(batch, rows)
+            if stop:
+                return
+
+    def _predict(self, batch, rows):
+        """Uma chamada de predict_batch para o lote; resultados por requisição"""
+        try:
+            X = np.vstack([row for request in batch for row in request.rows])
+            records = self.predictor.predict_batch(X).to_dict('records')
+        except Exception as e:
+            logging.error(f"❌ Erro no micro-lote de {rows} leituras: {e}")
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        PREDICTION_BATCH_SIZE.observe(rows)
+        self.batches += 1
+        self.readings += rows
+        start = 0
+        for request in batch:
+            request.future.set_result(records[start:start + len(request.rows)])
+            start += len(request.rows)
+
+
+class _PredictionHandler(BaseHTTPRequestHandler):
+    """Rotas do servidor de previsão"""
+
+    # Conexões persistentes: um cliente faz várias requisições por conexão
+    protocol_version = 'HTTP/1.1'
+    # Cabeçalho e corpo saem em escritas separadas: sem Nagle cada resposta
+    # não espera o ACK atrasado do cliente (~40 ms)
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path == '/metrics':
+            self._send(200, METRICS.render().encode('utf-8'), CONTENT_TYPE)
+        elif path == '/health':
+            batcher = self.server.batcher
+            predictor = batcher.predictor
+            self._send_json(200, {
+                'models': {name: predictor._backend_of(name) for name in predictor.models},
+                'max_wait_ms': batcher.max_wait * 1000,
+                'max_batch': batcher.max_batch,
+                'batches': batcher.batches,
+                'readings': batcher.readings,
+            })
+        else:
+            self._send_json(404, {'error': 'rota desconhecida'})
+
+    def do_POST(self):
+        if self.path.split('?')[0] != '/predict':
+            self._send_json(404, {'error': 'rota desconhecida'})
+            return
+
+        batcher = self.server.batcher
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            single = isinstance(body, dict)
+            readings = [body] if single else body
+            if not isinstance(readings, list) or not readings or not all(
+                    isinstance(reading, dict) for reading in readings):
+                raise ValueError("envie uma leitura (objeto) ou uma lista não vazia de leituras")
+            rows = [batcher.encode(reading) for reading in readings]
+        except (TypeError, ValueError) as e:
+            PREDICTION_REQUESTS.inc(status='invalida')
+            self._send_json(400, {'error': str(e)})
+            return
+
+        try:
+            records = batcher.submit(rows).result(timeout=PREDICTION_TIMEOUT)
+        except FutureTimeout:
+            PREDICTION_REQUESTS.inc(status='timeout')
+            self._send_json(503, {'error': 'fila de previsão sobrecarregada'})
+            return
+        except Exception as e:
+            PREDICTION_REQUESTS.inc(status='erro')
+            self._send_json(500, {'error': str(e)})
+            return
+
+        PREDICTION_REQUESTS.inc(status='ok')
+        confidence = self.server.confidence
+        if single:
+            self._send_json(200, {**records[0], 'confidence': confidence})
+        else:
+            self._send_json(200, {'predictions': records, 'confidence': confidence})
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload).encode('utf-8'), 'application/json')
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Uma linha por requisição não vai para o log (ver métricas)
+        pass
+
+
+class PredictionServer(ThreadingHTTPServer):
+    """Servidor HTTP com o MicroBatcher dos modelos residentes"""
+
+    daemon_threads = True
+    # Muitos clientes conectando ao mesmo tempo (padrão do socketserver: 5)
+    request_queue_size = 128
+
+    def __init__(self, address, batcher):
+        super().__init__(address, _PredictionHandler)
+        self.batcher = batcher
+        # Confiança depende só das métricas de cada modelo: calculada uma vez
+        self.confidence = {name: batcher.predictor._calculate_confidence(None, name)
+                           for name in batcher.predictor.models}
+
+    def close(self):
+        """Para de aceitar requisições e encerra o MicroBatcher"""
+        self.shutdown()
+        self.server_close()
+        self.batcher.close()
+
+
+def start_prediction_server(predictor, port=PREDICTION_PORT, host='127.0.0.1',
+                            max_wait=PREDICTION_MAX_WAIT, max_batch=PREDICTION_MAX_BATCH):
+    """
+    Atende previsões em http://host:port em uma thread própria
+
+    Args:
+        predictor (FarmTechPredictor): Predictor com modelos carregados
+        port (int): Porta HTTP (0 = escolhida pelo sistema)
+        host (str): Interface (padrão: só local)
+        max_wait (float): Espera máxima (s) para formar um micro-lote
+        max_batch (int): Leituras por micro-lote
+
+    Returns:
+        PredictionServer: Servidor (server.close() encerra)
+    """
+    server = PredictionServer((host, port), MicroBatcher(predictor, max_wait, max_batch))
+    thread = threading.Thread(target=server.serve_forever, name='farmtech-prediction',
+                              daemon=True)
+    thread.start()
+    logging.info(f"🔮 Servidor de previsão em http://{host}:{server.server_address[1]} "
+                 f"(micro-lotes de até {max_batch} leituras, {max_wait * 1000:g} ms)")
+    return server
+
+
+class PredictionClient:
+    """Cliente do servidor de previsão (uma conexão persistente por thread)"""
+
+    def __init__(self, host='127.0.0.1', port=PREDICTION_PORT, timeout=10.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def predict(self, **reading):
+        """Previsões de uma leitura (argumentos de FarmTechPredictor.predict_all)"""
+        return self._request('POST', '/predict', reading)
+
+    def predict_many(self, readings):
+        """Previsões de uma lista de leituras (dicts)"""
+        return self._request('POST', '/predict', list(readings))
+
+    def health(self):
+        return self._request('GET', '/health')
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+
+    def _request(self, method, path, payload=None):
+        # bytes: http.client envia cabeçalho e corpo em uma única escrita
+        body = None if payload is None else json.dumps(payload).encode('utf-8')
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        for attempt in range(2):
+            connection = self._connection()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = json.loads(response.read())
+                break
+            except (ConnectionError, http.client.HTTPException):
+                # Conexão persistente fechada pelo servidor: reabre uma vez
+                connection.close()
+                self._local.connection = None
+                if attempt:
+                    raise
+        if response.status != 200:
+            raise RuntimeError(f"Servidor de previsão: {response.status} {data.get('error')}")
+        return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor de previsão FarmTech')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=PREDICTION_PORT)
+    parser.add_argument('--models-dir', default=str(Path(__file__).resolve().parent))
+    parser.add_argument('--backend', choices=PREDICTOR_BACKENDS, default='auto')
+    parser.add_argument('--max-wait-ms', type=float, default=PREDICTION_MAX_WAIT * 1000,
+                        help='espera máxima para formar um micro-lote')
+    parser.add_argument('--max-batch', type=int, default=PREDICTION_MAX_BATCH,
+                        help='leituras por micro-lote')
+    args = parser.parse_args()
+
+    configure_logging()
+    predictor = FarmTechPredictor(args.models_dir, backend=args.backend)
+    if not predictor.load_models():
+        sys.exit(1)
+
+    server = start_prediction_server(predictor, args.port, args.host,
+                                     args.max_wait_ms / 1000, args.max_batch)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        logging.info("🛑 Encerrando servidor de previsão")
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,15 +6,16 @@ Pipeline completo de treinamento para previsão de irrigação
 
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import joblib
 import json
+import sys
 from pathlib import Path
 from datetime import datetime
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from models.compiled_trees import save_compiled
+
 class FarmTechModelTrainer:
     """
     Classe para treinamento de modelos de Machine Learning
@@ -37,8 +38,12 @@ class FarmTechModelTrainer:
         """Carrega e prepara os dados"""
         print(f"📁 Carregando dados de {self.data_path}...")
         
-        # Carregar CSV
-        self.df = pd.read_csv(self.data_path)
+        # Carregar CSV ou Parquet (arquivo ou diretório particionado)
+        data_path = Path(self.data_path)
+        if data_path.is_dir() or data_path.suffix == '.parquet':
+            self.df = pd.read_parquet(data_path)
+        else:
+            self.df = pd.read_csv(data_path)
         
         # Converter booleanos
         bool_cols = ['nitrogenio_ok', 'fosforo_ok', 'potassio_ok']
@@ -107,6 +112,12 @@ class FarmTechModelTrainer:
             y: Target
             target_name: Nome do target para salvar modelos
         """
+        # sklearn só aqui: importar este módulo (ou o predictor) não o carrega
+        from sklearn.model_selection import train_test_split, cross_val_score
+        from sklearn.linear_model import LinearRegression
+        from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+        from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+        
         print(f"\n🤖 Treinando modelos para {target_name}...")
         
         # Split train/test
@@ -224,6 +235,13 @@ class FarmTechModelTrainer:
             joblib.dump(model, model_file)
             print(f"✅ Modelo salvo: {model_file}")
             
+            # Versão compilada (árvores em arrays NumPy) para previsão sem o sklearn
+            compiled_file = output_path / f"{target_name}_compiled.pkl"
+            if save_compiled(model, compiled_file, source=model_file):
+                print(f"✅ Modelo compilado: {compiled_file}")
+            elif compiled_file.exists():
+                compiled_file.unlink()
+            
             # Salvar métricas
             metrics_file = output_path / f"{target_name}_metrics.json"
             with open(metrics_file, 'w') as f:
@@ -0,0 +1,13 @@
+"""
+FarmTech Solutions - Configuração dos testes
+============================================
+Rodar a partir de "Cap 1":
+
+    python -m pytest -q tests
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
@@ -0,0 +1,252 @@
+"""
+Backends de STORAGE_BACKENDS: a mesma bateria da API de FarmTechDatabase
+
+SQLite e particionado usam um banco temporário. O PostgreSQL só roda com
+FARMTECH_PG_DSN definido e grava dados no banco informado: use um banco
+de testes.
+
+    FARMTECH_PG_DSN=postgresql://... python -m pytest -q tests/test_backends.py
+"""
+
+import os
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from database.database_manager import open_database
+from database.queries import DASHBOARD_QUERIES
+
+BATCH_ROWS = 2000
+CHUNK_ROWS = 300
+DEDUP_ROWS = 300
+
+
+def _reading(cultura):
+    """Leitura simulada com previsão e ação de irrigação"""
+    umidade = random.uniform(25, 75)
+    return {
+        'temperatura': round(random.uniform(18, 35), 2),
+        'umidade_solo': round(umidade, 2),
+        'ph_solo': round(random.uniform(5.0, 8.0), 2),
+        'nitrogenio': random.choice([True, False]),
+        'fosforo': random.choice([True, False]),
+        'potassio': random.choice([True, False]),
+        'irrigacao_ativa': umidade < 40,
+        'cultura': cultura,
+        'prediction': {'volume_irrigacao': round(random.uniform(0, 10), 2)},
+        'irrigation_action': {
+            'acao': 'LIGAR' if umidade < 40 else 'DESLIGAR',
+            'motivo': 'verificação\tcom "caracteres" especiais\n',
+            'volume': 5.0,
+            'duracao': 10
+        }
+    }
+
+
+@pytest.fixture(params=['sqlite', 'partitioned', 'postgres'])
+def db(request, tmp_path):
+    if request.param == 'postgres':
+        if not os.environ.get('FARMTECH_PG_DSN'):
+            pytest.skip('FARMTECH_PG_DSN não definido')
+        db = open_database('postgres')
+    else:
+        db = open_database(request.param, db_path=tmp_path / 'farmtech.db')
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def batch(db):
+    """Lote de BATCH_ROWS leituras mais uma avulsa; devolve (lote, IDs, estatísticas antes)"""
+    before = db.get_statistics()
+    readings = [_reading(random.choice(['banana', 'milho'])) for _ in range(BATCH_ROWS)]
+    ids = db.insert_readings_batch(readings)
+
+    single_id = db.insert_sensor_reading(_reading('banana'))
+    db.insert_prediction(single_id, {'volume_irrigacao': 1.0})
+    db.insert_irrigation_action(single_id, 'LIGAR', 'teste', 1.0, 5)
+    return readings, ids + [single_id], before
+
+
+def test_insercao_devolve_ids_e_atualiza_estatisticas(db, batch):
+    _, ids, before = batch
+
+    assert len(set(ids)) == BATCH_ROWS + 1 and ids == sorted(ids)
+    after = db.get_statistics()
+    assert after['total_leituras'] - before['total_leituras'] == BATCH_ROWS + 1
+    assert after['total_previsoes'] - before['total_previsoes'] == BATCH_ROWS + 1
+    assert after['total_acoes'] - before['total_acoes'] == BATCH_ROWS + 1
+
+
+def test_leituras_recentes_respeitam_limite_e_ordem(db, batch):
+    recent = db.get_recent_readings(limit=50)
+
+    assert len(recent) == 50
+    assert pd.to_datetime(recent['timestamp']).is_monotonic_decreasing
+
+
+def test_texto_com_caracteres_especiais_preservado(db, batch):
+    readings, _, _ = batch
+
+    actions = db.run_query('recent_actions', (BATCH_ROWS,))
+
+    assert (actions['motivo'] == readings[0]['irrigation_action']['motivo']).any()
+
+
+def test_iter_readings_percorre_tudo_em_blocos_ordenados(db, batch):
+    chunks = list(db.iter_readings(chunk_rows=CHUNK_ROWS))
+
+    streamed = pd.concat(chunks, ignore_index=True)
+    keys = list(zip(pd.to_datetime(streamed['timestamp']), streamed['id']))
+    assert len(streamed) == db.get_statistics()['total_leituras']
+    assert all(len(chunk) <= CHUNK_ROWS for chunk in chunks)
+    assert keys == sorted(keys)
+
+
+def test_rollups_incrementais_iguais_aos_recalculados(db, batch):
+    summary = db.get_rollup_summary('day')
+    db.rebuild_rollups()
+    rebuilt = db.get_rollup_summary('day')
+
+    assert summary['total_leituras'] == rebuilt['total_leituras'] \
+        == db.get_statistics()['total_leituras']
+    assert summary['temperatura_media'] == pytest.approx(rebuilt['temperatura_media'], abs=1e-9)
+
+
+def test_consultas_do_dashboard_executam(db, batch):
+    failed = []
+    for name, query in DASHBOARD_QUERIES.items():
+        try:
+            db.run_query(name, query['params'])
+        except Exception as e:
+            failed.append(f"{name}: {e}")
+
+    assert not failed
+
+
+class TestChaveNatural:
+    """Chave natural (device_id, timestamp), upsert e janela de atraso"""
+
+    start = datetime(2025, 11, 25, 10, 0, 0)
+
+    @pytest.fixture
+    def existing(self, db):
+        # device_id único: no PostgreSQL o banco persiste entre execuções
+        device = f"check-{uuid.uuid4().hex[:8]}"
+        ids = db.insert_readings_batch([self._keyed(device, index)
+                                        for index in range(DEDUP_ROWS)])
+        return device, ids
+
+    def _keyed(self, device, index, delta=0.0):
+        reading = _reading('milho')
+        reading.update(device_id=device, temperatura=20.0 + index % 7 + delta,
+                       timestamp=self.start + timedelta(seconds=10 * index))
+        return reading
+
+    def _device_rows(self, db, device):
+        return db.read_dataframe(
+            "SELECT r.id, r.temperatura, "
+            "(SELECT COUNT(*) FROM predictions p WHERE p.reading_id = r.id) AS previsoes "
+            "FROM sensor_readings r WHERE r.device_id = ? ORDER BY r.id", (device,)
+        )
+
+    def test_reenvio_com_a_mesma_chave_atualiza(self, db, existing):
+        device, ids = existing
+        resent = db.insert_readings_batch([self._keyed(device, index, delta=1.0)
+                                           for index in range(DEDUP_ROWS)])
+
+        stored = self._device_rows(db, device)
+        assert resent == ids
+        assert len(stored) == DEDUP_ROWS
+        assert (stored['previsoes'] == 1).all()
+        assert stored['temperatura'].sum() == pytest.approx(
+            sum(21.0 + index % 7 for index in range(DEDUP_ROWS)))
+
+    def test_buckets_do_upsert_iguais_aos_reconstruidos(self, db, existing):
+        device, _ = existing
+        db.insert_readings_batch([self._keyed(device, index, delta=1.0)
+                                  for index in range(DEDUP_ROWS)])
+        end = self.start + timedelta(seconds=10 * DEDUP_ROWS)
+
+        incremental = db.get_rollups('minute', self.start, end, cultura='milho')
+        db.rebuild_rollups()
+        rebuilt = db.get_rollups('minute', self.start, end, cultura='milho')
+
+        assert len(incremental) > 0
+        # Somas em outra ordem diferem no último dígito do float
+        pd.testing.assert_frame_equal(incremental, rebuilt, check_exact=False, rtol=1e-9)
+
+    def test_atraso_dentro_da_janela_aceito_fora_recusado(self, db, existing):
+        device, _ = existing
+        late_ok = db.insert_readings_batch(
+            [{**self._keyed(device, 0), 'timestamp': self.start - timedelta(hours=1)}])
+        too_late = db.insert_readings_batch(
+            [{**self._keyed(device, 0), 'timestamp': self.start - timedelta(days=2)}])
+
+        assert late_ok[0] is not None
+        assert too_late == [None]
+        assert len(self._device_rows(db, device)) == DEDUP_ROWS + 1
+
+
+class TestPostgres:
+    """Detalhes do backend PostgreSQL"""
+
+    def test_adapt_sql_so_troca_parametros_fora_de_literais(self):
+        pytest.importorskip('psycopg2')
+        from database.postgres import PostgresFarmTechDatabase
+
+        adapted = PostgresFarmTechDatabase._adapt_sql(
+            "SELECT 'e?''%' AS \"a?\", x FROM t WHERE y LIKE '10%' AND z = ? AND w % 2 = ?")
+
+        assert adapted == ("SELECT 'e?''%%' AS \"a?\", x FROM t WHERE y LIKE '10%%' "
+                           "AND z = %s AND w %% 2 = %s")
+
+    def test_chave_gravada_por_outro_gateway_durante_o_lote(self):
+        if not os.environ.get('FARMTECH_PG_DSN'):
+            pytest.skip('FARMTECH_PG_DSN não definido')
+        db, other = open_database('postgres'), open_database('postgres')
+        device = f"race-{uuid.uuid4().hex[:8]}"
+        start = datetime(2025, 11, 25, 10, 0, 0)
+        first = {**_reading('milho'), 'device_id': device, 'timestamp': start,
+                 'temperatura': 20.0}
+        second = {**first, 'temperatura': 30.0}
+
+        # O outro gateway grava a chave e só faz commit depois que o lote
+        # já classificou a leitura como nova
+        written = {}
+        started = threading.Event()
+
+        def other_gateway():
+            with other.write_transaction() as cursor:
+                written['ids'], _, _ = other._insert_batch_rows(cursor, [first])
+                started.set()
+                time.sleep(0.5)
+
+        thread = threading.Thread(target=other_gateway)
+        thread.start()
+        started.wait()
+        try:
+            ids = db.insert_readings_batch([second])
+        finally:
+            thread.join()
+
+        stored = db.read_dataframe(
+            "SELECT r.id, r.temperatura, "
+            "(SELECT COUNT(*) FROM predictions p WHERE p.reading_id = r.id) AS previsoes "
+            "FROM sensor_readings r WHERE r.device_id = ?", (device,))
+        end = start + timedelta(minutes=1)
+        incremental = db.get_rollups('minute', start, end, cultura='milho')
+        db.rebuild_rollups()
+        rebuilt = db.get_rollups('minute', start, end, cultura='milho')
+        db.close()
+        other.close()
+
+        assert ids == written['ids']
+        assert stored['temperatura'].tolist() == [30.0]
+        assert stored['previsoes'].tolist() == [1]
+        pd.testing.assert_frame_equal(incremental, rebuilt, check_exact=False, rtol=1e-9)
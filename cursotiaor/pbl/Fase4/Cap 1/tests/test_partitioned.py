@@ -0,0 +1,60 @@
+"""Backend particionado: consultas do dashboard além da view padrão"""
+
+import pytest
+
+from database.partitioned import MAX_ATTACHED, PartitionedFarmTechDatabase
+
+MONTHS = [f"2025-{month:02d}" for month in range(1, 11)]
+
+
+def _reading(month, day):
+    return dict(timestamp=f"{month}-{day:02d} 12:00:00", device_id='esp32-01',
+                temperatura=25.0, umidade_solo=40.0, ph_solo=6.5, nitrogenio=True,
+                fosforo=True, potassio=True, irrigacao_ativa=False, cultura='banana')
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = PartitionedFarmTechDatabase(tmp_path / 'farmtech.db', view_months=2)
+    db.late_data_window = None
+    for month in MONTHS[-5:]:
+        db.insert_readings_batch([_reading(month, day) for day in range(1, 11)])
+    yield db
+    db.close()
+
+
+def test_intervalo_anexa_as_particoes_necessarias(db):
+    df = db.run_query('time_series', ('1970-01-01 00:00:00',))
+    assert len(df) == 50
+    assert df['timestamp'].str[:7].unique().tolist() == MONTHS[-5:]
+
+    df = db.run_query('time_series_cultura', ('banana', '2025-08-05 00:00:00'))
+    assert len(df) == 6 + 20
+
+
+def test_historico_completo_le_todas_as_particoes(db):
+    assert len(db.run_query('analysis_data')) == 50
+    # Consultas sem intervalo continuam na view padrão (view_months)
+    assert db.run_query('latest_timestamp').iloc[0, 0] == '2025-10-10 12:00:00'
+
+
+def test_acima_do_limite_de_attach_le_as_mais_recentes(db, caplog):
+    for month in MONTHS[:-5]:
+        db.insert_readings_batch([_reading(month, 1)])
+
+    df = db.run_query('analysis_data')
+
+    assert df['timestamp'].str[:7].nunique() == MAX_ATTACHED
+    assert 'partições' in caplog.text
+
+
+def test_lote_com_mes_selado_grava_os_demais(db):
+    assert db.seal_partition('2025-06')
+    before = db.ingest_counters['fora_da_janela']
+
+    ids = db.insert_readings_batch([_reading('2025-06', 20), _reading('2025-10', 20),
+                                    _reading('2025-11', 1)])
+
+    assert ids[0] is None and ids[1] is not None and ids[2] is not None
+    assert db.ingest_counters['fora_da_janela'] - before == 1
+    assert len(db.run_query('analysis_data')) == 52
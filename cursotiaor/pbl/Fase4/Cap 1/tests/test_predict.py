@@ -0,0 +1,67 @@
+"""Predictor: cache de previsões e recarga dos modelos"""
+
+import contextlib
+import gc
+import io
+import shutil
+import warnings
+
+import pytest
+
+from conftest import ROOT
+from database.metrics import PREDICTION_CACHE_SIZE
+from models.predict import FarmTechPredictor
+from models.prediction_cache import PredictionCache
+
+READING = (28, 35, 6.5, True, False, False)
+
+
+@pytest.fixture
+def models_dir(tmp_path):
+    for path in (ROOT / 'models').glob('rendimento_estimado_*'):
+        shutil.copy2(path, tmp_path)
+    return tmp_path
+
+
+def _predictor(models_dir, cache=None):
+    warnings.simplefilter('ignore')
+    with contextlib.redirect_stdout(io.StringIO()):
+        predictor = FarmTechPredictor(models_dir, cache=cache)
+        assert predictor.load_models()
+    return predictor
+
+
+def test_gauge_do_cache_por_predictor(models_dir, tmp_path):
+    first = _predictor(models_dir, cache=PredictionCache())
+    FarmTechPredictor(tmp_path / 'outro', cache=PredictionCache())
+    with contextlib.redirect_stdout(io.StringIO()):
+        first.predict_all(*READING)
+
+    assert PREDICTION_CACHE_SIZE.value(modelos=str(models_dir)) == len(first.cache) == 1
+    assert PREDICTION_CACHE_SIZE.value(modelos=str(tmp_path / 'outro')) == 0
+
+    # O registro da métrica não mantém o cache vivo
+    del first
+    gc.collect()
+    assert PREDICTION_CACHE_SIZE.value(modelos=str(models_dir)) == 0
+
+
+@pytest.mark.parametrize('cache', [None, PredictionCache()], ids=['sem_cache', 'com_cache'])
+def test_recarrega_modelos_alterados(models_dir, monkeypatch, cache):
+    monkeypatch.setattr('models.predict.MODEL_FILES_CHECK_INTERVAL', 0)
+    predictor = _predictor(models_dir, cache=cache)
+    loaded = predictor.models
+
+    metrics_file = models_dir / 'rendimento_estimado_metrics.json'
+    metrics_file.write_text(metrics_file.read_text() + '\n')
+    with contextlib.redirect_stdout(io.StringIO()):
+        predictor.predict_all(*READING)
+    assert predictor.models is not loaded
+
+    loaded = predictor.models
+    metrics_file.write_text(metrics_file.read_text() + '\n')
+    with contextlib.redirect_stdout(io.StringIO()):
+        predictor.predict_batch([dict(zip(
+            ['temperatura', 'umidade_solo', 'ph_solo',
+             'nitrogenio_ok', 'fosforo_ok', 'potassio_ok'], READING))])
+    assert predictor.models is not loaded
@@ -0,0 +1,80 @@
+"""Servidor de previsão: validação das requisições e micro-lotes"""
+
+import contextlib
+import io
+import json
+import warnings
+from http.client import HTTPConnection
+
+import numpy as np
+import pytest
+
+from conftest import ROOT
+from models.predict import FarmTechPredictor
+from models.prediction_server import MicroBatcher, PredictionClient, start_prediction_server
+
+READING = dict(temperatura=28, umidade_solo=35, ph_solo=6.5,
+               nitrogenio_ok=True, fosforo_ok=False, potassio_ok=False)
+
+
+@pytest.fixture(scope='module')
+def predictor():
+    warnings.simplefilter('ignore')
+    with contextlib.redirect_stdout(io.StringIO()):
+        predictor = FarmTechPredictor(ROOT / 'models')
+        assert predictor.load_models()
+    return predictor
+
+
+@pytest.fixture
+def server(predictor):
+    server = start_prediction_server(predictor, port=0)
+    yield server
+    server.close()
+
+
+def _post(server, body):
+    connection = HTTPConnection('127.0.0.1', server.server_address[1], timeout=10)
+    connection.request('POST', '/predict', body=json.dumps(body).encode('utf-8'),
+                       headers={'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    payload = json.loads(response.read())
+    connection.close()
+    return response.status, payload
+
+
+def test_lista_vazia_recusada_sem_derrubar_o_batcher(server):
+    status, payload = _post(server, [])
+    assert status == 400
+    assert 'error' in payload
+
+    client = PredictionClient(port=server.server_address[1])
+    assert 'rendimento_kg_ha' in client.predict(**READING)
+    assert client.health()['batches'] == 1
+
+
+def test_leitura_invalida_recusada(server):
+    status, _ = _post(server, {'temperatura': 28})
+    assert status == 400
+
+
+def test_lote_com_erro_falha_so_as_proprias_requisicoes(predictor):
+    batcher = MicroBatcher(predictor, max_wait=0)
+    try:
+        with pytest.raises(ValueError):
+            batcher.submit([])
+        # Linhas de tamanhos diferentes: np.vstack falha dentro do lote
+        broken = batcher.submit([np.zeros(8), np.zeros(3)])
+        with pytest.raises(ValueError):
+            broken.result(timeout=5)
+
+        ok = batcher.submit([batcher.encode(READING)])
+        assert len(ok.result(timeout=5)) == 1
+    finally:
+        batcher.close()
+
+
+def test_lista_de_leituras(server):
+    status, payload = _post(server, [READING, {**READING, 'cultura': 'milho'}])
+    assert status == 200
+    assert len(payload['predictions']) == 2
@@ -0,0 +1,76 @@
+"""Retenção: partições mensais vencidas no backend particionado"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from database.partitioned import PartitionedFarmTechDatabase
+from database.retention import DEFAULT_RETENTION_POLICY, RetentionManager, load_retention_policy
+
+MONTHS = ['2025-01', '2025-02', '2025-03']
+NOW = datetime(2025, 3, 12, tzinfo=timezone.utc)
+
+
+def _reading(month, day, hour):
+    return dict(timestamp=f"{month}-{day:02d} {hour:02d}:00:00", device_id='esp32-01',
+                temperatura=25.0, umidade_solo=40.0, ph_solo=6.5, nitrogenio=True,
+                fosforo=True, potassio=True, irrigacao_ativa=False, cultura='banana')
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = PartitionedFarmTechDatabase(tmp_path / 'farmtech.db')
+    db.late_data_window = None
+    for month in MONTHS:
+        db.insert_readings_batch([_reading(month, day, hour)
+                                  for day in range(1, 11) for hour in range(24)])
+    yield db
+    db.close()
+
+
+def _monthly_totals(db):
+    days = db.get_rollups('day')
+    return days.groupby(days['bucket'].str[:7])['n'].sum()
+
+
+def test_particoes_vencidas_sao_descartadas(db):
+    retention = RetentionManager(db, pause_seconds=0)
+    before = retention.used_bytes()
+
+    report = retention.run(now=NOW)
+
+    assert report['removidas']['sensor_readings'] == 2 * 240
+    assert list(db.partition_status()['month']) == ['2025-03']
+    assert retention.used_bytes() < before
+    # Os rollups continuam com todos os meses
+    assert _monthly_totals(db).to_dict() == {month: 240 for month in MONTHS}
+
+
+def test_particoes_vencidas_sao_arquivadas(db, tmp_path):
+    archive_dir = tmp_path / 'arquivo'
+    retention = RetentionManager(db, pause_seconds=0, archive_dir=archive_dir)
+
+    assert retention.purge_before('sensor_readings', '2025-03-05 00:00:00') == 2 * 240
+    assert sorted(path.name for path in archive_dir.iterdir()) == [
+        'readings_2025-01.db', 'readings_2025-02.db']
+    # Já arquivadas: a próxima passada não as conta de novo
+    assert retention.purge_before('sensor_readings', '2025-03-05 00:00:00') == 0
+    assert len(db.partition_status()) == 3
+
+
+def test_limite_de_tamanho_descarta_particoes_antigas(db):
+    retention = RetentionManager(db, pause_seconds=0, max_db_bytes=1)
+
+    removed = retention.trim_to_size()
+
+    assert removed['sensor_readings'] == 2 * 240
+    assert list(db.partition_status()['month']) == ['2025-03']
+
+
+def test_politica_aplicada_fica_gravada_no_banco(db):
+    assert load_retention_policy(db) == DEFAULT_RETENTION_POLICY
+
+    RetentionManager(db, policy={'sensor_readings': 30}, pause_seconds=0).run(now=NOW)
+
+    assert load_retention_policy(db)['sensor_readings'] == 30
+    assert load_retention_policy(db)['sensor_rollup_hour'] is None
@@ -0,0 +1,67 @@
+"""Rollups: upsert pela chave natural depois da retenção das leituras brutas"""
+
+import pytest
+
+from database.database_manager import FarmTechDatabase
+from database.retention import RetentionManager
+
+DAY = '2025-01-01'
+
+
+def _reading(hour, temperatura, cultura='banana'):
+    return dict(timestamp=f"{DAY} {hour:02d}:00:00", device_id='esp32-01',
+                temperatura=temperatura, umidade_solo=40.0, ph_solo=6.5,
+                nitrogenio=True, fosforo=True, potassio=False,
+                irrigacao_ativa=False, cultura=cultura)
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = FarmTechDatabase(tmp_path / 'farmtech.db')
+    db.late_data_window = None
+    db.insert_readings_batch([_reading(hour, 20.0 + hour) for hour in range(24)])
+    yield db
+    db.close()
+
+
+def _day(db, cultura='banana'):
+    rows = db.get_rollups('day', cultura=cultura)
+    assert len(rows) == 1
+    return rows.iloc[0]
+
+
+def test_upsert_depois_da_retencao_mantem_o_bucket(db):
+    removed = RetentionManager(db, pause_seconds=0).purge_before(
+        'sensor_readings', f"{DAY} 12:00:00")
+    assert removed == 12
+
+    db.insert_readings_batch([_reading(15, 40.0)])
+
+    day = _day(db)
+    assert day['n'] == 24
+    assert day['temperatura_sum'] == pytest.approx(sum(20.0 + h for h in range(24)) + 5.0)
+    assert day['temperatura_max'] == 43.0
+    hour = db.get_rollups('hour', start=f"{DAY} 15:00:00", end=f"{DAY} 16:00:00").iloc[0]
+    assert hour['n'] == 1 and hour['temperatura_sum'] == 40.0
+
+
+def test_upsert_troca_de_cultura_move_a_leitura(db):
+    RetentionManager(db, pause_seconds=0).purge_before('sensor_readings', f"{DAY} 12:00:00")
+
+    db.insert_readings_batch([_reading(15, 35.0, cultura='milho')])
+
+    assert _day(db)['n'] == 23
+    milho = _day(db, cultura='milho')
+    assert milho['n'] == 1 and milho['temperatura_min'] == 35.0
+
+
+def test_correcao_com_brutas_completas_recalcula_min_max(db):
+    db.insert_readings_batch([_reading(23, 999.0)])
+    assert _day(db)['temperatura_max'] == 999.0
+
+    db.insert_readings_batch([_reading(23, 43.0)])
+
+    day = _day(db)
+    assert day['n'] == 24
+    assert day['temperatura_max'] == 43.0
+    assert day['temperatura_sum'] == pytest.approx(sum(20.0 + h for h in range(24)))
@@ -0,0 +1,151 @@
+"""
+Multiplexador de comandos do ESP32 (ir_alem): ESP32 simulado em um pty
+
+O teste faz o papel do firmware no lado mestre do pseudo-terminal e o
+SerialCommandMux usa o lado escravo como porta serial.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+from conftest import ROOT
+
+pty = pytest.importorskip('pty')
+serial = pytest.importorskip('serial')
+
+sys.path.insert(0, str(ROOT / 'ir_alem' / 'iralempython'))
+
+from serial_communication import SerialCommandMux, SerialCommunicator  # noqa: E402
+
+PORT_TIMEOUT = 0.2
+
+
+class FakeESP32:
+    """Lado mestre do pty: lê os comandos e escreve respostas/telemetria"""
+
+    def __init__(self, master_fd):
+        self.master_fd = master_fd
+        self._received = b''
+
+    def write(self, data):
+        os.write(self.master_fd, data)
+
+    def commands(self, count, timeout=5.0):
+        """Próximos count comandos recebidos (sem o '\\n')"""
+        deadline = time.monotonic() + timeout
+        while self._received.count(b'\n') < count and time.monotonic() < deadline:
+            self._received += os.read(self.master_fd, 1024)
+        *lines, self._received = self._received.split(b'\n', count)
+        if len(lines) < count:
+            raise TimeoutError(lines)
+        return [line.decode() for line in lines]
+
+
+@pytest.fixture
+def port():
+    master, slave = pty.openpty()
+    port = serial.Serial(os.ttyname(slave), 115200, timeout=PORT_TIMEOUT)
+    yield FakeESP32(master), port
+    port.close()
+    os.close(master)
+    os.close(slave)
+
+
+@pytest.fixture
+def mux_factory(port):
+    muxes = []
+
+    def factory(**kwargs):
+        mux = SerialCommandMux(port[1], **kwargs)
+        mux.start()
+        muxes.append(mux)
+        return port[0], mux
+
+    yield factory
+    for mux in muxes:
+        mux.close()
+
+
+def test_respostas_com_tag_fora_de_ordem(mux_factory):
+    esp32, mux = mux_factory(tagged=True)
+
+    futures = [mux.submit(command) for command in ('GET_STATUS', 'RAIN_ALERT:1', 'PING')]
+    assert esp32.commands(3) == ['GET_STATUS #1', 'RAIN_ALERT:1 #2', 'PING #3']
+    esp32.write(b'PONG #3\nRAIN_OK #2\nSTATUS:1,45.2,23.8,0 #1\n')
+
+    assert [future.result(2) for future in futures] == [
+        'STATUS:1,45.2,23.8,0', 'RAIN_OK', 'PONG']
+
+
+def test_telemetria_nao_e_resposta(mux_factory):
+    esp32, mux = mux_factory()
+
+    future = mux.submit('GET_STATUS')
+    assert esp32.commands(1) == ['GET_STATUS']
+    esp32.write(b'Umidade: 45.2%\nSTATUS:1,45.2,23.8,0\npH Base: 6.5\n')
+
+    assert future.result(2) == 'STATUS:1,45.2,23.8,0'
+    assert mux.telemetry.get(timeout=2) == 'Umidade: 45.2%'
+    assert mux.telemetry.get(timeout=2) == 'pH Base: 6.5'
+
+
+def test_linha_partida_pelo_timeout_da_porta(mux_factory):
+    esp32, mux = mux_factory()
+
+    future = mux.submit('GET_STATUS')
+    esp32.commands(1)
+    esp32.write(b'STAT')
+    time.sleep(PORT_TIMEOUT * 3)
+    esp32.write(b'US:1,45.2,23.8,0\n')
+
+    assert future.result(2) == 'STATUS:1,45.2,23.8,0'
+    assert mux.telemetry.empty()
+
+
+def test_comando_vencido_nao_rouba_a_resposta(mux_factory):
+    esp32, mux = mux_factory()
+
+    stale = mux.submit('SUSPEND_IRRIGATION', timeout=0.1)
+    time.sleep(0.2)
+    fresh = mux.submit('RAIN_ALERT:1')
+    esp32.commands(2)
+    esp32.write(b'OK\n')
+
+    assert fresh.result(2) == 'OK'
+    with pytest.raises(TimeoutError):
+        stale.result(2)
+
+
+def test_send_com_timeout_libera_o_pendente(mux_factory):
+    esp32, mux = mux_factory()
+
+    assert mux.send('SUSPEND_IRRIGATION', timeout=0.1) == ''
+    fresh = mux.submit('RAIN_ALERT:1')
+    esp32.commands(2)
+    esp32.write(b'OK\n')
+
+    assert fresh.result(2) == 'OK'
+    assert not mux._pending
+
+
+def test_post_nao_deixa_pendente(mux_factory):
+    esp32, mux = mux_factory()
+
+    mux.post('SUSPEND_IRRIGATION')
+    future = mux.submit('RAIN_ALERT:1')
+    assert esp32.commands(2) == ['SUSPEND_IRRIGATION', 'RAIN_ALERT:1']
+    esp32.write(b'OK\n')
+
+    assert future.result(2) == 'OK'
+
+
+def test_send_commands_libera_os_que_venceram(mux_factory, capsys):
+    esp32, mux = mux_factory()
+    comm = SerialCommunicator()
+    comm.serial_port, comm.mux = mux.serial_port, mux
+
+    assert comm.send_commands(['SUSPEND_IRRIGATION', 'PING'], timeout=0.2) == ['', '']
+    assert not mux._pending
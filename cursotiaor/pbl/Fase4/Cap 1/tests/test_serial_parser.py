@@ -0,0 +1,51 @@
+"""SensorFrameParser: blocos do Serial Monitor em qualquer fatiamento"""
+
+import random
+
+import pytest
+
+from collect_serial_data import SensorFrameParser, _sample_frame, benchmark_parser
+
+FRAMES = 20
+
+
+def _lines(skip_field=None):
+    return [line for index in range(FRAMES) for line in _sample_frame(index)
+            if skip_field is None or index != 5 or skip_field not in line]
+
+
+def _feed(chunks):
+    parser = SensorFrameParser()
+    readings = [reading for chunk in chunks for reading in parser.feed(chunk)]
+    return [{k: v for k, v in reading.items() if k != 'timestamp'} for reading in readings]
+
+
+@pytest.fixture
+def expected():
+    return [{'nitrogenio': 1, 'fosforo': 0, 'potassio': 1, 'ph_solo': 6.52,
+             'temperatura': 20 + index % 15 + 0.4, 'umidade_solo': 40 + index % 30 + 0.2,
+             'irrigacao_ativa': index % 2} for index in range(FRAMES)]
+
+
+def test_fatiamento_nao_muda_as_leituras(expected):
+    lines = _lines()
+    stream = b''.join(lines)
+    cuts = sorted(random.Random(0).sample(range(1, len(stream)), 200))
+
+    assert _feed(lines) == expected
+    assert _feed([stream]) == expected
+    assert _feed([stream[a:b] for a, b in zip([0] + cuts, cuts + [len(stream)])]) == expected
+
+
+@pytest.mark.parametrize('field', ['Temperatura:'.encode(), 'Relé:'.encode()])
+def test_bloco_incompleto_e_descartado(expected, field):
+    del expected[5]
+
+    assert _feed(_lines(field)) == expected
+    assert _feed([b''.join(_lines(field))]) == expected
+
+
+def test_benchmark_legado_fecha_as_mesmas_leituras():
+    result = benchmark_parser(frames=50)
+
+    assert result['leituras'] == result['leituras_legado'] == 50
@@ -0,0 +1,88 @@
+"""
+Spool de ingestão com o banco indisponível
+
+Outra conexão segura um lock exclusivo enquanto o pipeline de
+AutoIngestion roda com IngestionSpool.
+"""
+
+import shutil
+import sqlite3
+
+import pytest
+
+from database.database_manager import AutoIngestion, open_database
+from database.spool import IngestionSpool
+
+READINGS = 2000
+
+
+def _count(db, table):
+    return db._fetchone(f"SELECT COUNT(*) FROM {table}")[0]
+
+
+@pytest.fixture(params=['sqlite', 'partitioned'])
+def db(request, tmp_path):
+    # busy_timeout curto: o lock derruba a gravação na hora
+    db = open_database(request.param, db_path=tmp_path / 'farmtech_spool.db',
+                       storage_profile={'busy_timeout_ms': 50})
+    yield db
+    db.close()
+
+
+def _spool(spool_dir, **kwargs):
+    return IngestionSpool(spool_dir, gateway_id='check', retry_interval=0, **kwargs)
+
+
+def test_queda_do_banco_e_reenvio(db, tmp_path):
+    spool_dir = tmp_path / 'spool'
+    spool = _spool(spool_dir, segment_bytes=64 * 1024)
+
+    # 1. Banco travado: tudo vai para o spool
+    locker = sqlite3.connect(tmp_path / 'farmtech_spool.db', isolation_level=None)
+    locker.execute("BEGIN EXCLUSIVE")
+    ingestion = AutoIngestion(db, spool=spool)
+    ingestion.start_pipeline(batch_size=100, flush_interval=0.2, max_readings=READINGS)
+    locker.execute("ROLLBACK")
+    locker.close()
+
+    assert ingestion.pipeline_stats['spool'] == READINGS
+    assert spool.pending == READINGS
+    assert _count(db, 'sensor_readings') == 0
+
+    # 2. Banco de volta: cópia dos segmentos simula queda antes de apagá-los
+    backup_dir = tmp_path / 'backup'
+    shutil.copytree(spool_dir, backup_dir)
+
+    assert spool.replay(db) == READINGS
+    assert _count(db, 'sensor_readings') == _count(db, 'predictions') == READINGS
+    assert spool.pending == 0
+    spool.close()
+
+    # 3. Reenvio repetido não duplica
+    shutil.rmtree(spool_dir)
+    shutil.copytree(backup_dir, spool_dir)
+    spool = _spool(spool_dir)
+    spool.replay(db)
+
+    assert _count(db, 'sensor_readings') == _count(db, 'ingest_keys') == READINGS
+
+    # 4. Linha cortada no fim do segmento ativo
+    spool.append_many([{
+        'temperatura': 25.0, 'umidade_solo': 50.0, 'ph_solo': 6.5,
+        'nitrogenio': 1, 'fosforo': 1, 'potassio': 1,
+        'irrigacao_ativa': 0, 'cultura': 'milho'
+    }])
+    spool.close()
+    active = sorted(spool_dir.iterdir())[-1]
+    with open(active, 'ab') as file:
+        file.write(b'deadbeef {"temperatura": 2')
+
+    spool = _spool(spool_dir)
+    try:
+        assert spool.pending == 1
+        # A sequência continua após reabrir
+        assert max(item['ingest_key'][1] for item, _ in spool._iter_segment(active)) > READINGS
+        spool.replay(db)
+        assert _count(db, 'sensor_readings') == READINGS + 1
+    finally:
+        spool.close()